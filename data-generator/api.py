@@ -7,6 +7,7 @@ from typing import Optional
 import threading
 import time
 from producers import run_kafka_producer
+from offers_consumer import OfferStore, run_offers_consumer
 from config import KAFKA_BOOTSTRAP_SERVERS, EVENTS_PER_SECOND
 
 app = FastAPI(title="Casino Transaction Generator API")
@@ -19,6 +20,9 @@ generator_state = {
     "stop_flag": False
 }
 
+# Latest qualified offers per member, fed by the RisingWave offers sink
+offer_store = OfferStore()
+
 
 class GeneratorConfig(BaseModel):
     rate: Optional[int] = EVENTS_PER_SECOND
@@ -38,7 +42,7 @@ def run_generator_thread(broker: str):
 
     try:
         from kafka import KafkaProducer
-        from casino_simulator import CasinoSimulator
+        from casino_simulator import CasinoSimulator, transaction_amount
         import json
 
         producer = KafkaProducer(
@@ -56,7 +60,7 @@ def run_generator_thread(broker: str):
             transactions = simulator.generate_bet()
             for transaction in transactions:
                 producer.send('gaming-transactions', value=transaction)
-                print(f"[{current_rate} evt/s] {transaction['member_name']} - {transaction['transaction_type']} ${transaction['amount']:.2f}")
+                print(f"[{current_rate} evt/s] {transaction.get('member_name', transaction['member_id'])} - {transaction['transaction_type']} ${transaction_amount(transaction):.2f}")
 
             time.sleep(1.0 / current_rate)
 
@@ -82,6 +86,8 @@ async def root():
             "PATCH /rate": "Update event generation rate (JSON body)",
             "POST /start": "Start generating transactions",
             "POST /stop": "Stop generating transactions",
+            "GET /offers": "Latest qualified offers (optional ?offer_type=hotel|drink)",
+            "GET /offers/{member_id}": "Latest offers for one member",
             "GET /health": "Health check"
         }
     }
@@ -223,6 +229,35 @@ async def stop_generator():
     }
 
 
+def run_offers_thread(broker: str):
+    """Keep the offer store in sync with the offers topic (restarts on errors)"""
+    while True:
+        try:
+            run_offers_consumer(offer_store, [broker])
+        except Exception as e:
+            print(f"Offers consumer error: {e}")
+            time.sleep(5)
+
+
+@app.get("/offers")
+async def get_offers(offer_type: Optional[str] = None):
+    """Get the latest qualified offer per member (pushed from RisingWave, no SQL polling)"""
+    offers = offer_store.latest(offer_type=offer_type)
+    return {
+        "count": len(offers),
+        "offers": offers
+    }
+
+
+@app.get("/offers/{member_id}")
+async def get_member_offers(member_id: int):
+    """Get the latest qualified offers for one member"""
+    return {
+        "member_id": member_id,
+        "offers": offer_store.latest(member_id=member_id)
+    }
+
+
 @app.on_event("startup")
 async def startup_event():
     """Auto-start generator on startup at default rate of 5 events/sec"""
@@ -249,6 +284,10 @@ async def startup_event():
     generator_state["rate"] = EVENTS_PER_SECOND
     print("✅ Generator auto-started at 5 events/sec")
 
+    # Subscribe once to the offers topic for GET /offers
+    threading.Thread(target=run_offers_thread, args=(broker,), daemon=True).start()
+    print("✅ Offers consumer subscribed to the offers topic")
+
 
 if __name__ == "__main__":
     import uvicorn
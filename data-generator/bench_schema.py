@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark standard vs compact event schemas
+
+Measures producer-side cost of each schema: events/sec for generate +
+serialize, average payload size, and (with --broker) end-to-end produce rate
+to Kafka. For the RisingWave side, produce the same number of events with each
+schema and compare `docker stats risingwave` CPU while the source catches up.
+"""
+import argparse
+import json
+import time
+from casino_simulator import CasinoSimulator
+
+
+def serialize(transaction):
+    """Serialize like the Kafka producers do"""
+    return json.dumps(transaction).encode('utf-8')
+
+
+def bench_serialize(compact, num_bets):
+    """
+    Time event generation + JSON serialization
+
+    Returns:
+        dict: events, seconds, events_per_sec, avg_bytes
+    """
+    simulator = CasinoSimulator(compact=compact)
+    events = 0
+    total_bytes = 0
+
+    start = time.perf_counter()
+    for _ in range(num_bets):
+        for transaction in simulator.generate_bet():
+            total_bytes += len(serialize(transaction))
+            events += 1
+    seconds = time.perf_counter() - start
+
+    return {
+        'events': events,
+        'seconds': seconds,
+        'events_per_sec': events / seconds,
+        'avg_bytes': total_bytes / events
+    }
+
+
+def bench_produce(compact, num_bets, broker, topic):
+    """
+    Time producing events to Kafka as fast as possible
+
+    Returns:
+        dict: events, seconds, events_per_sec
+    """
+    from kafka import KafkaProducer
+
+    producer = KafkaProducer(bootstrap_servers=[broker], value_serializer=serialize, linger_ms=5)
+    simulator = CasinoSimulator(compact=compact)
+    events = 0
+
+    start = time.perf_counter()
+    for _ in range(num_bets):
+        for transaction in simulator.generate_bet():
+            producer.send(topic, value=transaction)
+            events += 1
+    producer.flush()
+    seconds = time.perf_counter() - start
+    producer.close()
+
+    return {'events': events, 'seconds': seconds, 'events_per_sec': events / seconds}
+
+
+def print_comparison(title, standard, compact, key):
+    """Print one metric for both schemas"""
+    gain = (compact[key] / standard[key] - 1) * 100
+    print(f"{title:28} standard {standard[key]:>12,.1f} | compact {compact[key]:>12,.1f} | {gain:+.1f}%")
+
+
+def main():
+    """Main entry point for the schema benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark standard vs compact event schemas')
+    parser.add_argument('--bets', type=int, default=200_000, help='Bets to generate per schema (default: 200000)')
+    parser.add_argument('--broker', type=str, help='Also measure produce rate against this Kafka broker')
+    parser.add_argument('--topic', type=str, default='schema-bench', help='Topic for the produce benchmark')
+    args = parser.parse_args()
+
+    standard = bench_serialize(False, args.bets)
+    compact = bench_serialize(True, args.bets)
+    print_comparison("Generate + serialize (evt/s)", standard, compact, 'events_per_sec')
+    print_comparison("Avg payload (bytes)", standard, compact, 'avg_bytes')
+
+    if args.broker:
+        standard = bench_produce(False, args.bets, args.broker, args.topic)
+        compact = bench_produce(True, args.bets, args.broker, args.topic)
+        print_comparison("Produce to Kafka (evt/s)", standard, compact, 'events_per_sec')
+
+
+if __name__ == '__main__':
+    main()
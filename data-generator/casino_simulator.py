@@ -2,16 +2,71 @@
 Casino Simulator - Core logic for generating realistic casino transactions
 """
 import random
+import time
 from datetime import datetime
-from config import MEMBERS, UNLUCKY_MEMBERS, GAMES, WIN_PROBABILITIES, UNLUCKY_WIN_MULTIPLIER
+from config import (
+    MEMBERS, UNLUCKY_MEMBERS, GAMES, WIN_PROBABILITIES, UNLUCKY_WIN_MULTIPLIER, INCLUDE_MEMBER_NAME,
+    COMPACT_SCHEMA
+)
+
+
+def transaction_amount(transaction):
+    """Get a transaction amount in dollars from either event schema"""
+    if 'amount_cents' in transaction:
+        return transaction['amount_cents'] / 100
+    return transaction['amount']
+
+
+def transaction_time_label(transaction):
+    """Get a readable transaction time from either event schema"""
+    if 'transaction_time_ms' in transaction:
+        return datetime.fromtimestamp(transaction['transaction_time_ms'] / 1000).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    return transaction['transaction_time']
 
 
 class CasinoSimulator:
     """Simulates casino gaming transactions with realistic behavior"""
 
-    def __init__(self):
+    def __init__(self, include_member_name=INCLUDE_MEMBER_NAME, compact=COMPACT_SCHEMA):
         self.transaction_id = 1
         self.member_states = {}  # Track member balances and behavior
+        self.include_member_name = include_member_name  # False = slim events (names from members table)
+        self.compact = compact  # True = integer cents + epoch ms instead of float + time string
+
+    def build_transaction(self, member_id, member_name, transaction_type, amount, game_type):
+        """
+        Build a transaction event in the configured schema
+
+        Args:
+            member_id: Member ID
+            member_name: Member name (dropped if names are not included)
+            transaction_type: 'bet' or 'win'
+            amount: Amount in dollars
+            game_type: Type of game
+
+        Returns:
+            dict: Transaction event
+        """
+        transaction = {
+            'transaction_id': self.transaction_id,
+            'member_id': member_id,
+        }
+        if self.include_member_name:
+            transaction['member_name'] = member_name
+        transaction['transaction_type'] = transaction_type
+
+        if self.compact:
+            # Integers are cheaper to produce and parse, and ms resolution avoids ties
+            transaction['amount_cents'] = int(round(amount * 100))
+            transaction['game_type'] = game_type
+            transaction['transaction_time_ms'] = time.time_ns() // 1_000_000
+        else:
+            transaction['amount'] = amount
+            transaction['game_type'] = game_type
+            transaction['transaction_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        self.transaction_id += 1
+        return transaction
 
     def select_game(self):
         """Select game based on popularity weights"""
@@ -106,17 +161,7 @@ class CasinoSimulator:
         bet_amount = self.calculate_bet_amount(member_id, game_info)
 
         # Create bet transaction
-        transaction = {
-            'transaction_id': self.transaction_id,
-            'member_id': member_id,
-            'member_name': member_name,
-            'transaction_type': 'bet',
-            'amount': bet_amount,
-            'game_type': game_type,
-            'transaction_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-
-        self.transaction_id += 1
+        transaction = self.build_transaction(member_id, member_name, 'bet', bet_amount, game_type)
 
         # Determine if this bet wins
         if self.should_win(member_id, game_type):
@@ -141,14 +186,4 @@ class CasinoSimulator:
         Returns:
             dict: Win transaction
         """
-        transaction = {
-            'transaction_id': self.transaction_id,
-            'member_id': member_id,
-            'member_name': member_name,
-            'transaction_type': 'win',
-            'amount': amount,
-            'game_type': game_type,
-            'transaction_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        self.transaction_id += 1
-        return transaction
+        return self.build_transaction(member_id, member_name, 'win', amount, game_type)
@@ -1,12 +1,34 @@
 """
 Configuration for Casino Gaming Transaction Generator
 """
+import os
 
 # Kafka/Redpanda Configuration
 KAFKA_BOOTSTRAP_SERVERS = ['redpanda:9092']  # Redpanda internal port (use localhost:19092 for external)
 KAFKA_TOPIC = 'gaming-transactions'
+OFFERS_TOPIC = 'offers'  # Upsert stream of qualified offers (RisingWave sink)
 EVENTS_PER_SECOND = 5
 
+# RisingWave connection (schema migrations)
+RISINGWAVE_HOST = os.getenv('RISINGWAVE_HOST', 'risingwave')
+RISINGWAVE_PORT = int(os.getenv('RISINGWAVE_PORT', 4566))
+RISINGWAVE_DB = os.getenv('RISINGWAVE_DB', 'dev')
+RISINGWAVE_USER = os.getenv('RISINGWAVE_USER', 'root')
+
+# Windowed aggregate emit mode and state retention (rendered into migrations/)
+EMIT_ON_WINDOW_CLOSE = os.getenv('RW_EMIT_ON_WINDOW_CLOSE', 'false').lower() == 'true'
+SUMMARY_RETENTION_SECONDS = int(os.getenv('RW_SUMMARY_RETENTION_SECONDS', 0))  # 0 = keep closed windows
+LIVE_RETENTION_SECONDS = int(os.getenv('RW_LIVE_RETENTION_SECONDS', 900))
+
+# Source startup position (only used when gaming_transactions is created)
+# Mode: 'earliest', 'latest' or 'timestamp' (ISO datetime or epoch ms in RW_SOURCE_STARTUP_TIMESTAMP)
+SOURCE_STARTUP_MODE = os.getenv('RW_SOURCE_STARTUP_MODE', 'earliest')
+SOURCE_STARTUP_TIMESTAMP = os.getenv('RW_SOURCE_STARTUP_TIMESTAMP', '')
+
+# Ingestion/backfill throttling in rows/sec ('' = unlimited)
+SOURCE_RATE_LIMIT = os.getenv('RW_SOURCE_RATE_LIMIT', '')
+BACKFILL_RATE_LIMIT = os.getenv('RW_BACKFILL_RATE_LIMIT', '')
+
 # Member pool (simulated casino members - 100 members)
 # IDs 1001-1020: High rollers (big bets, guaranteed wins - will hit hotel threshold)
 # IDs 1021-1050: Regular players (medium bets, normal luck)
@@ -38,6 +60,14 @@ LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Mille
 
 MEMBERS = [(1000 + i + 1, f"{FIRST_NAMES[i]} {LAST_NAMES[i]}") for i in range(100)]
 
+# Send member_name in every event? RisingWave joins names from the members
+# table (seeded from MEMBERS), so events can stay slim
+INCLUDE_MEMBER_NAME = os.getenv('INCLUDE_MEMBER_NAME', 'true').lower() == 'true'
+
+# Compact numeric event schema: amount_cents (integer cents) and
+# transaction_time_ms (epoch milliseconds) instead of a float and a time string
+COMPACT_SCHEMA = os.getenv('COMPACT_SCHEMA', 'false').lower() == 'true'
+
 # Unlucky members who lose more often (for drink offers) - IDs 1051-1070
 UNLUCKY_MEMBERS = set(range(1051, 1071))
 
@@ -4,6 +4,7 @@ Casino Gaming Transaction Generator - Main Entry Point
 Generates realistic casino gaming data to Kafka/Redpanda
 """
 import argparse
+import random
 import config
 from producers import run_kafka_producer, run_batch_mode
 
@@ -26,6 +27,15 @@ Examples:
 
   # Use custom Kafka broker
   python generate.py --broker localhost:9092
+
+  # Slim events without member_name (names come from the members table)
+  python generate.py --omit-member-name
+
+  # Compact numeric schema (integer cents, epoch ms timestamps)
+  python generate.py --compact
+
+  # Reproducible event mix (e.g. to seed a dashboard load test)
+  python generate.py --seed 42 --rate 50
         """
     )
 
@@ -57,17 +67,42 @@ Examples:
         help='Kafka broker address (default: localhost:19092)'
     )
 
+    parser.add_argument(
+        '--omit-member-name',
+        action='store_true',
+        default=not config.INCLUDE_MEMBER_NAME,
+        help='Leave member_name out of events (RisingWave joins it from the members table)'
+    )
+
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        default=config.COMPACT_SCHEMA,
+        help='Send amount_cents/transaction_time_ms instead of amount/transaction_time'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Seed the random generator so runs produce the same member, game and amount sequence'
+    )
+
     args = parser.parse_args()
 
+    if args.seed is not None:
+        random.seed(args.seed)
+
     # Update config based on arguments
     events_per_second = args.rate
     bootstrap_servers = [args.broker]
 
     # Run in selected mode
+    include_member_name = not args.omit_member_name
+
     if args.mode == 'kafka':
-        run_kafka_producer(events_per_second, bootstrap_servers)
+        run_kafka_producer(events_per_second, bootstrap_servers, include_member_name, args.compact)
     else:
-        run_batch_mode(args.count)
+        run_batch_mode(args.count, include_member_name, args.compact)
 
 
 if __name__ == '__main__':
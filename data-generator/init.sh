@@ -11,10 +11,14 @@ until rpk cluster info --brokers redpanda:9092 2>/dev/null; do
 done
 echo "✓ Redpanda is ready"
 
-# 2. Create Kafka topic
+# 2. Create Kafka topics
 echo "▶ Creating Kafka topic: gaming-transactions..."
 rpk topic create gaming-transactions --brokers redpanda:9092 || echo "  Topic already exists"
-echo "✓ Kafka topic ready"
+echo "▶ Creating Kafka topic: offers..."
+rpk topic create offers --brokers redpanda:9092 -c cleanup.policy=compact || echo "  Topic already exists"
+echo "▶ Creating Kafka topic: redemptions..."
+rpk topic create redemptions --brokers redpanda:9092 || echo "  Topic already exists"
+echo "✓ Kafka topics ready"
 
 # 3. Wait for RisingWave to be ready
 echo "▶ Waiting for RisingWave to be ready..."
@@ -23,13 +27,15 @@ until psql -h risingwave -p 4566 -d dev -U root -c '\q' 2>/dev/null; do
 done
 echo "✓ RisingWave is ready"
 
-# 4. Initialize RisingWave schema
-echo "▶ Initializing RisingWave schema..."
-if psql -h risingwave -p 4566 -d dev -U root -f /app/setup_risingwave.sql 2>&1 | tee /tmp/rw_init.log; then
-    echo "✓ RisingWave schema initialized successfully"
+# 4. Apply pending RisingWave schema migrations
+#    Already-applied migrations are skipped, so existing MVs and their state
+#    survive restarts. Emit mode / retention come from RW_* env vars (config.py).
+echo "▶ Applying RisingWave schema migrations..."
+if python /app/migrate.py; then
+    echo "✓ RisingWave schema is up to date"
 else
-    echo "⚠ Schema initialization had errors (may be normal if schema already exists)"
-    cat /tmp/rw_init.log
+    echo "⚠ Schema migration failed"
+    exit 1
 fi
 
 echo "=== Initialization Complete ==="
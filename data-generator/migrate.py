@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+RisingWave schema migrations
+
+Applies versioned SQL files from migrations/ in order and records each one in
+a schema_migrations table. Already-applied migrations are skipped, so existing
+sources, materialized views and their state are left in place on restart.
+To change an object, add a new migration that drops and recreates only it.
+
+Schema settings rendered into a migration (emit mode, retention) are recorded
+with it. They only take effect when the migration runs, so changing them later
+warns until --rebuild re-applies everything with the new values.
+
+The source startup position (earliest, latest, a timestamp or explicit
+offsets) and ingestion/backfill rate limits can be chosen per run, and
+--rebuild replays history from that position at a capped rate.
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from string import Template
+import psycopg2
+import config
+
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+VERSION_TABLE = 'schema_migrations'
+SOURCE_NAME = 'gaming_transactions'
+# Views on kept tables that a replayed migration would drop (0005 replaces
+# redeemed_offers); --rebuild drops them too and their migration recreates them
+KEPT_TABLE_VIEWS = ['redemption_daily_counts']
+STARTUP_MODES = ['earliest', 'latest', 'timestamp']
+# A comment line '-- migrate: if-exists <table>' runs the next statement only
+# if that table exists, so steps like copy-then-drop can be re-run
+GUARD = re.compile(r'^--\s*migrate:\s*if-exists\s+(\w+)\s*$')
+# Earlier checksums of migrations edited in place without changing what they
+# build (0005: made re-runnable after an interrupted table swap)
+ACCEPTED_CHECKSUMS = {
+    5: {'b2494385a0988b5d091aaf8a78d7f80ac35a8614c0d18aafec661bdc6a59ac89'},
+}
+# Template values that shape objects and are recorded per migration. The source
+# startup position is not: it only matters when the source is (re)created.
+SCHEMA_SETTINGS = ['emit_clause', 'summary_with', 'live_retention']
+
+Migration = namedtuple('Migration', ['version', 'name', 'path', 'sql', 'checksum'])
+
+
+def parse_timestamp_millis(value):
+    """
+    Parse a startup timestamp
+
+    Args:
+        value: Epoch milliseconds or an ISO datetime (naive = local time)
+
+    Returns:
+        int: Epoch milliseconds
+    """
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def parse_offsets(value):
+    """
+    Parse explicit offsets like '0:1200,1:980'
+
+    Returns:
+        dict: partition -> offset
+    """
+    offsets = {}
+    for item in value.split(','):
+        partition, offset = item.split(':')
+        offsets[int(partition)] = int(offset)
+    return offsets
+
+
+def resolve_offsets_to_millis(offsets, bootstrap_servers=config.KAFKA_BOOTSTRAP_SERVERS):
+    """
+    Translate explicit partition offsets into a startup timestamp
+
+    RisingWave's Kafka source starts from a mode or a timestamp, not from
+    per-partition offsets, so we read the broker timestamp of the message at
+    each requested offset and start from the earliest of them.
+
+    Args:
+        offsets: dict of partition -> offset
+        bootstrap_servers: Kafka broker addresses
+
+    Returns:
+        int: Epoch milliseconds
+    """
+    from kafka import KafkaConsumer, TopicPartition
+
+    consumer = KafkaConsumer(bootstrap_servers=bootstrap_servers, enable_auto_commit=False)
+    timestamps = []
+    try:
+        for partition, offset in offsets.items():
+            tp = TopicPartition(config.KAFKA_TOPIC, partition)
+            consumer.assign([tp])
+            consumer.seek(tp, offset)
+            batch = consumer.poll(timeout_ms=5000, max_records=1)
+            for messages in batch.values():
+                timestamps.extend(message.timestamp for message in messages)
+    finally:
+        consumer.close()
+
+    if not timestamps:
+        raise ValueError(f"No messages found at offsets {offsets} in {config.KAFKA_TOPIC}")
+    return min(timestamps)
+
+
+def render_source_startup(mode=config.SOURCE_STARTUP_MODE, timestamp=config.SOURCE_STARTUP_TIMESTAMP,
+                          offsets=None):
+    """
+    Render the source WITH options that choose where ingestion starts
+
+    Args:
+        mode: 'earliest', 'latest' or 'timestamp'
+        timestamp: Epoch ms or ISO datetime (mode 'timestamp')
+        offsets: dict of partition -> offset (overrides mode)
+
+    Returns:
+        str: WITH option(s) for the Kafka source
+    """
+    if offsets:
+        millis = resolve_offsets_to_millis(offsets)
+    elif mode == 'timestamp':
+        if not timestamp:
+            raise ValueError("Startup mode 'timestamp' needs a startup timestamp")
+        millis = parse_timestamp_millis(timestamp)
+    elif mode in ('earliest', 'latest'):
+        return f"scan.startup.mode = '{mode}'"
+    else:
+        raise ValueError(f"Unknown startup mode: {mode}")
+    return f"scan.startup.timestamp.millis = '{millis}'"
+
+
+def get_settings(source_startup=None):
+    """
+    Build template values for migration files from config
+
+    Args:
+        source_startup: Pre-rendered source startup options (default: from config)
+
+    Returns:
+        dict: Placeholder name -> SQL fragment
+    """
+    summary_with = ''
+    if config.SUMMARY_RETENTION_SECONDS > 0:
+        summary_with = f"WITH (retention_seconds = {config.SUMMARY_RETENTION_SECONDS})"
+
+    return {
+        'emit_clause': 'EMIT ON WINDOW CLOSE' if config.EMIT_ON_WINDOW_CLOSE else '',
+        'summary_with': summary_with,
+        'live_retention': str(config.LIVE_RETENTION_SECONDS),
+        'source_startup': source_startup or render_source_startup(),
+    }
+
+
+def schema_settings(migration, settings):
+    """
+    Schema settings a migration renders, as recorded in the version table
+
+    Returns:
+        str: JSON object of the SCHEMA_SETTINGS placeholders the migration uses
+    """
+    used = set(re.findall(r'\$\{(\w+)\}', migration.sql)) & set(SCHEMA_SETTINGS)
+    return json.dumps({name: settings[name] for name in sorted(used)}, sort_keys=True)
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """
+    Load migration files named NNNN_description.sql
+
+    Args:
+        directory: Folder containing migration files
+
+    Returns:
+        list: Migration tuples sorted by version
+    """
+    migrations = []
+    for path in sorted(directory.glob('*.sql')):
+        match = re.match(r'^(\d+)_(.+)\.sql$', path.name)
+        if not match:
+            continue
+        sql = path.read_text()
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            name=match.group(2),
+            path=path,
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode('utf-8')).hexdigest()
+        ))
+    return sorted(migrations, key=lambda m: m.version)
+
+
+def split_statements(sql):
+    """
+    Split a SQL script into statements, dropping -- comments
+
+    Args:
+        sql: SQL script text
+
+    Returns:
+        list: (statement without the trailing semicolon, guard table or None) pairs
+    """
+    statements = []
+    current = []
+    in_string = False
+    guard = None
+
+    for line in sql.splitlines():
+        if not in_string and line.strip().startswith('--'):
+            match = GUARD.match(line.strip())
+            if match:
+                guard = match.group(1)
+            continue
+        for i, char in enumerate(line):
+            if char == "'":
+                in_string = not in_string
+            elif not in_string and line[i:i + 2] == '--':
+                break
+            elif char == ';' and not in_string:
+                statement = ''.join(current).strip()
+                if statement:
+                    statements.append((statement, guard))
+                    guard = None
+                current = []
+                continue
+            current.append(char)
+        current.append('\n')
+
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append((statement, guard))
+    return statements
+
+
+def table_exists(cursor, table):
+    """Whether a table (or source-backed table) with this name exists"""
+    cursor.execute("SELECT 1 FROM information_schema.tables WHERE table_name = %s", (table,))
+    return cursor.fetchone() is not None
+
+
+def connect(host=config.RISINGWAVE_HOST, port=config.RISINGWAVE_PORT,
+            database=config.RISINGWAVE_DB, user=config.RISINGWAVE_USER, retries=30):
+    """Connect to RisingWave in autocommit mode, waiting for it to come up"""
+    for attempt in range(1, retries + 1):
+        try:
+            conn = psycopg2.connect(host=host, port=port, database=database, user=user)
+            conn.autocommit = True  # RisingWave DDL is not transactional
+            return conn
+        except psycopg2.OperationalError:
+            if attempt == retries:
+                raise
+            time.sleep(2)
+
+
+def ensure_version_table(cursor):
+    """Create the schema version table if needed (adding the settings column to older ones)"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+        version INT PRIMARY KEY,
+        name VARCHAR,
+        checksum VARCHAR,
+        applied_at TIMESTAMP,
+        settings VARCHAR
+    )
+    """)
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name = %s",
+                   (VERSION_TABLE,))
+    if 'settings' not in {column for (column,) in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {VERSION_TABLE} ADD COLUMN settings VARCHAR")
+
+
+def get_applied(cursor):
+    """
+    Get applied migrations
+
+    Returns:
+        dict: version -> (checksum, recorded schema settings JSON or None)
+    """
+    cursor.execute(f"SELECT version, checksum, settings FROM {VERSION_TABLE}")
+    return {version: (checksum, settings) for version, checksum, settings in cursor.fetchall()}
+
+
+def checksum_matches(migration, checksum):
+    """Whether an applied checksum is this file's (or an accepted earlier revision's)"""
+    return checksum == migration.checksum or checksum in ACCEPTED_CHECKSUMS.get(migration.version, ())
+
+
+def settings_changed(migration, recorded, settings):
+    """
+    Schema settings that differ from those the migration was applied with
+
+    Returns:
+        list: Placeholder names (empty if unchanged or not recorded)
+    """
+    if recorded is None:
+        return []
+    before = json.loads(recorded)
+    now = json.loads(schema_settings(migration, settings))
+    return [name for name in sorted(now) if before.get(name) != now[name]]
+
+
+def apply_migration(cursor, migration, settings):
+    """
+    Run every statement of a migration, then record its version and settings
+
+    Statements are written to be re-runnable (IF NOT EXISTS / IF EXISTS, and
+    table rewrites guarded on the table they copy from), so a migration
+    interrupted half-way can be applied again.
+    """
+    for statement, guard in split_statements(migration.sql):
+        if guard is not None and not table_exists(cursor, guard):
+            continue
+        cursor.execute(Template(statement).substitute(settings))
+
+    cursor.execute(
+        f"INSERT INTO {VERSION_TABLE} (version, name, checksum, applied_at, settings) "
+        "VALUES (%s, %s, %s, NOW(), %s)",
+        (migration.version, migration.name, migration.checksum, schema_settings(migration, settings))
+    )
+    cursor.execute("FLUSH")
+
+
+def format_rate_limit(rate_limit):
+    """Render a rows/sec limit for SET/ALTER ('' or 'default' = unlimited)"""
+    if rate_limit in (None, '', 'default'):
+        return 'DEFAULT'
+    return str(int(rate_limit))
+
+
+def set_session_rate_limits(cursor, source_rate_limit=None, backfill_rate_limit=None):
+    """
+    Cap ingestion for objects created on this connection
+
+    source_rate_limit applies to MVs reading the Kafka source directly,
+    backfill_rate_limit to MVs backfilling from other MVs/tables.
+    """
+    if source_rate_limit not in (None, ''):
+        cursor.execute(f"SET source_rate_limit = {format_rate_limit(source_rate_limit)}")
+    if backfill_rate_limit not in (None, ''):
+        cursor.execute(f"SET backfill_rate_limit = {format_rate_limit(backfill_rate_limit)}")
+
+
+def throttle_existing(conn, source_rate_limit=None, backfill_rate_limit=None):
+    """
+    Change rate limits on the live source and materialized views
+
+    Args:
+        conn: Autocommit RisingWave connection
+        source_rate_limit: rows/sec for the source ('default' lifts the limit)
+        backfill_rate_limit: rows/sec for MV backfills ('default' lifts the limit)
+    """
+    cursor = conn.cursor()
+    if source_rate_limit not in (None, ''):
+        cursor.execute(f"ALTER SOURCE {SOURCE_NAME} SET source_rate_limit = {format_rate_limit(source_rate_limit)}")
+        print(f"✓ {SOURCE_NAME}: source_rate_limit = {format_rate_limit(source_rate_limit)}")
+    if backfill_rate_limit not in (None, ''):
+        cursor.execute("SELECT name FROM rw_catalog.rw_materialized_views")
+        for (name,) in cursor.fetchall():
+            cursor.execute(f"ALTER MATERIALIZED VIEW {name} SET backfill_rate_limit = {format_rate_limit(backfill_rate_limit)}")
+            print(f"✓ {name}: backfill_rate_limit = {format_rate_limit(backfill_rate_limit)}")
+    cursor.close()
+
+
+def rebuild(conn, settings, source_rate_limit=None, backfill_rate_limit=None):
+    """
+    Drop the source and everything built on it, then re-apply all migrations
+
+    History is replayed from the startup position in settings, throttled by
+    the rate limits so the rebuild does not starve other work. Tables that do
+    not depend on the source (e.g. redeemed_offers) are kept.
+    """
+    cursor = conn.cursor()
+    ensure_version_table(cursor)
+    print(f"▶ Dropping {SOURCE_NAME} and dependent views...")
+    cursor.execute(f"DROP SOURCE IF EXISTS {SOURCE_NAME} CASCADE")
+    for view in KEPT_TABLE_VIEWS:
+        cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
+    cursor.execute(f"DELETE FROM {VERSION_TABLE}")
+    cursor.execute("FLUSH")
+    cursor.close()
+    print(f"▶ Replaying from {settings['source_startup']}")
+    return migrate(conn, settings=settings, source_rate_limit=source_rate_limit,
+                   backfill_rate_limit=backfill_rate_limit)
+
+
+def migrate(conn, dry_run=False, settings=None, source_rate_limit=config.SOURCE_RATE_LIMIT,
+            backfill_rate_limit=config.BACKFILL_RATE_LIMIT):
+    """
+    Apply pending migrations
+
+    Args:
+        conn: Autocommit RisingWave connection
+        dry_run: Only print what would be applied
+        settings: Template values (default: get_settings())
+        source_rate_limit: rows/sec cap for MVs created on the source
+        backfill_rate_limit: rows/sec cap for MV-on-MV backfill
+
+    Returns:
+        int: Number of migrations applied
+    """
+    settings = settings or get_settings()
+    cursor = conn.cursor()
+    ensure_version_table(cursor)
+    set_session_rate_limits(cursor, source_rate_limit, backfill_rate_limit)
+    applied = get_applied(cursor)
+
+    count = 0
+    for migration in load_migrations():
+        label = f"{migration.version:04d}_{migration.name}"
+
+        if migration.version in applied:
+            checksum, recorded = applied[migration.version]
+            if not checksum_matches(migration, checksum):
+                print(f"⚠ {label} changed after it was applied - not re-running (add a new migration instead)")
+            changed = settings_changed(migration, recorded, settings)
+            if changed:
+                print(f"⚠ {label} was applied with different {', '.join(changed)} - "
+                      f"the new values take effect only after --rebuild")
+            continue
+
+        if dry_run:
+            print(f"▶ Would apply {label}")
+        else:
+            print(f"▶ Applying {label}...")
+            apply_migration(cursor, migration, settings)
+            print(f"✓ Applied {label}")
+        count += 1
+
+    cursor.close()
+    if count == 0:
+        print("✓ Schema is up to date")
+    return count
+
+
+def seed_members(conn, members=config.MEMBERS):
+    """
+    Load the members dimension table from the member registry
+
+    The table's primary key makes re-inserting a member overwrite the row, so
+    this runs on every start and picks up renamed or new members.
+
+    Args:
+        conn: Autocommit RisingWave connection
+        members: (member_id, member_name) tuples
+    """
+    from psycopg2.extras import execute_values
+
+    cursor = conn.cursor()
+    execute_values(cursor, "INSERT INTO members (member_id, member_name) VALUES %s", members)
+    cursor.execute("FLUSH")
+    cursor.close()
+    print(f"✓ Loaded {len(members)} members")
+
+
+def print_status(conn):
+    """Print applied and pending migrations"""
+    cursor = conn.cursor()
+    ensure_version_table(cursor)
+    applied = get_applied(cursor)
+    cursor.close()
+
+    # Only SCHEMA_SETTINGS are compared, so the startup position is not resolved
+    settings = get_settings(source_startup="scan.startup.mode = 'latest'")
+    for migration in load_migrations():
+        if migration.version not in applied:
+            state = "pending"
+        elif not checksum_matches(migration, applied[migration.version][0]):
+            state = "applied (file changed)"
+        elif settings_changed(migration, applied[migration.version][1], settings):
+            state = "applied (settings changed, needs --rebuild)"
+        else:
+            state = "applied"
+        print(f"{migration.version:04d}_{migration.name:30} {state}")
+
+
+def main():
+    """Main entry point for the migration runner"""
+    parser = argparse.ArgumentParser(
+        description='Apply RisingWave schema migrations',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Apply pending migrations (source starts per RW_SOURCE_STARTUP_MODE)
+  python migrate.py
+
+  # Fresh source that ignores history
+  python migrate.py --startup-mode latest
+
+  # Rebuild everything from a point in time at 2,000 rows/sec
+  python migrate.py --rebuild --startup-mode timestamp \\
+      --startup-timestamp 2025-01-01T08:00:00 --source-rate-limit 2000
+
+  # Rebuild from explicit partition offsets
+  python migrate.py --rebuild --startup-offsets 0:120000
+
+  # Lift the limit once the rebuild has caught up
+  python migrate.py --throttle --source-rate-limit default
+        """
+    )
+    parser.add_argument('--host', default=config.RISINGWAVE_HOST, help='RisingWave host')
+    parser.add_argument('--port', type=int, default=config.RISINGWAVE_PORT, help='RisingWave port')
+    parser.add_argument('--status', action='store_true', help='Show applied/pending migrations and exit')
+    parser.add_argument('--dry-run', action='store_true', help='Show pending migrations without applying')
+    parser.add_argument(
+        '--startup-mode',
+        choices=STARTUP_MODES,
+        default=config.SOURCE_STARTUP_MODE,
+        help='Where the source starts reading when it is created (default: %(default)s)'
+    )
+    parser.add_argument('--startup-timestamp', default=config.SOURCE_STARTUP_TIMESTAMP,
+                        help='ISO datetime or epoch ms for --startup-mode timestamp')
+    parser.add_argument('--startup-offsets', type=parse_offsets,
+                        help="Explicit partition offsets, e.g. '0:1200,1:980'")
+    parser.add_argument('--source-rate-limit', default=config.SOURCE_RATE_LIMIT,
+                        help="Source ingestion cap in rows/sec ('default' = unlimited)")
+    parser.add_argument('--backfill-rate-limit', default=config.BACKFILL_RATE_LIMIT,
+                        help="MV backfill cap in rows/sec ('default' = unlimited)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Drop the source and its views and replay history from the startup position')
+    parser.add_argument('--throttle', action='store_true',
+                        help='Only apply the rate limits to the existing source and views')
+    args = parser.parse_args()
+
+    conn = connect(host=args.host, port=args.port)
+    try:
+        if args.status:
+            print_status(conn)
+        elif args.throttle:
+            throttle_existing(conn, args.source_rate_limit, args.backfill_rate_limit)
+        else:
+            source_startup = render_source_startup(args.startup_mode, args.startup_timestamp,
+                                                   args.startup_offsets)
+            settings = get_settings(source_startup)
+            if args.rebuild:
+                rebuild(conn, settings, args.source_rate_limit, args.backfill_rate_limit)
+            else:
+                migrate(conn, dry_run=args.dry_run, settings=settings,
+                        source_rate_limit=args.source_rate_limit,
+                        backfill_rate_limit=args.backfill_rate_limit)
+            if not args.dry_run:
+                seed_members(conn)
+    except (psycopg2.Error, ValueError) as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,10 @@
--- Casino Gaming Loyalty System - RisingWave Setup
--- This demonstrates native Kafka source connector (no Kafka Connect needed!)
-
--- Drop existing views first to ensure clean recreation
-DROP MATERIALIZED VIEW IF EXISTS drink_offers CASCADE;
-DROP MATERIALIZED VIEW IF EXISTS hotel_room_offers CASCADE;
-DROP MATERIALIZED VIEW IF EXISTS member_daily_summary CASCADE;
+-- 0001: Initial schema
+-- Kafka source, windowed member summaries, offer views and redemption tracking.
+-- Rendered by migrate.py with settings from config.py:
+--   ${emit_clause}     '' (emit on every update) or 'EMIT ON WINDOW CLOSE'
+--   ${summary_with}    '' (keep closed windows forever) or 'WITH (retention_seconds = N)'
+--   ${live_retention}  seconds of state kept by member_live_summary
+--   ${source_startup}  where the source starts reading, e.g. scan.startup.mode = 'earliest'
 
 -- 1. Create Kafka source for gaming transactions
 -- RisingWave connects DIRECTLY to Kafka - no Kafka Connect required!
@@ -22,13 +22,15 @@ CREATE SOURCE IF NOT EXISTS gaming_transactions (
     connector = 'kafka',
     topic = 'gaming-transactions',
     properties.bootstrap.server = 'redpanda:9092',
-    scan.startup.mode = 'earliest'
+    ${source_startup}
 ) FORMAT PLAIN ENCODE JSON;
 
 -- 2. Create materialized view for member daily summary
 -- This aggregates transactions per member in real-time
 -- Using 5-minute windows for real-time demo (change to 1 DAY for production)
-CREATE MATERIALIZED VIEW IF NOT EXISTS member_daily_summary AS
+-- With EMIT ON WINDOW CLOSE each window is emitted once, after the watermark
+-- passes window_end, so this view (and the offer views on top) is append-only
+CREATE MATERIALIZED VIEW IF NOT EXISTS member_daily_summary ${summary_with} AS
 SELECT
     member_id,
     member_name,
@@ -49,6 +51,29 @@ SELECT
     -- Last transaction time
     MAX(transaction_time) as last_transaction
 FROM TUMBLE(gaming_transactions, transaction_time, INTERVAL '5' MINUTE)
+GROUP BY member_id, member_name, window_start, window_end
+${emit_clause};
+
+-- 2b. Live (open window) summary for the "current interval" dashboard cards
+-- Same aggregation, emitted on every update, but only keeps recent state so
+-- it stays small no matter how long the deployment runs
+CREATE MATERIALIZED VIEW IF NOT EXISTS member_live_summary
+WITH (retention_seconds = ${live_retention}) AS
+SELECT
+    member_id,
+    member_name,
+    window_start,
+    window_end,
+    SUM(CASE WHEN transaction_type = 'bet' THEN amount ELSE 0 END) as total_spend,
+    SUM(CASE WHEN transaction_type = 'win' THEN amount ELSE 0 END) as total_winnings,
+    SUM(CASE
+        WHEN transaction_type = 'win' THEN amount
+        WHEN transaction_type = 'bet' THEN -amount
+        ELSE 0
+    END) as net_amount,
+    COUNT(*) as transaction_count,
+    MAX(transaction_time) as last_transaction
+FROM TUMBLE(gaming_transactions, transaction_time, INTERVAL '5' MINUTE)
 GROUP BY member_id, member_name, window_start, window_end;
 
 -- 3. View for hotel room offers (spent >= $5000)
@@ -94,15 +119,3 @@ CREATE TABLE IF NOT EXISTS redeemed_offers (
     redemption_date DATE NOT NULL,  -- Date portion for enforcing one-per-day
     PRIMARY KEY (member_id, offer_type, redemption_date)
 );
-
--- Query examples:
-
--- Check hotel room offers
--- SELECT * FROM hotel_room_offers ORDER BY total_spend DESC;
-
--- Check drink offers
--- SELECT * FROM drink_offers ORDER BY loss_amount DESC;
-
--- View all member summaries
--- SELECT * FROM member_daily_summary
--- ORDER BY window_end DESC, total_spend DESC;
@@ -0,0 +1,43 @@
+-- 0002: Offers sink
+-- Push qualified offers to the 'offers' topic instead of dashboard polling.
+
+-- 6. Offer stream pushed out to Redpanda
+-- Both offer views in one shape, keyed by (member_id, offer_type, window_start)
+CREATE MATERIALIZED VIEW IF NOT EXISTS offer_events AS
+SELECT
+    member_id,
+    member_name,
+    'hotel' as offer_type,
+    reward_type,
+    total_spend as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end
+FROM hotel_room_offers
+UNION ALL
+SELECT
+    member_id,
+    member_name,
+    'drink' as offer_type,
+    reward_type,
+    loss_amount as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end
+FROM drink_offers;
+
+-- Upsert sink: every new/updated offer is a keyed message on the 'offers' topic,
+-- retracted offers become tombstones. Consumers subscribe instead of polling SQL.
+CREATE SINK IF NOT EXISTS offers_sink FROM offer_events
+WITH (
+    connector = 'kafka',
+    properties.bootstrap.server = 'redpanda:9092',
+    topic = 'offers',
+    primary_key = 'member_id,offer_type,window_start'
+) FORMAT UPSERT ENCODE JSON;
@@ -0,0 +1,128 @@
+-- 0003: Members dimension
+-- Member names move out of the aggregation key into a members table (seeded
+-- from config.MEMBERS by migrate.py). Events may omit member_name entirely;
+-- names are added back with a lookup join only in the offer views.
+
+CREATE TABLE IF NOT EXISTS members (
+    member_id BIGINT PRIMARY KEY,
+    member_name VARCHAR
+);
+
+-- Recreate the summary chain with (member_id, window) group keys
+DROP SINK IF EXISTS offers_sink;
+DROP MATERIALIZED VIEW IF EXISTS offer_events;
+DROP MATERIALIZED VIEW IF EXISTS drink_offers;
+DROP MATERIALIZED VIEW IF EXISTS hotel_room_offers;
+DROP MATERIALIZED VIEW IF EXISTS member_live_summary;
+DROP MATERIALIZED VIEW IF EXISTS member_daily_summary;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS member_daily_summary ${summary_with} AS
+SELECT
+    member_id,
+    window_start,
+    window_end,
+    -- Total amount wagered/spent
+    SUM(CASE WHEN transaction_type = 'bet' THEN amount ELSE 0 END) as total_spend,
+    -- Total winnings
+    SUM(CASE WHEN transaction_type = 'win' THEN amount ELSE 0 END) as total_winnings,
+    -- Net amount (winnings - bets)
+    SUM(CASE
+        WHEN transaction_type = 'win' THEN amount
+        WHEN transaction_type = 'bet' THEN -amount
+        ELSE 0
+    END) as net_amount,
+    -- Transaction count
+    COUNT(*) as transaction_count,
+    -- Last transaction time
+    MAX(transaction_time) as last_transaction
+FROM TUMBLE(gaming_transactions, transaction_time, INTERVAL '5' MINUTE)
+GROUP BY member_id, window_start, window_end
+${emit_clause};
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS member_live_summary
+WITH (retention_seconds = ${live_retention}) AS
+SELECT
+    member_id,
+    window_start,
+    window_end,
+    SUM(CASE WHEN transaction_type = 'bet' THEN amount ELSE 0 END) as total_spend,
+    SUM(CASE WHEN transaction_type = 'win' THEN amount ELSE 0 END) as total_winnings,
+    SUM(CASE
+        WHEN transaction_type = 'win' THEN amount
+        WHEN transaction_type = 'bet' THEN -amount
+        ELSE 0
+    END) as net_amount,
+    COUNT(*) as transaction_count,
+    MAX(transaction_time) as last_transaction
+FROM TUMBLE(gaming_transactions, transaction_time, INTERVAL '5' MINUTE)
+GROUP BY member_id, window_start, window_end;
+
+-- Offer views: the only place member names are joined back in
+CREATE MATERIALIZED VIEW IF NOT EXISTS hotel_room_offers AS
+SELECT
+    s.member_id,
+    m.member_name,
+    s.total_spend,
+    s.transaction_count,
+    s.net_amount,
+    s.last_transaction,
+    s.window_start,
+    s.window_end,
+    '🏨 Complimentary Hotel Room (1 night)' as reward_type
+FROM member_daily_summary s
+LEFT JOIN members m ON s.member_id = m.member_id
+WHERE s.total_spend >= 5000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS drink_offers AS
+SELECT
+    s.member_id,
+    m.member_name,
+    s.total_spend,
+    s.transaction_count,
+    s.net_amount,
+    ABS(s.net_amount) as loss_amount,
+    s.last_transaction,
+    s.window_start,
+    s.window_end,
+    '🍹 Complimentary Premium Drink' as reward_type
+FROM member_daily_summary s
+LEFT JOIN members m ON s.member_id = m.member_id
+WHERE s.net_amount < 0
+  AND ABS(s.net_amount) >= 1000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS offer_events AS
+SELECT
+    member_id,
+    member_name,
+    'hotel' as offer_type,
+    reward_type,
+    total_spend as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end
+FROM hotel_room_offers
+UNION ALL
+SELECT
+    member_id,
+    member_name,
+    'drink' as offer_type,
+    reward_type,
+    loss_amount as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end
+FROM drink_offers;
+
+CREATE SINK IF NOT EXISTS offers_sink FROM offer_events
+WITH (
+    connector = 'kafka',
+    properties.bootstrap.server = 'redpanda:9092',
+    topic = 'offers',
+    primary_key = 'member_id,offer_type,window_start'
+) FORMAT UPSERT ENCODE JSON;
@@ -0,0 +1,142 @@
+-- 0004: Compact numeric event schema
+-- Events may carry amount_cents (integer cents) and transaction_time_ms (epoch
+-- ms) instead of a decimal amount and a second-resolution time string
+-- (generator COMPACT_SCHEMA=true). The source accepts both shapes and
+-- normalizes them in generated columns; aggregations sum integer cents and
+-- convert to dollars only in the output projection.
+-- Epoch ms are read as UTC, matching the generator containers' local time.
+
+-- The source schema and watermark column change, so the whole chain is rebuilt
+DROP SINK IF EXISTS offers_sink;
+DROP SOURCE IF EXISTS gaming_transactions CASCADE;
+
+CREATE SOURCE IF NOT EXISTS gaming_transactions (
+    transaction_id BIGINT,
+    member_id BIGINT,
+    member_name VARCHAR,
+    transaction_type VARCHAR,  -- 'bet', 'win', 'cashout'
+    amount DECIMAL,            -- standard schema: dollars
+    amount_cents BIGINT,       -- compact schema: integer cents
+    game_type VARCHAR,         -- 'slot', 'blackjack', 'roulette', 'poker'
+    transaction_time TIMESTAMP,     -- standard schema: 'YYYY-MM-DD HH:MM:SS'
+    transaction_time_ms BIGINT,     -- compact schema: epoch milliseconds
+    amount_cents_norm BIGINT AS COALESCE(amount_cents, (amount * 100)::BIGINT),
+    event_time TIMESTAMP AS COALESCE(
+        transaction_time,
+        to_timestamp(transaction_time_ms / 1000.0) AT TIME ZONE 'UTC'
+    ),
+    -- Watermark for handling late arrivals (10 second tolerance)
+    WATERMARK FOR event_time AS event_time - INTERVAL '10' SECOND
+) WITH (
+    connector = 'kafka',
+    topic = 'gaming-transactions',
+    properties.bootstrap.server = 'redpanda:9092',
+    ${source_startup}
+) FORMAT PLAIN ENCODE JSON;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS member_daily_summary ${summary_with} AS
+SELECT
+    member_id,
+    window_start,
+    window_end,
+    -- Sums run over integer cents; dollars only in the output projection
+    SUM(CASE WHEN transaction_type = 'bet' THEN amount_cents_norm ELSE 0 END) / 100.0 as total_spend,
+    SUM(CASE WHEN transaction_type = 'win' THEN amount_cents_norm ELSE 0 END) / 100.0 as total_winnings,
+    SUM(CASE
+        WHEN transaction_type = 'win' THEN amount_cents_norm
+        WHEN transaction_type = 'bet' THEN -amount_cents_norm
+        ELSE 0
+    END) / 100.0 as net_amount,
+    COUNT(*) as transaction_count,
+    MAX(event_time) as last_transaction
+FROM TUMBLE(gaming_transactions, event_time, INTERVAL '5' MINUTE)
+GROUP BY member_id, window_start, window_end
+${emit_clause};
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS member_live_summary
+WITH (retention_seconds = ${live_retention}) AS
+SELECT
+    member_id,
+    window_start,
+    window_end,
+    SUM(CASE WHEN transaction_type = 'bet' THEN amount_cents_norm ELSE 0 END) / 100.0 as total_spend,
+    SUM(CASE WHEN transaction_type = 'win' THEN amount_cents_norm ELSE 0 END) / 100.0 as total_winnings,
+    SUM(CASE
+        WHEN transaction_type = 'win' THEN amount_cents_norm
+        WHEN transaction_type = 'bet' THEN -amount_cents_norm
+        ELSE 0
+    END) / 100.0 as net_amount,
+    COUNT(*) as transaction_count,
+    MAX(event_time) as last_transaction
+FROM TUMBLE(gaming_transactions, event_time, INTERVAL '5' MINUTE)
+GROUP BY member_id, window_start, window_end;
+
+-- Offer views: the only place member names are joined back in
+CREATE MATERIALIZED VIEW IF NOT EXISTS hotel_room_offers AS
+SELECT
+    s.member_id,
+    m.member_name,
+    s.total_spend,
+    s.transaction_count,
+    s.net_amount,
+    s.last_transaction,
+    s.window_start,
+    s.window_end,
+    '🏨 Complimentary Hotel Room (1 night)' as reward_type
+FROM member_daily_summary s
+LEFT JOIN members m ON s.member_id = m.member_id
+WHERE s.total_spend >= 5000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS drink_offers AS
+SELECT
+    s.member_id,
+    m.member_name,
+    s.total_spend,
+    s.transaction_count,
+    s.net_amount,
+    ABS(s.net_amount) as loss_amount,
+    s.last_transaction,
+    s.window_start,
+    s.window_end,
+    '🍹 Complimentary Premium Drink' as reward_type
+FROM member_daily_summary s
+LEFT JOIN members m ON s.member_id = m.member_id
+WHERE s.net_amount < 0
+  AND ABS(s.net_amount) >= 1000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS offer_events AS
+SELECT
+    member_id,
+    member_name,
+    'hotel' as offer_type,
+    reward_type,
+    total_spend as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end
+FROM hotel_room_offers
+UNION ALL
+SELECT
+    member_id,
+    member_name,
+    'drink' as offer_type,
+    reward_type,
+    loss_amount as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end
+FROM drink_offers;
+
+CREATE SINK IF NOT EXISTS offers_sink FROM offer_events
+WITH (
+    connector = 'kafka',
+    properties.bootstrap.server = 'redpanda:9092',
+    topic = 'offers',
+    primary_key = 'member_id,offer_type,window_start'
+) FORMAT UPSERT ENCODE JSON;
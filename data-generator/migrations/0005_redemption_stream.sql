@@ -0,0 +1,126 @@
+-- 0005: Redemptions as an event stream
+-- The dashboard produces redemptions to the 'redemptions' topic instead of
+-- running SELECT + INSERT round trips. redeemed_offers becomes a Kafka-backed
+-- table (direct INSERTs still work) and the primary key keeps the first
+-- redemption per member, offer type and day.
+
+CREATE TABLE IF NOT EXISTS redeemed_offers_stream (
+    member_id BIGINT NOT NULL,
+    member_name VARCHAR,
+    offer_type VARCHAR NOT NULL,  -- 'hotel' or 'drink'
+    redeemed_at TIMESTAMP NOT NULL,
+    redemption_date DATE NOT NULL,  -- Date portion for enforcing one-per-day
+    PRIMARY KEY (member_id, offer_type, redemption_date)
+) ON CONFLICT DO NOTHING
+WITH (
+    connector = 'kafka',
+    topic = 'redemptions',
+    properties.bootstrap.server = 'redpanda:9092',
+    scan.startup.mode = 'earliest'
+) FORMAT PLAIN ENCODE JSON;
+
+-- Drop the offer views first: after an interrupted run they may already read
+-- the swapped-in table, which could then not be dropped
+DROP SINK IF EXISTS offers_sink;
+DROP MATERIALIZED VIEW IF EXISTS offer_events;
+DROP MATERIALIZED VIEW IF EXISTS drink_offers;
+DROP MATERIALIZED VIEW IF EXISTS hotel_room_offers;
+
+-- Keep redemptions recorded so far, then swap the new table in under the old
+-- name. If a run stopped after the DROP, the rows are already in the stream
+-- table and only the rename is left.
+-- migrate: if-exists redeemed_offers
+INSERT INTO redeemed_offers_stream
+SELECT member_id, member_name, offer_type, redeemed_at, redemption_date
+FROM redeemed_offers;
+
+FLUSH;
+
+DROP TABLE IF EXISTS redeemed_offers;
+ALTER TABLE redeemed_offers_stream RENAME TO redeemed_offers;
+
+-- Offer views mark redeemed offers incrementally, so readers need no anti-join.
+-- An offer is redeemed if the member redeemed that offer type on the window's day.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS hotel_room_offers AS
+SELECT
+    s.member_id,
+    m.member_name,
+    s.total_spend,
+    s.transaction_count,
+    s.net_amount,
+    s.last_transaction,
+    s.window_start,
+    s.window_end,
+    '🏨 Complimentary Hotel Room (1 night)' as reward_type,
+    r.member_id IS NOT NULL as already_redeemed
+FROM member_daily_summary s
+LEFT JOIN members m ON s.member_id = m.member_id
+LEFT JOIN (
+    SELECT member_id, redemption_date
+    FROM redeemed_offers
+    WHERE offer_type = 'hotel'
+) r ON s.member_id = r.member_id AND s.window_start::date = r.redemption_date
+WHERE s.total_spend >= 5000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS drink_offers AS
+SELECT
+    s.member_id,
+    m.member_name,
+    s.total_spend,
+    s.transaction_count,
+    s.net_amount,
+    ABS(s.net_amount) as loss_amount,
+    s.last_transaction,
+    s.window_start,
+    s.window_end,
+    '🍹 Complimentary Premium Drink' as reward_type,
+    r.member_id IS NOT NULL as already_redeemed
+FROM member_daily_summary s
+LEFT JOIN members m ON s.member_id = m.member_id
+LEFT JOIN (
+    SELECT member_id, redemption_date
+    FROM redeemed_offers
+    WHERE offer_type = 'drink'
+) r ON s.member_id = r.member_id AND s.window_start::date = r.redemption_date
+WHERE s.net_amount < 0
+  AND ABS(s.net_amount) >= 1000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS offer_events AS
+SELECT
+    member_id,
+    member_name,
+    'hotel' as offer_type,
+    reward_type,
+    total_spend as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end,
+    already_redeemed
+FROM hotel_room_offers
+UNION ALL
+SELECT
+    member_id,
+    member_name,
+    'drink' as offer_type,
+    reward_type,
+    loss_amount as metric_value,
+    total_spend,
+    net_amount,
+    transaction_count,
+    last_transaction,
+    window_start,
+    window_end,
+    already_redeemed
+FROM drink_offers;
+
+CREATE SINK IF NOT EXISTS offers_sink FROM offer_events
+WITH (
+    connector = 'kafka',
+    properties.bootstrap.server = 'redpanda:9092',
+    topic = 'offers',
+    primary_key = 'member_id,offer_type,window_start'
+) FORMAT UPSERT ENCODE JSON;
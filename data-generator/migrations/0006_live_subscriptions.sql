@@ -0,0 +1,17 @@
+-- 0006: Subscriptions for the dashboard's live mirror
+-- The dashboard (DASHBOARD_BACKEND=subscribe) declares subscription cursors on
+-- these and applies the changelog to an in-memory copy instead of polling.
+-- Retention only needs to cover a dashboard reconnect.
+-- Later migrations that drop one of these views must drop its subscription first.
+
+CREATE SUBSCRIPTION IF NOT EXISTS hotel_room_offers_sub FROM hotel_room_offers
+WITH (retention = '1h');
+
+CREATE SUBSCRIPTION IF NOT EXISTS drink_offers_sub FROM drink_offers
+WITH (retention = '1h');
+
+CREATE SUBSCRIPTION IF NOT EXISTS member_live_summary_sub FROM member_live_summary
+WITH (retention = '1h');
+
+CREATE SUBSCRIPTION IF NOT EXISTS members_sub FROM members
+WITH (retention = '1h');
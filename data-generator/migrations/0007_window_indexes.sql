@@ -0,0 +1,14 @@
+-- 0007: window_start indexes for the dashboard's time-window filters
+-- member_daily_summary and the offer views are keyed by member_id first, so a
+-- window_start range (sidebar time window, last N history windows, watermark
+-- interval) scanned the whole view. These indexes are ordered by window_start
+-- and include every column, so those queries become range scans.
+
+CREATE INDEX IF NOT EXISTS idx_member_daily_summary_window_start
+ON member_daily_summary (window_start);
+
+CREATE INDEX IF NOT EXISTS idx_hotel_room_offers_window_start
+ON hotel_room_offers (window_start);
+
+CREATE INDEX IF NOT EXISTS idx_drink_offers_window_start
+ON drink_offers (window_start);
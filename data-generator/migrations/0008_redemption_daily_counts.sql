@@ -0,0 +1,19 @@
+-- 0008: Pre-aggregated redemption counts and a redeemed_at index
+-- The Fulfillment tab used to pull every redeemed_offers row to compute its
+-- summary metrics. redemption_daily_counts keeps one row per day instead, and
+-- the redeemed_at index turns the tab's date-bounded, keyset-paginated list
+-- into a range scan. Later migrations that drop redeemed_offers must drop this
+-- view first.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS redemption_daily_counts AS
+SELECT
+    redemption_date,
+    COUNT(*) as fulfilled,
+    SUM(CASE WHEN offer_type = 'hotel' THEN 1 ELSE 0 END) as hotel_fulfilled,
+    SUM(CASE WHEN offer_type = 'drink' THEN 1 ELSE 0 END) as drink_fulfilled,
+    COUNT(DISTINCT member_id) as unique_members
+FROM redeemed_offers
+GROUP BY redemption_date;
+
+CREATE INDEX IF NOT EXISTS idx_redeemed_offers_redeemed_at
+ON redeemed_offers (redeemed_at);
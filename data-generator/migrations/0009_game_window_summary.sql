@@ -0,0 +1,27 @@
+-- 0009: Per-game window aggregates for the Analytics trend charts
+-- member_daily_summary has no game dimension, and summing it per window for
+-- weeks of history would scan every member row. game_window_summary keeps one
+-- row per game and 5-minute window; the dashboard buckets it further in SQL so
+-- each chart gets a bounded number of points whatever the time range.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS game_window_summary ${summary_with} AS
+SELECT
+    game_type,
+    window_start,
+    window_end,
+    -- Sums run over integer cents; dollars only in the output projection
+    SUM(CASE WHEN transaction_type = 'bet' THEN amount_cents_norm ELSE 0 END) / 100.0 as revenue,
+    SUM(CASE WHEN transaction_type = 'win' THEN amount_cents_norm ELSE 0 END) / 100.0 as winnings,
+    -- House view: bets taken minus winnings paid
+    SUM(CASE
+        WHEN transaction_type = 'bet' THEN amount_cents_norm
+        WHEN transaction_type = 'win' THEN -amount_cents_norm
+        ELSE 0
+    END) / 100.0 as house_net,
+    COUNT(*) as transaction_count
+FROM TUMBLE(gaming_transactions, event_time, INTERVAL '5' MINUTE)
+GROUP BY game_type, window_start, window_end
+${emit_clause};
+
+CREATE INDEX IF NOT EXISTS idx_game_window_summary_window_start
+ON game_window_summary (window_start);
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Offers consumer - keeps the latest qualified offers per member in memory
+
+RisingWave pushes every new/updated offer to the 'offers' topic through an
+upsert sink (see migrations/0002_offers_sink.sql). This module subscribes once and keeps
+an in-memory view, so floor systems read offers without polling SQL.
+"""
+import argparse
+import json
+import threading
+from kafka import KafkaConsumer
+from config import KAFKA_BOOTSTRAP_SERVERS, OFFERS_TOPIC
+
+
+class OfferStore:
+    """Thread-safe latest offer per (member, offer type)"""
+
+    def __init__(self, on_change=None):
+        self._lock = threading.Lock()
+        # (member_id, offer_type) -> {window_start: offer dict}: every live
+        # window is kept, so retracting the latest one falls back to the previous
+        self._offers = {}
+        self._on_change = on_change  # Optional callback(key, value)
+        self.messages_consumed = 0
+
+    def apply(self, key, value):
+        """
+        Apply one upsert message from the offers topic
+
+        Args:
+            key: Decoded message key (member_id, offer_type, window_start)
+            value: Decoded offer dict, or None for a tombstone
+
+        Returns:
+            bool: True if the latest offer for the member and offer type changed
+        """
+        slot = (key['member_id'], key['offer_type'])
+
+        with self._lock:
+            self.messages_consumed += 1
+            windows = self._offers.setdefault(slot, {})
+            before = _most_recent(windows)
+
+            if value is None:
+                windows.pop(key['window_start'], None)
+            else:
+                windows[key['window_start']] = value
+            if not windows:
+                del self._offers[slot]
+
+            changed = _most_recent(windows) is not before
+
+        if changed and self._on_change is not None:
+            self._on_change(key, value)
+        return changed
+
+    def latest(self, member_id=None, offer_type=None):
+        """
+        Get latest offers, optionally filtered
+
+        Args:
+            member_id: Only offers for this member
+            offer_type: Only 'hotel' or 'drink' offers
+
+        Returns:
+            list: Offer dicts, most recent window first
+        """
+        with self._lock:
+            offers = [
+                _most_recent(windows) for (mid, otype), windows in self._offers.items()
+                if (member_id is None or mid == member_id)
+                and (offer_type is None or otype == offer_type)
+            ]
+        return sorted(offers, key=lambda o: o['window_end'], reverse=True)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._offers)
+
+
+def _most_recent(windows):
+    """Offer with the latest window_end among a slot's windows (None if empty)"""
+    return max(windows.values(), key=lambda o: o['window_end'], default=None)
+
+
+def _decode(raw):
+    """Decode a JSON message key/value (None stays None for tombstones)"""
+    return json.loads(raw.decode('utf-8')) if raw is not None else None
+
+
+def run_offers_consumer(store, bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS, stop_event=None):
+    """
+    Consume the offers topic into an OfferStore until stopped
+
+    Args:
+        store: OfferStore to update
+        bootstrap_servers: Kafka broker addresses
+        stop_event: threading.Event that ends the loop when set
+    """
+    consumer = KafkaConsumer(
+        OFFERS_TOPIC,
+        bootstrap_servers=bootstrap_servers,
+        auto_offset_reset='earliest',  # Rebuild the full view on every start
+        enable_auto_commit=False,
+        key_deserializer=_decode,
+        value_deserializer=_decode
+    )
+
+    try:
+        while stop_event is None or not stop_event.is_set():
+            batches = consumer.poll(timeout_ms=1000)
+            for messages in batches.values():
+                for message in messages:
+                    if message.key is not None:
+                        store.apply(message.key, message.value)
+    finally:
+        consumer.close()
+
+
+def main():
+    """Print offers as they arrive (standalone consumer)"""
+    parser = argparse.ArgumentParser(description='Casino offers consumer')
+    parser.add_argument(
+        '--broker',
+        type=str,
+        default='localhost:19092',
+        help='Kafka broker address (default: localhost:19092)'
+    )
+    args = parser.parse_args()
+
+    def print_change(key, value):
+        action = "🎁 offer" if value is not None else "↩️  retracted"
+        print(f"{action} {key['offer_type']:5} | member {key['member_id']} | window {key['window_start']}")
+
+    store = OfferStore(on_change=print_change)
+    print(f"📡 Consuming {OFFERS_TOPIC} from {args.broker}")
+
+    try:
+        run_offers_consumer(store, [args.broker])
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopped with {len(store)} live offers")
+
+
+if __name__ == '__main__':
+    main()
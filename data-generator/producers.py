@@ -5,8 +5,11 @@ import json
 import time
 import sys
 from kafka import KafkaProducer
-from casino_simulator import CasinoSimulator
-from config import KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC, EVENTS_PER_SECOND, GAMES, MEMBERS
+from casino_simulator import CasinoSimulator, transaction_amount, transaction_time_label
+from config import (
+    KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC, EVENTS_PER_SECOND, GAMES, MEMBERS, INCLUDE_MEMBER_NAME,
+    COMPACT_SCHEMA
+)
 
 
 def format_transaction_output(transaction):
@@ -23,20 +26,25 @@ def format_transaction_output(transaction):
     color = "\033[92m" if transaction['transaction_type'] == 'win' else "\033[94m"
     reset = "\033[0m"
 
-    return (f"{color}{emoji} {transaction['member_name']:20} | "
+    member = transaction.get('member_name', f"Member {transaction['member_id']}")
+
+    return (f"{color}{emoji} {member:20} | "
             f"{transaction['game_type']:10} | "
             f"{transaction['transaction_type']:5} | "
-            f"${transaction['amount']:8.2f} | "
-            f"{transaction['transaction_time']}{reset}")
+            f"${transaction_amount(transaction):8.2f} | "
+            f"{transaction_time_label(transaction)}{reset}")
 
 
-def run_kafka_producer(events_per_second=EVENTS_PER_SECOND, bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS):
+def run_kafka_producer(events_per_second=EVENTS_PER_SECOND, bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+                       include_member_name=INCLUDE_MEMBER_NAME, compact=COMPACT_SCHEMA):
     """
     Send transactions to Kafka/Redpanda in real-time
 
     Args:
         events_per_second: Rate of event generation
         bootstrap_servers: Kafka broker addresses
+        include_member_name: Send member_name in each event (False = slim events)
+        compact: Use the compact numeric schema (integer cents, epoch ms)
     """
     print(f"🎰 Starting Casino Gaming Transaction Generator")
     print(f"📡 Kafka: {bootstrap_servers}")
@@ -44,6 +52,8 @@ def run_kafka_producer(events_per_second=EVENTS_PER_SECOND, bootstrap_servers=KA
     print(f"⚡ Events per second: {events_per_second}")
     print(f"🎮 Games: {', '.join(GAMES.keys())}")
     print(f"👥 Members: {len(MEMBERS)}")
+    print(f"🏷️  Member names in events: {'yes' if include_member_name else 'no (members table)'}")
+    print(f"🔢 Schema: {'compact (cents, epoch ms)' if compact else 'standard (decimal, time string)'}")
     print("-" * 70)
 
     producer = KafkaProducer(
@@ -52,7 +62,7 @@ def run_kafka_producer(events_per_second=EVENTS_PER_SECOND, bootstrap_servers=KA
         acks='all'
     )
 
-    simulator = CasinoSimulator()
+    simulator = CasinoSimulator(include_member_name=include_member_name, compact=compact)
 
     try:
         while True:
@@ -75,17 +85,19 @@ def run_kafka_producer(events_per_second=EVENTS_PER_SECOND, bootstrap_servers=KA
         print("✅ Producer closed cleanly")
 
 
-def run_batch_mode(num_events=1000):
+def run_batch_mode(num_events=1000, include_member_name=INCLUDE_MEMBER_NAME, compact=COMPACT_SCHEMA):
     """
     Generate batch events and print to console (JSON format)
 
     Args:
         num_events: Number of events to generate
+        include_member_name: Include member_name in each event
+        compact: Use the compact numeric schema (integer cents, epoch ms)
     """
     print(f"🎰 Generating {num_events} casino transactions...")
     print("=" * 70)
 
-    simulator = CasinoSimulator()
+    simulator = CasinoSimulator(include_member_name=include_member_name, compact=compact)
 
     for i in range(num_events):
         transactions = simulator.generate_bet()
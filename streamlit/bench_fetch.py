@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark pd.read_sql_query vs the columnar fetch path
+
+Runs result sets shaped like the All Members and history queries (same column
+types: BIGINT ids, VARCHAR names, DECIMAL amounts, TIMESTAMP windows) at
+several sizes, generated server-side with generate_series, and times
+(a) pd.read_sql_query and (b) utils.columnar.fetch_frame. Also reports the
+resulting dtypes. Run with the same RISINGWAVE_* environment as the dashboard.
+"""
+import argparse
+import time
+import warnings
+import pandas as pd
+from utils import columnar
+from utils.db_pool import ConnectionPool
+
+SHAPES = {
+    'all_members': """
+    SELECT
+        (1001 + g % 100)::BIGINT as member_id,
+        'Member ' || (g % 100)::VARCHAR as member_name,
+        ((g % 100000) / 10.0)::DECIMAL as total_spend,
+        (g % 50)::BIGINT as transaction_count,
+        (((g % 20000) - 10000) / 10.0)::DECIMAL as net_amount,
+        TIMESTAMP '2025-01-01 00:00:00' + g * INTERVAL '1 second' as last_transaction,
+        CASE WHEN g % 7 = 0 THEN '🏨 Hotel Room' ELSE '❌ No Reward' END as reward_status
+    FROM generate_series(1, {rows}) as t(g)
+    """,
+    'history': """
+    SELECT
+        (1001 + g % 100)::BIGINT as member_id,
+        'Member ' || (g % 100)::VARCHAR as member_name,
+        ((g % 100000) / 10.0)::DECIMAL as total_spend,
+        (g % 50)::BIGINT as transaction_count,
+        (((g % 20000) - 10000) / 10.0)::DECIMAL as net_amount,
+        TIMESTAMP '2025-01-01 00:00:00' + g * INTERVAL '1 second' as last_transaction,
+        TIMESTAMP '2025-01-01 00:00:00' + (g / 100) * INTERVAL '5 minute' as window_start,
+        TIMESTAMP '2025-01-01 00:05:00' + (g / 100) * INTERVAL '5 minute' as window_end
+    FROM generate_series(1, {rows}) as t(g)
+    """,
+}
+
+
+def fetch_read_sql(conn, sql):
+    """Previous path: pandas builds the frame row by row"""
+    with warnings.catch_warnings():
+        # pandas warns about non-SQLAlchemy connections
+        warnings.simplefilter('ignore')
+        return pd.read_sql_query(sql, conn)
+
+
+def fetch_columnar(conn, sql):
+    """New path: cursor-scoped typecasters + one conversion per column"""
+    with conn.cursor() as cursor:
+        columnar.prepare_cursor(cursor)
+        cursor.execute(sql)
+        return columnar.fetch_frame(cursor)
+
+
+def best_of(fn, repeat):
+    """Best wall time in seconds over repeat runs, and the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """Main entry point for the fetch benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark read_sql_query vs columnar fetch')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Result sizes (default: 10000 100000 1000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best is reported (default: 3)')
+    args = parser.parse_args()
+
+    pool = ConnectionPool.from_env()
+    with pool.connection() as conn:
+        for shape, template in SHAPES.items():
+            for rows in args.rows:
+                sql = template.format(rows=rows)
+                old_seconds, old_df = best_of(lambda: fetch_read_sql(conn, sql), args.repeat)
+                new_seconds, new_df = best_of(lambda: fetch_columnar(conn, sql), args.repeat)
+                print(f"{shape:12} {rows:>9,} rows | read_sql_query {old_seconds:7.3f}s | "
+                      f"columnar {new_seconds:7.3f}s | {old_seconds / new_seconds:4.1f}x | "
+                      f"memory {old_df.memory_usage(deep=True).sum() / 1e6:6.1f} -> "
+                      f"{new_df.memory_usage(deep=True).sum() / 1e6:6.1f} MB")
+            print(f"{'':12} dtypes: " + ', '.join(f"{name}={dtype}" for name, dtype in new_df.dtypes.items()))
+    pool.close()
+
+
+if __name__ == '__main__':
+    main()
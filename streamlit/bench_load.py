@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Concurrent-viewer load test for the dashboard
+
+Starts `streamlit run app.py` (or targets a running server with --url) and
+connects N headless sessions over Streamlit's own WebSocket protocol, the way
+floor screens' browsers do. Each session runs the app, selects a view, and then
+replays the fragment auto-refresh timers the server announces (AutoRerun
+messages), so load follows the real REFRESH_INTERVALS. All sessions share one
+server process, as in production, so the query cache, shared snapshot and
+connection pool behave as they would on the floor.
+
+Streamlit's AppTest is not used: it swaps process-global runtime state on
+every run, so concurrent AppTests in one process race, and it never fires
+fragment timers.
+
+Reports rerun latency percentiles (full runs and fragment refreshes), database
+queries per second (from the server's METRICS_LOG_ALL query log, see
+utils/metrics.py), and server CPU and memory per session. Seed RisingWave
+first (data-generator: python generate.py --seed 42) so runs are comparable.
+Server CPU and memory are read from /proc (Linux).
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetStates
+from utils.metrics import percentile
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# Label of app.py's lazy-navigation radio
+VIEW_RADIO_LABEL = "View"
+
+
+class SessionStats:
+    """Latencies and counters shared by all sessions (one event loop, no locking needed)"""
+
+    def __init__(self):
+        self.full_ms = []
+        self.fragment_ms = []
+        self.skipped = 0   # fragment timers that fired while the session was still running
+        self.errors = 0    # timed-out or failed runs and exceptions shown by the app
+
+
+class Session:
+    """
+    One headless viewer
+
+    Args:
+        url: Server base URL (http://host:port)
+        view: View to select (None = app default)
+        stats: SessionStats to record into
+        timeout: Seconds to wait for a run to finish
+    """
+
+    def __init__(self, url, view, stats, timeout=60):
+        self.stream_url = url.replace('http', 'ws', 1).rstrip('/') + '/_stcore/stream'
+        self.view = view
+        self.stats = stats
+        self.timeout = timeout
+
+        self.conn = None
+        self.page_script_hash = ''
+        self.view_radio = None     # (widget id, options) from the first run
+        self.widget_states = None  # WidgetStates sent with every rerun
+        self.timers = {}           # fragment_id -> auto-rerun task
+        self.busy = asyncio.Lock()
+        self.finished = None       # Future resolved by script_finished
+
+    async def run(self, until, rerun_every=0):
+        """Connect, select the view, then keep refreshing until the loop time `until`"""
+        self.conn = await websocket_connect(self.stream_url, subprotocols=['streamlit'],
+                                            max_message_size=256 * 1024 * 1024)
+        reader = asyncio.ensure_future(self._read())
+        try:
+            await self.rerun()
+            if self.view is not None:
+                self._select_view()
+                await self.rerun()
+            loop = asyncio.get_running_loop()
+            while loop.time() < until:
+                if rerun_every:
+                    await asyncio.sleep(min(rerun_every, max(0, until - loop.time())))
+                    if loop.time() < until:
+                        await self.rerun()
+                else:
+                    await asyncio.sleep(max(0, until - loop.time()))
+        finally:
+            self._cancel_timers()
+            reader.cancel()
+            self.conn.close()
+
+    def _select_view(self):
+        """Widget state selecting self.view on the navigation radio"""
+        if self.view_radio is None:
+            raise RuntimeError("No view radio found: is lazy navigation on (DASHBOARD_LAZY_TABS)?")
+        widget_id, options = self.view_radio
+        matches = [index for index, option in enumerate(options) if self.view.lower() in option.lower()]
+        if not matches:
+            raise ValueError(f"Unknown view {self.view!r}; views: {', '.join(options)}")
+        self.widget_states = WidgetStates()
+        widget = self.widget_states.widgets.add()
+        widget.id = widget_id
+        widget.int_value = matches[0]
+
+    async def rerun(self, fragment_id=None):
+        """Request a full run (or one fragment's auto-rerun) and record its latency"""
+        async with self.busy:
+            msg = BackMsg()
+            state = msg.rerun_script
+            state.page_script_hash = self.page_script_hash
+            if self.widget_states is not None:
+                state.widget_states.CopyFrom(self.widget_states)
+            if fragment_id:
+                state.fragment_id = fragment_id
+                state.is_auto_rerun = True
+
+            self.finished = asyncio.get_running_loop().create_future()
+            started = time.perf_counter()
+            await self.conn.write_message(msg.SerializeToString(), binary=True)
+            try:
+                status = await asyncio.wait_for(self.finished, self.timeout)
+            except asyncio.TimeoutError:
+                self.stats.errors += 1
+                return
+            if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                self.stats.errors += 1
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            (self.stats.fragment_ms if fragment_id else self.stats.full_ms).append(elapsed_ms)
+
+    async def _read(self):
+        """Handle server messages: the view radio, fragment timers and run completion"""
+        while True:
+            payload = await self.conn.read_message()
+            if payload is None:
+                return
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session':
+                self.page_script_hash = msg.new_session.page_script_hash
+                if not msg.new_session.fragment_ids_this_run:
+                    # A full run re-registers every fragment, as in the browser
+                    self._cancel_timers()
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'radio' and element.radio.label == VIEW_RADIO_LABEL:
+                    self.view_radio = (element.radio.id, list(element.radio.options))
+                elif element_type == 'exception':
+                    self.stats.errors += 1
+            elif kind == 'auto_rerun':
+                fragment_id = msg.auto_rerun.fragment_id
+                if fragment_id in self.timers:
+                    self.timers[fragment_id].cancel()
+                self.timers[fragment_id] = asyncio.ensure_future(
+                    self._auto_rerun(fragment_id, msg.auto_rerun.interval)
+                )
+            elif kind == 'script_finished':
+                if self.finished is not None and not self.finished.done():
+                    self.finished.set_result(msg.script_finished)
+
+    async def _auto_rerun(self, fragment_id, interval):
+        """Fragment timer: rerun the fragment every interval seconds (skipped while busy)"""
+        while True:
+            await asyncio.sleep(interval)
+            if self.busy.locked():
+                self.stats.skipped += 1
+                continue
+            await self.rerun(fragment_id)
+
+    def _cancel_timers(self):
+        """Stop all fragment timers"""
+        for task in self.timers.values():
+            task.cancel()
+        self.timers.clear()
+
+
+class ServerMonitor:
+    """
+    Server process CPU and memory (from /proc) and its query log
+
+    The server runs with METRICS_LOG_ALL=true, so every database query is one
+    JSON line on its stderr (see utils/metrics.py).
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.queries = []  # (monotonic time, name, ms)
+        self.tail = []     # last non-metrics lines, for startup errors
+        self._reader = threading.Thread(target=self._read_log, name='server-log', daemon=True)
+        self._reader.start()
+
+    def _read_log(self):
+        """Drain the server's stderr, keeping query events"""
+        for line in self.process.stderr:
+            line = line.strip()
+            if line.startswith('{'):
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get('event') == 'query':
+                    self.queries.append((time.monotonic(), event.get('name'), event.get('ms', 0.0)))
+                continue
+            self.tail = (self.tail + [line])[-20:]
+
+    def cpu_seconds(self):
+        """User + system CPU seconds used by the server so far"""
+        with open(f"/proc/{self.process.pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def rss_bytes(self):
+        """Server resident memory"""
+        with open(f"/proc/{self.process.pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def queries_between(self, start, end):
+        """Query events logged in [start, end)"""
+        return [(name, ms) for at, name, ms in list(self.queries) if start <= at < end]
+
+
+def start_server(port, env_overrides):
+    """Launch `streamlit run app.py` headless and wait until it is healthy"""
+    env = {**os.environ, 'METRICS_LOG_ALL': 'true', **env_overrides}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP,
+         '--server.headless', 'true', '--server.port', str(port),
+         '--browser.gatherUsageStats', 'false'],
+        cwd=os.path.dirname(APP), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    monitor = ServerMonitor(process)
+    url = f"http://localhost:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited:\n" + '\n'.join(monitor.tail))
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return url, monitor
+        except OSError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+def latency_summary(values):
+    """p50 / p95 / max of a list of ms values (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {'count': len(ordered), 'p50_ms': percentile(ordered, 0.5), 'p95_ms': percentile(ordered, 0.95),
+            'max_ms': ordered[-1]}
+
+
+async def run_sessions(url, views, args):
+    """Run args.sessions sessions, connecting them over args.ramp seconds"""
+    stats = SessionStats()
+    loop = asyncio.get_running_loop()
+    until = loop.time() + args.duration
+
+    async def start(index):
+        await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+        view = views[index % len(views)] if views else None
+        await Session(url, view, stats, timeout=args.timeout).run(until, args.rerun_every)
+
+    results = await asyncio.gather(*(start(index) for index in range(args.sessions)), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, Exception)]
+    return stats, failures
+
+
+def main():
+    """Main entry point for the load test"""
+    parser = argparse.ArgumentParser(description='Concurrent-viewer load test for the dashboard')
+    parser.add_argument('--sessions', type=int, default=10, help='Concurrent sessions (default: 10)')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run (default: 60)')
+    parser.add_argument('--ramp', type=float, default=5, help='Seconds over which sessions connect (default: 5)')
+    parser.add_argument('--view', action='append',
+                        help='View to show (substring, e.g. Hotel); repeat to spread sessions across views '
+                             '(default: the app default view)')
+    parser.add_argument('--rerun-every', type=float, default=0,
+                        help='Also request a full rerun every N seconds per session, like interaction (default: off)')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for one run (default: 60)')
+    parser.add_argument('--port', type=int, default=8599, help='Port for the launched server (default: 8599)')
+    parser.add_argument('--url', help='Load an already running server instead (no server CPU/memory/query figures)')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Environment for the launched server, e.g. --env DASHBOARD_SNAPSHOT=false')
+    parser.add_argument('--json', help='Also write the results to this file (to compare runs)')
+    args = parser.parse_args()
+
+    monitor = None
+    if args.url:
+        url = args.url
+    else:
+        url, monitor = start_server(args.port, dict(item.split('=', 1) for item in args.env))
+
+    try:
+        # One warm-up session loads modules, pools and caches before measuring
+        warmup = SessionStats()
+        asyncio.run(Session(url, None, warmup, timeout=args.timeout).run(0))
+        baseline_rss = monitor.rss_bytes() if monitor else None
+        cpu_start = monitor.cpu_seconds() if monitor else None
+        started = time.monotonic()
+
+        stats, failures = asyncio.run(run_sessions(url, args.view, args))
+
+        elapsed = time.monotonic() - started
+        results = {
+            'sessions': args.sessions,
+            'views': args.view,
+            'duration_s': round(elapsed, 1),
+            'full_runs': latency_summary(stats.full_ms),
+            'fragment_reruns': latency_summary(stats.fragment_ms),
+            'skipped_timers': stats.skipped,
+            'errors': stats.errors,
+            'failed_sessions': len(failures),
+        }
+        if monitor:
+            queries = monitor.queries_between(started, time.monotonic())
+            by_name = Counter(name for name, _ in queries)
+            query_ms = sorted(ms for _, ms in queries)
+            final_rss = monitor.rss_bytes()
+            results.update({
+                'queries_per_s': len(queries) / elapsed,
+                'query_p95_ms': percentile(query_ms, 0.95) if query_ms else None,
+                'queries_per_s_by_name': {name: count / elapsed for name, count in by_name.most_common()},
+                'server_cpu_cores': (monitor.cpu_seconds() - cpu_start) / elapsed,
+                'server_rss_mb': final_rss / 1024 / 1024,
+                'rss_per_session_mb': (final_rss - baseline_rss) / 1024 / 1024 / args.sessions,
+            })
+    finally:
+        if monitor:
+            monitor.process.terminate()
+            monitor.process.wait(timeout=10)
+
+    print(f"Sessions: {args.sessions} | views: {', '.join(args.view) if args.view else 'default'} | "
+          f"{results['duration_s']}s")
+    for label, key in (('Full runs', 'full_runs'), ('Fragment reruns', 'fragment_reruns')):
+        summary = results[key]
+        if summary:
+            print(f"{label:16} {summary['count']:6,} | p50 {summary['p50_ms']:8.1f} ms | "
+                  f"p95 {summary['p95_ms']:8.1f} ms | max {summary['max_ms']:8.1f} ms")
+    print(f"{'Timers skipped':16} {stats.skipped:6,} (session still running) | errors {stats.errors:,} | "
+          f"failed sessions {len(failures):,}")
+    for failure in failures[:3]:
+        print(f"  {type(failure).__name__}: {failure}")
+    if monitor:
+        top = ', '.join(f"{name} {rate:.1f}/s" for name, rate in list(results['queries_per_s_by_name'].items())[:5])
+        p95 = results['query_p95_ms']
+        print(f"{'DB queries':16} {results['queries_per_s']:8.1f}/s | p95 "
+              f"{f'{p95:.1f} ms' if p95 is not None else '-'} | {top}")
+        print(f"{'Server CPU':16} {results['server_cpu_cores']:8.2f} cores")
+        print(f"{'Server memory':16} {results['server_rss_mb']:8.1f} MB RSS | "
+              f"{results['rss_per_session_mb']:.1f} MB per session")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark literal vs prepared execution of the hot dashboard queries
+
+For each query builder the dashboard calls on every rerun, runs the query
+repeatedly (a) as literal SQL, parsed and planned by RisingWave on every call,
+the way the f-string builders used to, and (b) as a server-side prepared
+statement via EXECUTE. The difference is the per-call parse + plan cost.
+Run with the same RISINGWAVE_* environment as the dashboard.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from utils import queries
+from utils.db_pool import ConnectionPool
+from utils.prepared import statement_name, to_positional
+
+
+def hot_queries(hotel_threshold, drink_threshold):
+    """Queries run on every dashboard rerun, with the dashboard's default arguments"""
+    now = datetime.now()
+    prev_end = now.replace(second=0, microsecond=0) - timedelta(minutes=now.minute % 5)
+    prev_start = prev_end - timedelta(minutes=5)
+    curr_end = prev_end + timedelta(minutes=5)
+    return [
+        queries.build_hotel_current_offers_query(hotel_threshold, prev_end, curr_end),
+        queries.build_hotel_closed_offers_query(hotel_threshold, prev_start, prev_end),
+        queries.build_drink_current_offers_query(drink_threshold, prev_end, curr_end),
+        queries.build_drink_closed_offers_query(drink_threshold, prev_start, prev_end),
+        queries.build_stats_query(),
+        queries.build_pending_offers_query(),
+    ]
+
+
+def time_calls(cursor, run, iterations):
+    """Run run(cursor) iterations times and return per-call latencies in ms"""
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run(cursor)
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def bench_query(conn, query, iterations):
+    """
+    Time one query literal vs prepared
+
+    Returns:
+        dict: literal_ms, prepared_ms (medians)
+    """
+    with conn.cursor() as cursor:
+        literal_sql = cursor.mogrify(query.sql, query.params or None)
+        literal = time_calls(cursor, lambda c: c.execute(literal_sql), iterations)
+
+        name = statement_name(query)
+        positional_sql, values = to_positional(query.sql, query.params or {})
+        cursor.execute(f"PREPARE {name} AS {positional_sql}")
+        placeholders = ', '.join(['%s'] * len(values))
+        execute_sql = f"EXECUTE {name}({placeholders})" if values else f"EXECUTE {name}"
+        prepared = time_calls(cursor, lambda c: c.execute(execute_sql, values or None), iterations)
+        cursor.execute(f"DEALLOCATE {name}")
+
+    return {'literal_ms': statistics.median(literal), 'prepared_ms': statistics.median(prepared)}
+
+
+def main():
+    """Main entry point for the query benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark literal vs prepared dashboard queries')
+    parser.add_argument('--iterations', type=int, default=200, help='Executions per query and mode (default: 200)')
+    parser.add_argument('--hotel-threshold', type=int, default=5000, help='Hotel threshold (default: 5000)')
+    parser.add_argument('--drink-threshold', type=int, default=1000, help='Drink threshold (default: 1000)')
+    args = parser.parse_args()
+
+    pool = ConnectionPool.from_env()
+    with pool.connection() as conn:
+        total_literal = total_prepared = 0.0
+        for query in hot_queries(args.hotel_threshold, args.drink_threshold):
+            result = bench_query(conn, query, args.iterations)
+            saving = (1 - result['prepared_ms'] / result['literal_ms']) * 100
+            total_literal += result['literal_ms']
+            total_prepared += result['prepared_ms']
+            print(f"{query.name:26} literal {result['literal_ms']:8.2f} ms | "
+                  f"prepared {result['prepared_ms']:8.2f} ms | {saving:+.1f}% saved")
+        saving = (1 - total_prepared / total_literal) * 100
+        print(f"{'Per rerun (sum of medians)':26} literal {total_literal:8.2f} ms | "
+              f"prepared {total_prepared:8.2f} ms | {saving:+.1f}% saved")
+    pool.close()
+
+
+if __name__ == '__main__':
+    main()
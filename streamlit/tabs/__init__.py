@@ -4,5 +4,7 @@ Dashboard tabs package
 from . import hotel_tab
 from . import drink_tab
 from . import fulfillment_tab
+from . import analytics_tab
+from . import members_tab
 
-__all__ = ['hotel_tab', 'drink_tab', 'fulfillment_tab']
+__all__ = ['hotel_tab', 'drink_tab', 'fulfillment_tab', 'analytics_tab', 'members_tab']
@@ -0,0 +1,183 @@
+"""
+Analytics Tab - Overall stats, reward eligibility, top spenders and trends
+"""
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+from utils import query_result, submit_query, timed_render, queries
+
+# Trend chart metrics: column -> (tab label, axis label)
+TREND_METRICS = {
+    'revenue': ("💰 Revenue", "Revenue ($)"),
+    'house_net': ("📈 House Net", "House Net ($)"),
+    'transaction_count': ("🎰 Transactions", "Transactions"),
+}
+
+
+def render(hotel_threshold, drink_threshold, since=None, refresh=None):
+    """
+    Render the Analytics tab
+
+    Args:
+        since: Earliest window_start to include (None = all time)
+        refresh: Seconds between fragment refreshes, keyed 'analytics'
+            (missing or None = refresh only on full reruns)
+    """
+    refresh = refresh or {}
+    st.header("📊 Analytics & Insights")
+
+    st.fragment(timed_render('analytics.insights', render_insights),
+                run_every=refresh.get('analytics'))(hotel_threshold, drink_threshold, since)
+
+
+def prefetch(hotel_threshold, drink_threshold, since=None):
+    """
+    Start this tab's queries without waiting for them
+
+    Returns:
+        tuple: Futures for the stats, reward eligibility, top spenders and trend results
+    """
+    return (
+        submit_query(queries.build_stats_query(since), cache='open'),
+        submit_query(queries.build_reward_query(hotel_threshold, drink_threshold, since), cache='open'),
+        submit_query(queries.build_top_spenders_query(since, limit=10), cache='open'),
+        submit_query(queries.build_game_trend_query(since), cache='open'),
+    )
+
+
+def render_insights(hotel_threshold, drink_threshold, since=None):
+    """Stats, reward eligibility, top spenders and trends"""
+    # Start all four queries, then render each panel as its result arrives
+    stats_future, reward_future, top_future, trend_future = prefetch(hotel_threshold, drink_threshold, since)
+
+    # Overall stats query
+    stats_df = query_result(stats_future)
+
+    # Aggregates are COALESCEd to 0 in SQL, so an empty window returns one row
+    # of zeros rather than no rows: test the transaction count
+    if not stats_df.empty and int(stats_df.iloc[0]['total_transactions']) > 0:
+        stats = stats_df.iloc[0]
+
+        total_members = int(stats['total_members'])
+        total_revenue = float(stats['total_revenue'])
+        total_transactions = int(stats['total_transactions'])
+        avg_spend = float(stats['avg_spend_per_member'])
+        winning_members = int(stats['winning_members'])
+        losing_members = int(stats['losing_members'])
+
+        # Metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("👥 Active Members", f"{total_members:,}")
+        with col2:
+            st.metric("💰 Total Revenue", f"${total_revenue:,.2f}")
+        with col3:
+            st.metric("🎰 Transactions", f"{total_transactions:,}")
+        with col4:
+            st.metric("📊 Avg Spend", f"${avg_spend:,.2f}")
+
+        st.markdown("---")
+
+        # Winning vs Losing
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("🎲 Win/Loss Distribution")
+            win_loss_data = {
+                'Status': ['Winners', 'Losers'],
+                'Count': [winning_members, losing_members]
+            }
+            fig = px.pie(
+                win_loss_data,
+                values='Count',
+                names='Status',
+                color='Status',
+                color_discrete_map={'Winners': '#00cc88', 'Losers': '#ff6b6b'},
+                hole=0.4
+            )
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.subheader("🎁 Reward Eligibility")
+            reward_df = query_result(reward_future)
+
+            if not reward_df.empty:
+                r = reward_df.iloc[0]
+                hotel_count = int(r['hotel_eligible'])
+                drink_count = int(r['drink_eligible'])
+                total_count = int(r['total'])
+                reward_data = {
+                    'Reward': ['Hotel Room', 'Free Drink', 'No Reward'],
+                    'Count': [
+                        hotel_count,
+                        drink_count,
+                        total_count - hotel_count - drink_count
+                    ]
+                }
+                fig = px.bar(
+                    reward_data,
+                    x='Reward',
+                    y='Count',
+                    color='Reward',
+                    color_discrete_map={
+                        'Hotel Room': '#FFD700',
+                        'Free Drink': '#FF6B6B',
+                        'No Reward': '#cccccc'
+                    }
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+        # Top spenders
+        st.subheader("🏆 Top 10 Spenders")
+        top_df = query_result(top_future)
+
+        if not top_df.empty:
+            fig = px.bar(
+                top_df,
+                x='member_name',
+                y='total_spend',
+                color='net_amount',
+                color_continuous_scale='RdYlGn',
+                labels={'total_spend': 'Total Spend ($)', 'member_name': 'Member'},
+                text='total_spend'
+            )
+            fig.update_traces(texttemplate='$%{text:,.0f}', textposition='outside')
+            fig.update_layout(showlegend=False)
+            st.plotly_chart(fig, use_container_width=True)
+
+        render_trends(trend_future)
+    else:
+        st.info("📊 No data yet. Start the data generator to see analytics!")
+
+
+def render_trends(trend_future):
+    """Revenue, house net and transaction trends per game and overall"""
+    st.subheader("📈 Trends by Game")
+    trend_df = query_result(trend_future)
+
+    if trend_df.empty:
+        st.info("No per-game windows yet.")
+        return
+
+    # Windows arrive already bucketed in SQL (at most TREND_MAX_POINTS per game),
+    # so the overall line is a sum over a handful of rows per bucket
+    bucket_seconds = int(trend_df['bucket_seconds'].iloc[0])
+    bucket = f"{bucket_seconds // 3600}-hour" if bucket_seconds % 3600 == 0 else f"{bucket_seconds // 60}-minute"
+    st.caption(f"Each point sums a {bucket} bucket (at most {queries.TREND_MAX_POINTS} points per line)")
+
+    overall = trend_df.groupby('bucket_start', as_index=False)[list(TREND_METRICS)].sum()
+    overall['game_type'] = 'All games'
+    series = pd.concat([overall, trend_df[['bucket_start', 'game_type', *TREND_METRICS]]], ignore_index=True)
+
+    tabs = st.tabs([label for label, _ in TREND_METRICS.values()])
+    for tab, (column, (_, axis_label)) in zip(tabs, TREND_METRICS.items()):
+        with tab:
+            fig = px.line(
+                series,
+                x='bucket_start',
+                y=column,
+                color='game_type',
+                labels={'bucket_start': 'Time', column: axis_label, 'game_type': 'Game'}
+            )
+            st.plotly_chart(fig, use_container_width=True)
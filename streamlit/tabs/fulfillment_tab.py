@@ -1,80 +1,162 @@
 """
 Fulfillment Tab - Shows unfulfilled offers (top) and fulfilled offers (bottom)
 """
+import io
+from collections import deque
 import streamlit as st
 import pandas as pd
-from utils import query_data, mark_offer_redeemed, check_offer_redeemed
 from datetime import datetime
+from utils import (
+    query_data,
+    query_result,
+    submit_query,
+    get_ready_live_store,
+    live_store,
+    mark_offers_redeemed,
+    FULFILLED_DATE_RANGES,
+    DEFAULT_FULFILLED_DATE_RANGE,
+    get_date_range_start,
+    timed_render,
+    queries
+)
+
+# Rows per database round trip when exporting CSV
+CSV_CHUNK_ROWS = 5000
+
+# Offer type filter label -> offer_type (None = all types)
+OFFER_TYPE_FILTERS = {
+    "All": None,
+    "🏨 Hotel Room": "hotel",
+    "🍹 Free Drink": "drink",
+}
+
+
+def render(refresh=None):
+    """
+    Render the Fulfillment tab
 
-
-def render():
-    """Render the Fulfillment tab"""
+    Args:
+        refresh: Seconds between fragment refreshes, keyed 'pending' and 'fulfilled'
+            (missing or None = refresh only on full reruns)
+    """
+    refresh = refresh or {}
     st.header("📋 Offer Fulfillment")
     st.markdown("**Track pending and fulfilled offers**")
 
+    # Both sections' queries run concurrently on full reruns
+    prefetch()
+
+    st.fragment(timed_render('fulfillment.pending', render_pending),
+                run_every=refresh.get('pending'))()
+    st.markdown("---")
+    st.fragment(timed_render('fulfillment.fulfilled', render_fulfilled),
+                run_every=refresh.get('fulfilled'))()
+
+
+def prefetch():
+    """Start this tab's queries without waiting for them"""
+    if get_ready_live_store() is None:
+        submit_query(queries.build_pending_offers_query(), cache='open')
+    prefetch_fulfilled()
+
+
+def offer_key(offer):
+    """Identity of a pending offer: (member_id, offer_type, window_end)"""
+    member_id, _, offer_type, _, _, window_end = offer
+    return member_id, offer_type, window_end
+
+
+def reset_editor():
+    """Rebuild the table widget: its edits are keyed by row position, which refreshes can shift"""
+    st.session_state['pending_editor_version'] = st.session_state.get('pending_editor_version', 0) + 1
+
+
+def update_selection(editor_key, offers):
+    """Data editor callback: record ticked / unticked offers by identity"""
+    selected = st.session_state.setdefault('selected_offers', {})
+    for position, change in st.session_state[editor_key].get('edited_rows', {}).items():
+        if 'Fulfill' not in change:
+            continue
+        offer = offers[int(position)]
+        if change['Fulfill']:
+            selected[offer_key(offer)] = offer
+        else:
+            selected.pop(offer_key(offer), None)
+    reset_editor()
+
+
+def select_offers(offers):
+    """Button callback: select every listed offer (an empty list clears the selection)"""
+    st.session_state['selected_offers'] = {offer_key(offer): offer for offer in offers}
+    reset_editor()
+
+
+def fulfill_selected():
+    """Button callback: fulfill all selected offers with one batched write"""
+    selected = st.session_state.get('selected_offers', {})
+    if not selected:
+        return
+    offers = list(selected.values())
+    # Filled from the Kafka producer thread; deque appends are thread-safe
+    undelivered = st.session_state.setdefault('undelivered_redemptions', deque())
+    if mark_offers_redeemed([(member_id, member_name, offer_type, window_start)
+                             for member_id, member_name, offer_type, _, window_start, _ in offers],
+                            on_undelivered=undelivered.append):
+        # Redemptions reach the offer views asynchronously; hide them until then
+        st.session_state.setdefault('submitted_offers', set()).update(selected)
+        names = ', '.join(f"{member_name} - {offer_display}" for _, member_name, _, offer_display, _, _ in offers[:5])
+        more = f" and {len(offers) - 5} more" if len(offers) > 5 else ""
+        st.session_state['fulfillment_notice'] = f"✓ Fulfilled {len(offers)} offer(s): {names}{more}"
+        selected.clear()
+    reset_editor()
+
+
+def render_pending():
+    """Pending (unredeemed) offers with multi-select and batched fulfillment"""
     # ====================
     # TOP SECTION: UNFULFILLED OFFERS (Haven't been redeemed)
     # ====================
     st.subheader("⏳ Pending Offers (Not Yet Fulfilled)")
     st.markdown("*These members qualify for offers but haven't redeemed them yet*")
 
-    # Get all qualifying members from hotel_room_offers and drink_offers
-    # Exclude those who already redeemed today
-    today_date = datetime.now().strftime('%Y-%m-%d')
-
-    unfulfilled_query = f"""
-    WITH latest_offers AS (
-        -- Get the latest/highest qualifying window for each member for hotel offers
-        (SELECT DISTINCT ON (member_id)
-            member_id,
-            member_name,
-            'hotel' as offer_type,
-            '🏨 Hotel Room' as offer_display,
-            total_spend as metric_value,
-            'Spend: $' || ROUND(total_spend, 2) as metric_label,
-            window_start,
-            window_end
-        FROM hotel_room_offers
-        ORDER BY member_id, window_end DESC, total_spend DESC)
-
-        UNION ALL
-
-        -- Get the latest/highest qualifying window for each member for drink offers
-        (SELECT DISTINCT ON (member_id)
-            member_id,
-            member_name,
-            'drink' as offer_type,
-            '🍹 Free Drink' as offer_display,
-            loss_amount as metric_value,
-            'Lost: $' || ROUND(loss_amount, 2) as metric_label,
-            window_start,
-            window_end
-        FROM drink_offers
-        ORDER BY member_id, window_end DESC, loss_amount DESC)
-    ),
-    redeemed_today AS (
-        SELECT DISTINCT member_id, offer_type
-        FROM redeemed_offers
-        WHERE redemption_date = '{today_date}'::date
-    )
-    SELECT
-        lo.member_id,
-        lo.member_name,
-        lo.offer_type,
-        lo.offer_display,
-        lo.metric_value,
-        lo.metric_label,
-        lo.window_start,
-        lo.window_end
-    FROM latest_offers lo
-    LEFT JOIN redeemed_today rt
-        ON lo.member_id = rt.member_id
-        AND lo.offer_type = rt.offer_type
-    WHERE rt.member_id IS NULL
-    ORDER BY lo.window_end DESC, lo.metric_value DESC
-    """
+    # Latest qualifying offer per member and type, excluding redeemed ones
+    unfulfilled_query = queries.build_pending_offers_query()
 
-    unfulfilled_df = query_data(unfulfilled_query)
+    store = get_ready_live_store()
+    if store is not None:
+        unfulfilled_df = live_store.pending_offers(store)
+    else:
+        unfulfilled_df = query_data(unfulfilled_query, cache='open')
+
+    # Redemptions reach the offer views asynchronously; skip offers fulfilled from this session
+    submitted = st.session_state.get('submitted_offers', set())
+    undelivered = st.session_state.get('undelivered_redemptions')
+    if undelivered:
+        # Kafka did not deliver these: list them as pending again
+        failed = []
+        while undelivered:
+            failed.append(undelivered.popleft())
+        failed_offers = {(redemption['member_id'], redemption['offer_type']) for redemption in failed}
+        submitted.difference_update([key for key in submitted if key[:2] in failed_offers])
+        names = ', '.join(sorted({str(redemption['member_name'] or redemption['member_id']) for redemption in failed}))
+        st.error(f"⚠️ {len(failed)} redemption(s) were not delivered ({names}). Please fulfill them again.")
+    if submitted:
+        pending_keys = set(zip(
+            unfulfilled_df['member_id'], unfulfilled_df['offer_type'], unfulfilled_df['window_end']
+        )) if not unfulfilled_df.empty else set()
+        # Offers no longer pending have landed in redeemed_offers (or aged out)
+        submitted.intersection_update(pending_keys)
+        if submitted:
+            keep = [
+                key not in submitted
+                for key in zip(unfulfilled_df['member_id'], unfulfilled_df['offer_type'],
+                               unfulfilled_df['window_end'])
+            ]
+            unfulfilled_df = unfulfilled_df[keep]
+
+    notice = st.session_state.pop('fulfillment_notice', None)
+    if notice:
+        st.success(notice)
 
     if not unfulfilled_df.empty:
         # Summary metrics for unfulfilled
@@ -93,153 +175,221 @@ def render():
 
         st.markdown("")
 
-        # Display unfulfilled offers with checkboxes (auto-fulfill when checked)
-        for idx, row in unfulfilled_df.iterrows():
-            col1, col2 = st.columns([0.5, 4.5])
-
-            with col1:
-                # Checkbox for selecting the offer - auto-fulfill when checked
-                checked = st.checkbox(
-                    "",
-                    key=f"check_{row['offer_type']}_{row['member_id']}_{idx}",
-                    label_visibility="collapsed",
-                    value=False
-                )
-
-                # When checked, immediately mark as fulfilled
-                if checked:
-                    if mark_offer_redeemed(row['member_id'], row['member_name'], row['offer_type']):
-                        st.success(f"✓ Fulfilled: {row['member_name']} - {row['offer_display']}")
-                        import time
-                        time.sleep(0.5)
-                        st.rerun()
-
-            with col2:
-                st.markdown(f"""
-                <div style="background-color: #fff3cd; padding: 15px; border-radius: 8px; margin-bottom: 10px; border-left: 5px solid #ffc107;">
-                    <h4 style="margin: 0; color: #856404;">{row['offer_display']} - {row['member_name']}</h4>
-                    <p style="margin: 5px 0 0 0; color: #856404;">
-                        <strong>Member ID:</strong> {row['member_id']} |
-                        <strong>{row['metric_label']}</strong> |
-                        <strong>Window:</strong> {pd.to_datetime(row['window_start']).strftime('%H:%M:%S')} - {pd.to_datetime(row['window_end']).strftime('%H:%M:%S')}
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+        # One editable table for all pending offers (scrolls virtually in the
+        # browser). Ticks only select; Fulfill Selected writes them in one batch.
+        offers = list(zip(
+            unfulfilled_df['member_id'], unfulfilled_df['member_name'], unfulfilled_df['offer_type'],
+            unfulfilled_df['offer_display'], unfulfilled_df['window_start'], unfulfilled_df['window_end']
+        ))
+        keys = [offer_key(offer) for offer in offers]
+
+        # The selection survives refreshes by identity; drop offers no longer pending
+        selected = st.session_state.setdefault('selected_offers', {})
+        for key in set(selected) - set(keys):
+            del selected[key]
+
+        table = pd.DataFrame({
+            'Fulfill': [key in selected for key in keys],
+            'Offer': unfulfilled_df['offer_display'].to_numpy(),
+            'Member Name': unfulfilled_df['member_name'].to_numpy(),
+            'Member ID': unfulfilled_df['member_id'].to_numpy(),
+            'Qualified With': unfulfilled_df['metric_label'].to_numpy(),
+            'Window': (pd.to_datetime(unfulfilled_df['window_start']).dt.strftime('%H:%M:%S') + ' - ' +
+                       pd.to_datetime(unfulfilled_df['window_end']).dt.strftime('%H:%M:%S')).to_numpy(),
+        })
+        editor_key = f"pending_editor_{st.session_state.get('pending_editor_version', 0)}"
+        st.data_editor(
+            table,
+            key=editor_key,
+            hide_index=True,
+            use_container_width=True,
+            disabled=[column for column in table.columns if column != 'Fulfill'],
+            column_config={
+                'Fulfill': st.column_config.CheckboxColumn('Fulfill', help="Tick to select the offer")
+            },
+            on_change=update_selection,
+            args=(editor_key, offers)
+        )
+
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            st.button("Select All", key="pending_select_all", on_click=select_offers, args=(offers,))
+        with col2:
+            st.button("Clear", key="pending_clear", on_click=select_offers, args=([],),
+                      disabled=not selected)
+        with col3:
+            st.button(f"✓ Fulfill Selected ({len(selected)})", key="pending_fulfill", type="primary",
+                      on_click=fulfill_selected, disabled=not selected)
     else:
         st.info("🎉 No pending offers - all qualifying offers have been fulfilled!")
 
-    st.markdown("---")
 
+def fulfilled_filters():
+    """(date_from, offer_type, member_search) from this session's filter widgets"""
+    date_range = st.session_state.get('fulfilled_date_range', DEFAULT_FULFILLED_DATE_RANGE)
+    offer_type = OFFER_TYPE_FILTERS[st.session_state.get('fulfilled_offer_filter', "All")]
+    member_search = st.session_state.get('fulfilled_member_search', '').strip() or None
+    return get_date_range_start(date_range), offer_type, member_search
+
+
+def fulfilled_cursors(filters):
+    """This session's keyset cursor stack (None = first page), reset when the filters change"""
+    if st.session_state.get('fulfilled_page_key') != filters:
+        st.session_state['fulfilled_page_key'] = filters
+        st.session_state['fulfilled_cursors'] = [None]
+    return st.session_state['fulfilled_cursors']
+
+
+def prefetch_fulfilled():
+    """
+    Start the Fulfilled Offers queries (summary, matching count, current page) without waiting
+
+    Returns:
+        tuple: Futures for the summary, count and page results
+    """
+    filters = fulfilled_filters()
+    date_from, offer_type, member_search = filters
+    cursors = fulfilled_cursors(filters)
+    return (
+        submit_query(queries.build_fulfilled_summary_query(date_from), cache='open'),
+        submit_query(queries.build_fulfilled_count_query(date_from, None, offer_type, member_search), cache='open'),
+        submit_query(queries.build_fulfilled_offers_query(date_from, None, offer_type, member_search,
+                                                          after=cursors[-1]), cache='open'),
+    )
+
+
+def render_fulfilled():
+    """Redeemed offers: date-bounded, filtered in SQL, one keyset page at a time"""
     # ====================
     # BOTTOM SECTION: FULFILLED OFFERS (Already redeemed)
     # ====================
     st.subheader("✅ Fulfilled Offers")
     st.markdown("*These members have already redeemed their offers*")
 
-    # Query all redeemed offers
-    fulfilled_query = """
-    SELECT
-        member_id,
-        member_name,
-        offer_type,
-        redeemed_at,
-        CASE
-            WHEN offer_type = 'hotel' THEN '🏨 Hotel Room'
-            WHEN offer_type = 'drink' THEN '🍹 Free Drink'
-            ELSE offer_type
-        END as offer_display
-    FROM redeemed_offers
-    ORDER BY redeemed_at DESC
-    """
-
-    fulfilled_df = query_data(fulfilled_query)
-
-    if not fulfilled_df.empty:
-        # Summary metrics for fulfilled
+    # Filters (applied in the queries below, so they come first)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        date_range = st.selectbox("Date Range", list(FULFILLED_DATE_RANGES),
+                                  index=list(FULFILLED_DATE_RANGES).index(DEFAULT_FULFILLED_DATE_RANGE),
+                                  key="fulfilled_date_range")
+    with col2:
+        st.selectbox("Filter by Offer Type", list(OFFER_TYPE_FILTERS), key="fulfilled_offer_filter")
+    with col3:
+        st.text_input("Search by Member Name", key="fulfilled_member_search")
+
+    filters = fulfilled_filters()
+    date_from, offer_type, member_search = filters
+    cursors = fulfilled_cursors(filters)
+
+    # Summary, count and page run concurrently
+    summary_future, count_future, page_future = prefetch_fulfilled()
+    summary_df = query_result(summary_future)
+    count_df = query_result(count_future)
+    page_df = query_result(page_future)
+
+    if page_df.empty and len(cursors) > 1:
+        # The page we were on emptied out: back to the start
+        del cursors[1:]
+        page_df = query_data(queries.build_fulfilled_offers_query(date_from, None, offer_type, member_search),
+                             cache='open')
+
+    # Summary metrics from the per-day pre-aggregates
+    if not summary_df.empty:
+        summary = summary_df.iloc[0]
         col1, col2, col3, col4 = st.columns(4)
-
-        total_fulfilled = len(fulfilled_df)
-        fulfilled_hotel = len(fulfilled_df[fulfilled_df['offer_type'] == 'hotel'])
-        fulfilled_drink = len(fulfilled_df[fulfilled_df['offer_type'] == 'drink'])
-        unique_members = fulfilled_df['member_id'].nunique()
-
         with col1:
-            st.metric("Total Fulfilled", total_fulfilled)
+            st.metric("Total Fulfilled", int(summary['fulfilled']))
         with col2:
-            st.metric("🏨 Hotel Rooms", fulfilled_hotel)
+            st.metric("🏨 Hotel Rooms", int(summary['hotel_fulfilled']))
         with col3:
-            st.metric("🍹 Drinks", fulfilled_drink)
+            st.metric("🍹 Drinks", int(summary['drink_fulfilled']))
         with col4:
-            st.metric("Unique Members", unique_members)
+            # Distinct per day: exact for one day, member-days over longer ranges
+            label = "Unique Members" if FULFILLED_DATE_RANGES[date_range] == 0 else "Member-Days"
+            st.metric(label, int(summary['unique_members']))
 
         st.markdown("")
 
-        # Filters
-        col1, col2 = st.columns(2)
+    if not page_df.empty:
+        if not count_df.empty:
+            st.markdown(f"**Showing {int(count_df['matching'].iloc[0]):,} fulfilled offer(s)**")
 
-        with col1:
-            offer_filter = st.selectbox(
-                "Filter by Offer Type",
-                ["All", "🏨 Hotel Room", "🍹 Free Drink"],
-                key="fulfilled_offer_filter"
-            )
+        has_next = len(page_df) > queries.FULFILLED_PAGE_SIZE
+        page_df = page_df.iloc[:queries.FULFILLED_PAGE_SIZE]
 
-        with col2:
-            member_search = st.text_input(
-                "Search by Member Name",
-                key="fulfilled_member_search"
-            )
-
-        # Apply filters
-        filtered_df = fulfilled_df.copy()
-
-        if offer_filter != "All":
-            offer_type_map = {
-                "🏨 Hotel Room": "hotel",
-                "🍹 Free Drink": "drink"
-            }
-            filtered_df = filtered_df[filtered_df['offer_type'] == offer_type_map[offer_filter]]
-
-        if member_search:
-            filtered_df = filtered_df[
-                filtered_df['member_name'].str.contains(member_search, case=False, na=False)
-            ]
+        st.dataframe(
+            fulfilled_display(page_df),
+            use_container_width=True,
+            hide_index=True
+        )
 
-        st.markdown(f"**Showing {len(filtered_df)} fulfilled offer(s)**")
-
-        # Display fulfilled table
-        if not filtered_df.empty:
-            # Format for display
-            display_df = filtered_df[[
-                'member_id', 'member_name', 'offer_display', 'redeemed_at'
-            ]].copy()
-            display_df.columns = ['Member ID', 'Member Name', 'Offer Type', 'Fulfilled At']
-
-            # Format datetime
-            display_df['Fulfilled At'] = pd.to_datetime(display_df['Fulfilled At']).dt.strftime('%Y-%m-%d %H:%M:%S')
-
-            st.dataframe(
-                display_df,
-                use_container_width=True,
-                hide_index=True
-            )
-
-            # Download button
-            csv = display_df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Fulfillment Report (CSV)",
-                data=csv,
-                file_name="fulfilled_offers_report.csv",
-                mime="text/csv"
-            )
-        else:
-            st.info("No fulfilled offers match your filters")
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀ Previous", key="fulfilled_prev", disabled=len(cursors) == 1, on_click=cursors.pop)
+        with col2:
+            first_row = (len(cursors) - 1) * queries.FULFILLED_PAGE_SIZE + 1
+            st.caption(f"Page {len(cursors)} | rows {first_row:,}-{first_row + len(page_df) - 1:,}")
+        with col3:
+            st.button("Next ▶", key="fulfilled_next", disabled=not has_next,
+                      on_click=cursors.append, args=(queries.fulfilled_cursor(page_df),))
 
+        render_fulfilled_export(filters)
+    elif offer_type or member_search:
+        st.info("No fulfilled offers match your filters")
     else:
-        st.info("No offers have been fulfilled yet")
+        st.info("No offers have been fulfilled in the selected date range")
         st.markdown("""
         **How to fulfill offers:**
         1. Qualifying offers will appear in the **Pending Offers** section above
-        2. Click the **✓ Fulfill** button next to each offer
-        3. Fulfilled offers will move to this section
+        2. Tick **Fulfill** on the offers to redeem (or **Select All**)
+        3. Click **✓ Fulfill Selected**; fulfilled offers will move to this section
         """)
+
+
+def fulfilled_display(df):
+    """Fulfilled offer rows with display column names and formatted timestamps"""
+    display_df = df[['member_id', 'member_name', 'offer_display', 'redeemed_at']].copy()
+    display_df.columns = ['Member ID', 'Member Name', 'Offer Type', 'Fulfilled At']
+    display_df['Fulfilled At'] = pd.to_datetime(display_df['Fulfilled At']).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return display_df
+
+
+def export_fulfilled_csv(filters, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Fulfilled offers matching the filters as CSV, read in keyset chunks
+
+    Returns:
+        bytes: UTF-8 CSV with a header row
+    """
+    date_from, offer_type, member_search = filters
+    buffer = io.StringIO()
+    after = None
+    while True:
+        chunk = query_data(queries.build_fulfilled_offers_query(
+            date_from, None, offer_type, member_search, limit=chunk_rows, after=after
+        ))
+        if chunk.empty:
+            break
+        fulfilled_display(chunk).to_csv(buffer, index=False, header=after is None)
+        if len(chunk) < chunk_rows:
+            break
+        after = queries.fulfilled_cursor(chunk)
+    return buffer.getvalue().encode('utf-8')
+
+
+def render_fulfilled_export(filters):
+    """CSV report of every matching offer, generated only when asked for"""
+    if st.button("📄 Prepare Fulfillment Report", key="fulfilled_export"):
+        with st.spinner("Exporting fulfilled offers..."):
+            st.session_state['fulfilled_csv'] = (filters, export_fulfilled_csv(filters),
+                                                 datetime.now().strftime('%Y%m%d_%H%M%S'))
+
+    export = st.session_state.get('fulfilled_csv')
+    if export is not None and export[0] == filters:
+        _, csv, exported_at = export
+        st.download_button(
+            label="📥 Download Fulfillment Report (CSV)",
+            data=csv,
+            file_name=f"fulfilled_offers_report_{exported_at}.csv",
+            mime="text/csv"
+        )
@@ -4,50 +4,92 @@ Hotel Room Offers Tab
 import streamlit as st
 from utils import (
     query_data,
+    submit_query,
+    get_ready_live_store,
+    live_store,
     mark_offer_redeemed,
     get_current_interval_bounds,
-    format_interval_label,
-    render_hotel_offer_card,
+    render_card_list,
+    offer_cards,
+    timed_render,
     queries
 )
 
 
-def render(hotel_threshold, time_filter="1=1", interval_seconds=300):
-    """Render the Hotel Room Offers tab"""
+def render(hotel_threshold, since=None, interval_seconds=300, refresh=None):
+    """
+    Render the Hotel Room Offers tab
+
+    Args:
+        since: Earliest window_start to show (None = all time)
+        refresh: Seconds between fragment refreshes, keyed 'current' and 'history'
+            (missing or None = refresh only on full reruns)
+    """
+    refresh = refresh or {}
     st.header("🏨 VIP Hotel Room Offers")
     interval_minutes = interval_seconds // 60
     st.markdown(f"**Threshold:** Members who spent **≥ ${hotel_threshold:,}** in any {interval_minutes}-minute window")
     st.markdown("**Policy:** Each customer can only enjoy 1 hotel offer per day")
 
+    st.fragment(timed_render('hotel.intervals', render_intervals),
+                run_every=refresh.get('current'))(hotel_threshold, since, interval_seconds)
+    st.markdown("---")
+    st.fragment(timed_render('hotel.history', render_history),
+                run_every=refresh.get('history'))(hotel_threshold, since, interval_seconds)
+
+
+def current_query(hotel_threshold, interval_seconds=300):
+    """Open interval progress query for this tab"""
+    curr_start, curr_end, _, _ = get_current_interval_bounds(interval_seconds)
+    return queries.build_hotel_current_offers_query(hotel_threshold, curr_start, curr_end)
+
+
+def closed_query(hotel_threshold, since=None, interval_seconds=300):
+    """Watermark interval and history query for this tab"""
+    _, _, prev_start, prev_end = get_current_interval_bounds(interval_seconds)
+    return queries.build_hotel_closed_offers_query(
+        hotel_threshold, prev_start, prev_end, since, interval_seconds=interval_seconds
+    )
+
+
+def prefetch(hotel_threshold, since=None, interval_seconds=300):
+    """Start this tab's queries without waiting for them"""
+    submit_query(current_query(hotel_threshold, interval_seconds), cache='open')
+    query = closed_query(hotel_threshold, since, interval_seconds)
+    submit_query(query, cache='closed', closes_at=query.params['prev_end'])
+
+
+def query_closed(hotel_threshold, since=None, interval_seconds=300):
+    """Watermark and history rows from one closed-window query (split client-side)"""
+    # Closed windows stay cached until evicted, so the history fragment and
+    # later refreshes reuse the result the intervals fragment fetched
+    query = closed_query(hotel_threshold, since, interval_seconds)
+    return queries.split_offer_buckets(query_data(query, cache='closed', closes_at=query.params['prev_end']))
+
+
+def render_intervals(hotel_threshold, since=None, interval_seconds=300):
+    """Current interval progress and last completed interval (refreshed often)"""
     # Get interval bounds
     curr_start, curr_end, prev_start, prev_end = get_current_interval_bounds(interval_seconds)
 
-    # Query for both current and watermark intervals
-    hotel_current_query = queries.build_hotel_watermark_query(hotel_threshold, curr_start, curr_end)
-    hotel_watermark_query = queries.build_hotel_watermark_query(hotel_threshold, prev_start, prev_end)
-    hotel_history_query = queries.build_hotel_history_query(hotel_threshold, prev_start, time_filter)
-
-    hotel_current_df = query_data(hotel_current_query)
-    hotel_watermark_df = query_data(hotel_watermark_query)
-    hotel_history_df = query_data(hotel_history_query)
+    # Render from the live mirror when subscribed, otherwise from the database
+    store = get_ready_live_store()
+    hotel_current_df = hotel_watermark_df = None
+    if store is not None:
+        hotel_current_df = live_store.live_progress(store, 'hotel', hotel_threshold, curr_start, curr_end)
+        if hotel_threshold >= queries.HOTEL_OFFER_MIN_SPEND:
+            hotel_watermark_df = live_store.offers_in_interval(store, 'hotel', hotel_threshold, prev_start, prev_end)
+    if hotel_current_df is None:
+        hotel_current_df = query_data(current_query(hotel_threshold, interval_seconds), cache='open')
+    if hotel_watermark_df is None:
+        hotel_watermark_df = query_closed(hotel_threshold, since, interval_seconds)[queries.WATERMARK_BUCKET]
 
     # Display current interval progress (who's accumulating now)
     st.info(f"⏱️ **Current Interval:** {curr_start.strftime('%H:%M:%S')} - {curr_end.strftime('%H:%M:%S')} | **{len(hotel_current_df) if not hotel_current_df.empty else 0} members** on track to qualify")
 
     if not hotel_current_df.empty:
         # Display member details for current watermark
-        for idx, row in hotel_current_df.iterrows():
-            st.markdown(f"""
-            <div style="background-color: #fff9e6; padding: 15px; border-radius: 8px; margin-bottom: 10px; border-left: 5px solid #ffc107;">
-                <h4 style="margin: 0; color: #856404;">🏨 {row['member_name']}</h4>
-                <p style="margin: 5px 0 0 0; color: #856404;">
-                    <strong>Member ID:</strong> {row['member_id']} |
-                    <strong>Spent:</strong> ${row['total_spend']:,.2f} |
-                    <strong>Transactions:</strong> {int(row['transaction_count'])} |
-                    <strong>Net:</strong> ${row['net_amount']:,.2f}
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+        render_card_list(hotel_current_df, "hotel_current", lambda page: offer_cards(page, 'hotel', live=True))
 
     st.markdown("---")
 
@@ -57,58 +99,31 @@ def render(hotel_threshold, time_filter="1=1", interval_seconds=300):
         st.caption(f"📺 {prev_start.strftime('%H:%M:%S')} - {prev_end.strftime('%H:%M:%S')}")
         st.info(f"💡 **{len(hotel_watermark_df)} members** qualified in the last interval. Visit the **Fulfillment** tab to redeem offers.")
 
-        # Display nice summary cards without buttons
-        for idx, row in hotel_watermark_df.iterrows():
-            is_redeemed = row.get('already_redeemed', False)
-            status_badge = "✅ Redeemed" if is_redeemed else "⏳ Pending"
-            status_color = "#d4edda" if is_redeemed else "#fff3cd"
-
-            st.markdown(f"""
-            <div style="background-color: {status_color}; padding: 15px; border-radius: 8px; margin-bottom: 10px; border-left: 5px solid #ffc107;">
-                <h4 style="margin: 0; color: #856404;">🏨 {row['member_name']} - {status_badge}</h4>
-                <p style="margin: 5px 0 0 0; color: #856404;">
-                    <strong>Member ID:</strong> {row['member_id']} |
-                    <strong>Spent:</strong> ${row['total_spend']:,.2f} |
-                    <strong>Transactions:</strong> {int(row['transaction_count'])} |
-                    <strong>Net:</strong> ${row['net_amount']:,.2f}
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Summary cards without buttons, one page at a time
+        render_card_list(hotel_watermark_df, "hotel_watermark", lambda page: offer_cards(page, 'hotel'))
 
-    st.markdown("---")
 
-    # History view in batches downward (last 3 windows only)
+def render_history(hotel_threshold, since=None, interval_seconds=300):
+    """Qualifying members from earlier windows (closed, refreshed rarely)"""
+    hotel_history_df = query_closed(hotel_threshold, since, interval_seconds)[queries.HISTORY_BUCKET]
+
+    # History view in batches downward (the query reads the last HISTORY_WINDOWS windows only)
     if not hotel_history_df.empty:
-        st.subheader("📜 Historical Qualifying Periods (last 3 windows)")
+        st.subheader(f"📜 Historical Qualifying Periods (last {queries.HISTORY_WINDOWS} windows)")
 
         # Group by 5-minute intervals
-        hotel_history_df['interval_label'] = hotel_history_df.apply(
-            lambda x: format_interval_label(x['window_start'], x['window_end']),
-            axis=1
+        hotel_history_df['interval_label'] = (
+            hotel_history_df['window_start'].dt.strftime('%H:%M:%S') + ' - ' +
+            hotel_history_df['window_end'].dt.strftime('%H:%M:%S')
         )
 
-        # Get unique intervals (most recent 3 only)
-        unique_intervals = hotel_history_df['interval_label'].unique()[:3]
+        # Unique intervals, most recent first
+        unique_intervals = hotel_history_df['interval_label'].unique()
 
         for interval_label in unique_intervals:
             interval_data = hotel_history_df[hotel_history_df['interval_label'] == interval_label]
 
             with st.expander(f"⏰ {interval_label} ({len(interval_data)} qualifying members)"):
-                for idx, row in interval_data.iterrows():
-                    is_redeemed = row.get('already_redeemed', False)
-                    status_badge = "✅ Redeemed" if is_redeemed else "⏳ Pending"
-                    status_color = "#d4edda" if is_redeemed else "#fff3cd"
-
-                    st.markdown(f"""
-                    <div style="background-color: {status_color}; padding: 15px; border-radius: 8px; margin-bottom: 10px; border-left: 5px solid #ffc107;">
-                        <h4 style="margin: 0; color: #856404;">🏨 {row['member_name']} - {status_badge}</h4>
-                        <p style="margin: 5px 0 0 0; color: #856404;">
-                            <strong>Member ID:</strong> {row['member_id']} |
-                            <strong>Spent:</strong> ${row['total_spend']:,.2f} |
-                            <strong>Transactions:</strong> {int(row['transaction_count'])} |
-                            <strong>Net:</strong> ${row['net_amount']:,.2f}
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_card_list(interval_data, f"hotel_history_{interval_label}", lambda page: offer_cards(page, 'hotel'))
     else:
         st.info("No historical data yet.")
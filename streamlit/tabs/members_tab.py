@@ -0,0 +1,157 @@
+"""
+All Members Tab - Complete member activity with reward status
+"""
+import io
+import numpy as np
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+from utils import query_data, query_result, submit_query, timed_render, queries
+
+# Rows per database round trip when exporting CSV
+CSV_CHUNK_ROWS = 5000
+
+# reward_status emoji -> row background
+REWARD_COLORS = {
+    '🏨': 'background-color: #fff4cc',
+    '🍹': 'background-color: #ffe6e6',
+}
+
+
+def render(hotel_threshold, drink_threshold, since=None, refresh=None):
+    """
+    Render the All Members tab
+
+    Args:
+        since: Earliest window_start to include (None = all time)
+        refresh: Seconds between fragment refreshes, keyed 'members'
+            (missing or None = refresh only on full reruns)
+    """
+    refresh = refresh or {}
+    st.header("👥 All Member Activity")
+
+    st.fragment(timed_render('members.table', render_members_table),
+                run_every=refresh.get('members'))(hotel_threshold, drink_threshold, since)
+    st.fragment(timed_render('members.export', render_export))(hotel_threshold, drink_threshold, since)
+
+
+def reward_styles(df):
+    """Row backgrounds by reward status, for Styler.apply(axis=None)"""
+    status = df['reward_status'].astype(str)
+    colors = np.select(
+        [status.str.contains(emoji, regex=False) for emoji in REWARD_COLORS],
+        list(REWARD_COLORS.values()),
+        default=''
+    )
+    return pd.DataFrame({column: colors for column in df.columns}, index=df.index)
+
+
+def page_cursors(hotel_threshold, drink_threshold, since=None):
+    """This session's keyset cursor stack (None = first page), reset when the filters change"""
+    # A new time window changes which rows come before a cursor, so the page
+    # number and row labels would no longer match
+    page_key = (hotel_threshold, drink_threshold, since)
+    if st.session_state.get('members_page_key') != page_key:
+        st.session_state['members_page_key'] = page_key
+        st.session_state['members_cursors'] = [None]
+    return st.session_state['members_cursors']
+
+
+def prefetch(hotel_threshold, drink_threshold, since=None):
+    """
+    Start this tab's queries (member count and the current page) without waiting
+
+    Returns:
+        tuple: Futures for the count and page results
+    """
+    cursors = page_cursors(hotel_threshold, drink_threshold, since)
+    return (
+        submit_query(queries.build_member_count_query(since), cache='open'),
+        submit_query(queries.build_all_members_query(hotel_threshold, drink_threshold, since, after=cursors[-1]),
+                     cache='open'),
+    )
+
+
+def render_members_table(hotel_threshold, drink_threshold, since=None):
+    """One keyset page of member activity with reward status"""
+    cursors = page_cursors(hotel_threshold, drink_threshold, since)
+
+    # The count and the page run concurrently
+    count_future, page_future = prefetch(hotel_threshold, drink_threshold, since)
+    page_df = query_result(page_future)
+    count_df = query_result(count_future)
+
+    if page_df.empty and len(cursors) > 1:
+        # The page we were on emptied out (e.g. data aged out): back to the start
+        del cursors[1:]
+        page_query = queries.build_all_members_query(hotel_threshold, drink_threshold, since)
+        page_df = query_data(page_query, cache='open')
+
+    if not page_df.empty:
+        if not count_df.empty:
+            st.metric("Total Members", int(count_df['total_members'].iloc[0]))
+
+        has_next = len(page_df) > queries.MEMBERS_PAGE_SIZE
+        page_df = page_df.iloc[:queries.MEMBERS_PAGE_SIZE]
+
+        # Format and style only this page, column-wise
+        styled_df = (page_df.style
+                     .apply(reward_styles, axis=None)
+                     .format({'total_spend': '${:,.2f}', 'net_amount': '${:,.2f}'}))
+        st.dataframe(styled_df, use_container_width=True, height=600)
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀ Previous", key="members_prev", disabled=len(cursors) == 1, on_click=cursors.pop)
+        with col2:
+            first_row = (len(cursors) - 1) * queries.MEMBERS_PAGE_SIZE + 1
+            st.caption(f"Page {len(cursors)} | rows {first_row:,}-{first_row + len(page_df) - 1:,}")
+        with col3:
+            st.button("Next ▶", key="members_next", disabled=not has_next,
+                      on_click=cursors.append, args=(queries.all_members_cursor(page_df),))
+    else:
+        st.info("No member activity in the selected time window.")
+
+
+def export_members_csv(hotel_threshold, drink_threshold, since=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    All member activity as CSV, read from the database in keyset chunks
+
+    Returns:
+        bytes: UTF-8 CSV with a header row
+    """
+    buffer = io.StringIO()
+    after = None
+    while True:
+        chunk = query_data(queries.build_all_members_query(
+            hotel_threshold, drink_threshold, since, limit=chunk_rows, after=after
+        ))
+        if chunk.empty:
+            break
+        chunk.to_csv(buffer, index=False, header=after is None)
+        if len(chunk) < chunk_rows:
+            break
+        after = queries.all_members_cursor(chunk)
+    return buffer.getvalue().encode('utf-8')
+
+
+def render_export(hotel_threshold, drink_threshold, since=None):
+    """CSV export, generated only when asked for"""
+    filters = (hotel_threshold, drink_threshold, since)
+    if st.button("📄 Prepare CSV Export", key="members_export"):
+        with st.spinner("Exporting member activity..."):
+            st.session_state['members_csv'] = (
+                filters,
+                export_members_csv(hotel_threshold, drink_threshold, since),
+                datetime.now().strftime('%Y%m%d_%H%M%S')
+            )
+
+    export = st.session_state.get('members_csv')
+    if export is not None and export[0] == filters:
+        _, csv, exported_at = export
+        st.download_button(
+            label="📥 Download CSV",
+            data=csv,
+            file_name=f"casino_members_{exported_at}.csv",
+            mime="text/csv"
+        )
@@ -0,0 +1,87 @@
+"""
+Connection pool error handling: cancelled statements vs broken connections
+"""
+import psycopg2
+import psycopg2.extensions
+import pytest
+from utils import db_utils
+from utils.db_pool import ConnectionPool
+
+
+class FakeConnection:
+    closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePool(ConnectionPool):
+    """Pool that hands out FakeConnections instead of connecting"""
+
+    def __init__(self):
+        super().__init__({}, max_size=2)
+        self.connections = []
+
+    def _open(self):
+        conn = FakeConnection()
+        self.connections.append(conn)
+        self.opened += 1
+        return conn
+
+
+def timed_out(conn):
+    raise psycopg2.extensions.QueryCanceledError("canceling statement due to statement timeout")
+
+
+def test_cancelled_query_keeps_connection():
+    pool = FakePool()
+    with pytest.raises(psycopg2.extensions.QueryCanceledError):
+        with pool.connection() as conn:
+            timed_out(conn)
+
+    assert pool.discarded == 0
+    with pool.connection() as conn:
+        assert conn is pool.connections[0]
+    assert pool.opened == 1
+
+
+def test_broken_connection_is_discarded():
+    pool = FakePool()
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection():
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    assert pool.discarded == 1
+    with pool.connection() as conn:
+        assert conn is pool.connections[1]
+
+
+def test_run_does_not_retry_cancelled_query(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(db_utils, 'get_pool', lambda: pool)
+    calls = []
+
+    def run(conn):
+        calls.append(conn)
+        timed_out(conn)
+
+    with pytest.raises(psycopg2.extensions.QueryCanceledError):
+        db_utils._run(run)
+    assert len(calls) == 1
+    assert pool.discarded == 0
+
+
+def test_run_retries_broken_connection(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(db_utils, 'get_pool', lambda: pool)
+    calls = []
+
+    def flaky(conn):
+        calls.append(conn)
+        if len(calls) == 1:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        return 'ok'
+
+    assert db_utils._run(flaky) == 'ok'
+    assert calls == pool.connections
+    assert pool.discarded == 1
@@ -2,14 +2,32 @@
 Utilities package for Casino VIP Rewards Dashboard
 """
 from .db_utils import (
+    DEFAULT_HOTEL_THRESHOLD,
+    DEFAULT_DRINK_THRESHOLD,
+    get_pool,
     get_connection,
+    get_query_cache,
+    get_live_store,
+    get_ready_live_store,
+    get_snapshot_poller,
+    get_metrics,
+    timed_render,
+    get_query_executor,
+    submit_query,
+    query_result,
     query_data,
     execute_query,
-    check_offer_redeemed,
-    mark_offer_redeemed
+    mark_offer_redeemed,
+    mark_offers_redeemed
 )
 from .time_utils import (
+    TIME_WINDOWS,
+    DEFAULT_TIME_WINDOW,
+    FULFILLED_DATE_RANGES,
+    DEFAULT_FULFILLED_DATE_RANGE,
     get_current_interval_bounds,
+    get_time_window_start,
+    get_date_range_start,
     format_interval_label
 )
 from .display_utils import (
@@ -17,26 +35,49 @@ from .display_utils import (
     render_hotel_offer_card,
     render_drink_offer_card,
     render_redeem_button,
-    render_history_batch
+    render_card_list,
+    offer_cards
 )
 from . import queries
+from . import live_store
 
 __all__ = [
     # Database utilities
+    'DEFAULT_HOTEL_THRESHOLD',
+    'DEFAULT_DRINK_THRESHOLD',
+    'get_pool',
     'get_connection',
+    'get_query_cache',
+    'get_live_store',
+    'get_ready_live_store',
+    'get_snapshot_poller',
+    'get_metrics',
+    'timed_render',
+    'get_query_executor',
+    'submit_query',
+    'query_result',
     'query_data',
     'execute_query',
-    'check_offer_redeemed',
     'mark_offer_redeemed',
+    'mark_offers_redeemed',
     # Time utilities
+    'TIME_WINDOWS',
+    'DEFAULT_TIME_WINDOW',
+    'FULFILLED_DATE_RANGES',
+    'DEFAULT_FULFILLED_DATE_RANGE',
     'get_current_interval_bounds',
+    'get_time_window_start',
+    'get_date_range_start',
     'format_interval_label',
     # Display utilities
     'get_custom_css',
     'render_hotel_offer_card',
     'render_drink_offer_card',
     'render_redeem_button',
-    'render_history_batch',
+    'render_card_list',
+    'offer_cards',
     # Query builders
     'queries',
+    # Live mirror views
+    'live_store',
 ]
@@ -0,0 +1,84 @@
+"""
+Columnar result fetch for dashboard queries
+
+pd.read_sql_query builds a Decimal and a datetime object per cell and then
+infers dtypes row by row. This path registers cursor-scoped typecasters so
+NUMERIC arrives as float and TIMESTAMP as its text form, then converts each
+column once: NumPy float64/int64 for numbers and vectorized datetime64 parsing
+for timestamps.
+"""
+import numpy as np
+import pandas as pd
+import psycopg2.extensions
+
+# PostgreSQL type OIDs (RisingWave reports the same ones)
+BOOL = 16
+INT8, INT2, INT4 = 20, 21, 23
+FLOAT4, FLOAT8 = 700, 701
+NUMERIC = 1700
+TIMESTAMP, TIMESTAMPTZ = 1114, 1184
+DATE = 1082
+
+FLOAT_TYPES = (FLOAT4, FLOAT8, NUMERIC)
+INT_TYPES = (INT2, INT4, INT8)
+DATETIME_TYPES = (TIMESTAMP, TIMESTAMPTZ, DATE)
+
+NUMERIC_AS_FLOAT = psycopg2.extensions.new_type(
+    (NUMERIC,), 'NUMERIC_AS_FLOAT', lambda value, cursor: float(value) if value is not None else None
+)
+DATETIME_AS_TEXT = psycopg2.extensions.new_type(
+    DATETIME_TYPES, 'DATETIME_AS_TEXT', lambda value, cursor: value
+)
+
+
+def prepare_cursor(cursor):
+    """Register the fast typecasters on this cursor only"""
+    psycopg2.extensions.register_type(NUMERIC_AS_FLOAT, cursor)
+    psycopg2.extensions.register_type(DATETIME_AS_TEXT, cursor)
+
+
+def _column(values, type_code):
+    """Convert one column of fetched values to a typed array"""
+    if type_code in FLOAT_TYPES:
+        # None becomes NaN
+        return np.array(values, dtype=np.float64)
+    if type_code in INT_TYPES:
+        if None in values:
+            return np.array(values, dtype=np.float64)
+        return np.array(values, dtype=np.int64)
+    if type_code in DATETIME_TYPES:
+        return pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', utc=type_code == TIMESTAMPTZ)
+    if type_code == BOOL and None not in values:
+        return np.array(values, dtype=bool)
+    return np.array(values, dtype=object)
+
+
+def _empty_column(type_code):
+    """Typed empty column so empty results keep their dtypes"""
+    if type_code in FLOAT_TYPES:
+        return np.array([], dtype=np.float64)
+    if type_code in INT_TYPES:
+        return np.array([], dtype=np.int64)
+    if type_code in DATETIME_TYPES:
+        return np.array([], dtype='datetime64[ns]')
+    return np.array([], dtype=object)
+
+
+def fetch_frame(cursor):
+    """
+    Build a DataFrame from an executed cursor (prepared with prepare_cursor)
+
+    Returns:
+        pd.DataFrame: float64 / int64 / datetime64 / object columns
+    """
+    description = cursor.description
+    rows = cursor.fetchall()
+    names = [column[0] for column in description]
+    if not rows:
+        return pd.DataFrame({name: _empty_column(column[1]) for name, column in zip(names, description)})
+
+    columns = list(zip(*rows))
+    data = {}
+    for name, column, values in zip(names, description, columns):
+        data[name] = _column(list(values), column[1])
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,183 @@
+"""
+Thread-safe, self-healing connection pool for RisingWave
+
+Connections are checked out per query, so concurrent dashboard sessions run
+their queries in parallel instead of queuing on one shared socket. Broken or
+stale connections are replaced transparently, and new connections are opened
+with exponential backoff so a RisingWave restart heals without an app restart.
+"""
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+import psycopg2
+import psycopg2.extensions
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that tracks the statements prepared on it"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """
+    LIFO pool of psycopg2 connections
+
+    Args:
+        dsn: Keyword arguments for psycopg2.connect
+        max_size: Maximum number of open connections
+        statement_timeout_ms: Per-statement timeout set on each new connection (0 = none)
+        idle_recycle_seconds: Idle connections older than this are closed and reopened
+        health_check_seconds: Idle connections older than this are pinged before reuse
+        checkout_timeout: Seconds to wait for a free connection
+        connect_retries: Connection attempts before giving up
+        backoff_base: First retry delay in seconds (doubled each attempt, capped at 5s)
+    """
+
+    def __init__(self, dsn, max_size=8, statement_timeout_ms=30000, idle_recycle_seconds=300,
+                 health_check_seconds=30, checkout_timeout=10, connect_retries=5, backoff_base=0.2):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.statement_timeout_ms = statement_timeout_ms
+        self.idle_recycle_seconds = idle_recycle_seconds
+        self.health_check_seconds = health_check_seconds
+        self.checkout_timeout = checkout_timeout
+        self.connect_retries = connect_retries
+        self.backoff_base = backoff_base
+
+        self._idle = deque()  # (connection, last_used) pairs, most recent on the right
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.opened = 0
+        self.discarded = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from RISINGWAVE_* and DB_POOL_* environment variables"""
+        dsn = {
+            'host': os.getenv('RISINGWAVE_HOST', 'localhost'),
+            'port': int(os.getenv('RISINGWAVE_PORT', 4566)),
+            'database': os.getenv('RISINGWAVE_DB', 'dev'),
+            'user': os.getenv('RISINGWAVE_USER', 'root'),
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+        }
+        return cls(
+            dsn,
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', 8)),
+            statement_timeout_ms=int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000)),
+            idle_recycle_seconds=float(os.getenv('DB_POOL_IDLE_RECYCLE_SECONDS', 300)),
+            health_check_seconds=float(os.getenv('DB_POOL_HEALTH_CHECK_SECONDS', 30)),
+            checkout_timeout=float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 10)),
+            connect_retries=int(os.getenv('DB_CONNECT_RETRIES', 5))
+        )
+
+    def _open(self):
+        """Open a new connection, retrying with exponential backoff"""
+        delay = self.backoff_base
+        for attempt in range(1, self.connect_retries + 1):
+            try:
+                conn = psycopg2.connect(connection_factory=PooledConnection, **self.dsn)
+                conn.autocommit = True
+                if self.statement_timeout_ms:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"SET statement_timeout = {int(self.statement_timeout_ms)}")
+                with self._lock:
+                    self.opened += 1
+                return conn
+            except psycopg2.OperationalError:
+                if attempt == self.connect_retries:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    def _discard(self, conn):
+        """Close a connection that should not be reused"""
+        with self._lock:
+            self.discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, idle_for):
+        """Check an idle connection before handing it out"""
+        if conn.closed:
+            return False
+        if idle_for < self.health_check_seconds:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        """Reuse a healthy idle connection or open a new one"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if idle_for < self.idle_recycle_seconds and self._is_healthy(conn, idle_for):
+                return conn
+            self._discard(conn)
+        return self._open()
+
+    def _checkin(self, conn):
+        """Return a connection to the pool"""
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of the block
+
+        Connections that fail with a connection-level error are discarded
+        rather than returned, so the next checkout opens a fresh one. A
+        cancelled statement (statement_timeout) leaves the connection usable.
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise PoolTimeout(f"No database connection free after {self.checkout_timeout}s")
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except psycopg2.extensions.QueryCanceledError:
+            # An OperationalError subclass, but the connection is fine: keep it
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            if conn is not None:
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                if conn.closed:
+                    self._discard(conn)
+                else:
+                    self._checkin(conn)
+            self._slots.release()
+
+    def stats(self):
+        """Pool counters for diagnostics"""
+        with self._lock:
+            idle = len(self._idle)
+        return {'max_size': self.max_size, 'idle': idle, 'opened': self.opened, 'discarded': self.discarded}
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._discard(conn)
@@ -2,80 +2,370 @@
 Database utilities for RisingWave connection and queries
 """
 import os
+import json
+import time
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 import streamlit as st
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 import pandas as pd
+from .db_pool import ConnectionPool
+from .query_cache import QueryCache, REDEMPTION_TABLES
+from .live_store import LiveStore
+from .snapshot import SnapshotPoller, snapshot_key
+from .metrics import Metrics, QUERY, RENDER
+from .queries import Query
+from . import prepared
+from . import columnar
+
+# 'kafka' produces redemptions to the redemptions topic (RisingWave ingests them
+# into redeemed_offers); 'sql' inserts directly over the shared connection
+REDEMPTION_SINK = os.getenv('REDEMPTION_SINK', 'sql')
+REDEMPTIONS_TOPIC = os.getenv('REDEMPTIONS_TOPIC', 'redemptions')
+
+# 'poll' runs SQL for every view; 'subscribe' keeps a live mirror of the offer
+# and live summary views from RisingWave subscriptions (utils/live_store.py)
+DASHBOARD_BACKEND = os.getenv('DASHBOARD_BACKEND', 'poll')
+
+# One background poller per process refreshes the default views for all sessions
+DASHBOARD_SNAPSHOT = os.getenv('DASHBOARD_SNAPSHOT', 'true').lower() in ('1', 'true', 'yes')
+DEFAULT_HOTEL_THRESHOLD = 5000
+DEFAULT_DRINK_THRESHOLD = 1000
 
 
 @st.cache_resource
+def get_pool():
+    """Process-wide RisingWave connection pool (shared by all sessions)"""
+    return ConnectionPool.from_env()
+
+
+@contextmanager
 def get_connection():
-    """Connect to RisingWave"""
-    return psycopg2.connect(
-        host=os.getenv('RISINGWAVE_HOST', 'localhost'),
-        port=int(os.getenv('RISINGWAVE_PORT', 4566)),
-        database=os.getenv('RISINGWAVE_DB', 'dev'),
-        user=os.getenv('RISINGWAVE_USER', 'root')
-    )
+    """Check out a pooled RisingWave connection for the duration of the block"""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def _run(fn, retries=1):
+    """Run fn(conn) on a pooled connection, retrying once if the connection broke"""
+    for attempt in range(retries + 1):
+        try:
+            with get_connection() as conn:
+                return fn(conn)
+        except psycopg2.extensions.QueryCanceledError:
+            # statement_timeout fired: retrying would only double the wait
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            if attempt == retries:
+                raise
+
+
+@st.cache_resource
+def get_live_store():
+    """Process-wide live mirror, or None when DASHBOARD_BACKEND is not 'subscribe'"""
+    if DASHBOARD_BACKEND != 'subscribe':
+        return None
+    return LiveStore.from_env().start()
+
+
+@st.cache_resource
+def get_snapshot_poller():
+    """Process-wide snapshot poller, or None when DASHBOARD_SNAPSHOT is off"""
+    if not DASHBOARD_SNAPSHOT:
+        return None
+    return SnapshotPoller(_timed_fetch, DEFAULT_HOTEL_THRESHOLD, DEFAULT_DRINK_THRESHOLD).start()
+
+
+def get_ready_live_store():
+    """Live mirror if enabled and its initial snapshot is loaded, else None"""
+    store = get_live_store()
+    return store if store is not None and store.ready else None
+
+
+@st.cache_resource
+def get_metrics():
+    """Process-wide query and render timings (see utils/metrics.py)"""
+    return Metrics.from_env()
+
+
+def timed_render(name, fn):
+    """fn wrapped to record each call as a render timing under name (e.g. for st.fragment)"""
+    @functools.wraps(fn)
+    def render(*args, **kwargs):
+        with get_metrics().timed(RENDER, name):
+            return fn(*args, **kwargs)
+    return render
+
+
+@st.cache_resource
+def get_query_cache():
+    """Process-wide query result cache (shared by all sessions)"""
+    return QueryCache.from_env()
+
+
+@st.cache_resource
+def get_query_executor():
+    """Process-wide thread pool for concurrent queries, one worker per pooled connection"""
+    return ThreadPoolExecutor(max_workers=get_pool().max_size, thread_name_prefix='query')
+
+
+# Queries running on the executor by (key, cache, closes_at): identical
+# requests, from this or another session, wait for the running query instead
+# of issuing it again. A request with another cache policy runs its own query,
+# so its result is cached under that policy.
+_inflight = {}
+_inflight_lock = threading.Lock()
 
 
-def query_data(query):
-    """Execute query and return DataFrame"""
+def _fetch_dataframe(conn, query):
+    """Run a (prepared) query and build a typed, columnar DataFrame from the result"""
+    with conn.cursor() as cursor:
+        columnar.prepare_cursor(cursor)
+        prepared.execute(cursor, query)
+        return columnar.fetch_frame(cursor)
+
+
+def _timed_fetch(query):
+    """Run a query on a pooled connection, recording its time, rows and bytes under its builder name"""
+    started = time.perf_counter()
     try:
-        conn = get_connection()
-        df = pd.read_sql_query(query, conn)
-        return df
+        df = _run(lambda conn: _fetch_dataframe(conn, query))
+    except Exception as e:
+        get_metrics().record(QUERY, query.name, time.perf_counter() - started, error=e)
+        raise
+    get_metrics().record_frame(query.name, time.perf_counter() - started, df)
+    return df
+
+
+def _lookup(key, cache):
+    """Result for key from the shared snapshot or (if cache) the query cache, else None"""
+    poller = get_snapshot_poller()
+    if poller is not None:
+        shared = poller.lookup(key)
+        if shared is not None:
+            return shared
+    if cache:
+        return get_query_cache().get(key)
+    return None
+
+
+def _fetch_and_store(query, key, cache, closes_at):
+    """Executor task: run the query and cache the result (no Streamlit calls here)"""
+    df = _timed_fetch(query)
+    if cache:
+        get_query_cache().put(key, df, policy=cache, closes_at=closes_at)
+    return df
+
+
+def submit_query(query, cache=None, closes_at=None):
+    """
+    Start a query on the executor and return a Future of its DataFrame
+
+    Served from the snapshot or cache when possible, and joined to an identical
+    query already running. Submit every query a panel needs before waiting on
+    any, and the round trips overlap. Arguments are as for query_data.
+    """
+    if isinstance(query, str):
+        query = Query(None, query, {})
+    key = snapshot_key(query)
+    df = _lookup(key, cache)
+    if df is not None:
+        future = Future()
+        future.set_result(df)
+        return future
+    return _start_or_join(query, key, cache, closes_at)
+
+
+def _start_or_join(query, key, cache, closes_at):
+    """Future for key: the identical query already running, or a newly submitted one"""
+    inflight_key = (key, cache, closes_at)
+    with _inflight_lock:
+        future = _inflight.get(inflight_key)
+        submitted = future is None
+        if submitted:
+            future = get_query_executor().submit(_fetch_and_store, query, key, cache, closes_at)
+            _inflight[inflight_key] = future
+    if submitted:
+        future.add_done_callback(lambda done: _forget_inflight(inflight_key, done))
+    return future
+
+
+def _forget_inflight(inflight_key, future):
+    """Done callback: stop sharing a finished query"""
+    with _inflight_lock:
+        if _inflight.get(inflight_key) is future:
+            del _inflight[inflight_key]
+
+
+def query_result(future):
+    """
+    Wait for a submitted query
+
+    Returns:
+        pd.DataFrame: The result (a copy: running queries are shared between
+            sessions), or an empty DataFrame after showing the error
+    """
+    try:
+        return future.result().copy()
     except Exception as e:
         st.error(f"Database error: {e}")
         return pd.DataFrame()
 
 
-def execute_query(query):
-    """Execute a query without returning results"""
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query)
-        conn.commit()
-        cursor.close()
+def query_data(query, cache=None, closes_at=None):
+    """
+    Execute query and return DataFrame
+
+    Args:
+        query: Query from utils.queries (prepared and run with bound
+            parameters), or plain SQL text
+        cache: None (always query), 'open' (short TTL, dropped at the window
+            boundary) or 'closed' (kept until evicted)
+        closes_at: For 'closed' queries, end of the latest window read
+    """
+    if isinstance(query, str):
+        query = Query(None, query, {})
+    key = snapshot_key(query)
+    df = _lookup(key, cache)
+    if df is not None:
+        return df
+    return query_result(_start_or_join(query, key, cache, closes_at))
+
+
+def execute_query(query, params=None):
+    """Execute a query with bound parameters without returning results"""
+    def execute(conn):
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
         return True
+
+    try:
+        with get_metrics().timed(QUERY, 'execute_query'):
+            return _run(execute)
     except Exception as e:
         st.error(f"Database error: {e}")
         return False
 
 
-def check_offer_redeemed(member_id, offer_type):
-    """Check if member has already redeemed an offer today"""
-    from datetime import datetime
-    today_date = datetime.now().strftime('%Y-%m-%d')
-
-    query = f"""
-    SELECT COUNT(*) as count
-    FROM redeemed_offers
-    WHERE member_id = {member_id}
-      AND offer_type = '{offer_type}'
-      AND redemption_date = '{today_date}'::date
+@st.cache_resource
+def get_redemption_producer():
+    """Kafka producer for redemption events (shared across sessions)"""
+    from kafka import KafkaProducer
+    return KafkaProducer(
+        bootstrap_servers=os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'localhost:19092').split(','),
+        key_serializer=lambda k: k.encode('utf-8'),
+        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+        linger_ms=5,
+        # send() only blocks while the broker is unreachable; fail fast instead
+        max_block_ms=2000
+    )
+
+
+def produce_redemptions(redemptions, on_undelivered=None):
+    """
+    Queue redemption events without waiting for delivery
+
+    The producer's I/O thread delivers them in the background (and flushes
+    whatever is left when the process exits).
+
+    Args:
+        redemptions: Redemption dicts
+        on_undelivered: Called from the producer thread with each redemption
+            whose delivery failed
     """
-    result = query_data(query)
-    if not result.empty and result.iloc[0]['count'] > 0:
+    try:
+        producer = get_redemption_producer()
+        for redemption in redemptions:
+            key = f"{redemption['member_id']}:{redemption['offer_type']}:{redemption['redemption_date']}"
+            future = producer.send(REDEMPTIONS_TOPIC, key=key, value=redemption)
+            if on_undelivered is not None:
+                future.add_errback(lambda error, redemption=redemption: on_undelivered(redemption))
         return True
-    return False
+    except Exception as e:
+        st.error(f"Kafka error: {e}")
+        return False
 
 
-def mark_offer_redeemed(member_id, member_name, offer_type):
-    """Mark an offer as redeemed (prevents duplicates via check)"""
-    from datetime import datetime
-    now = datetime.now()
-    redeemed_at = now.strftime('%Y-%m-%d %H:%M:%S')
-    redemption_date = now.strftime('%Y-%m-%d')
+def insert_redemptions(redemptions):
+    """Insert redemptions with one multi-row INSERT (one statement, one commit)"""
+    def insert(conn):
+        with conn.cursor() as cursor:
+            psycopg2.extras.execute_values(
+                cursor,
+                """
+                INSERT INTO redeemed_offers (member_id, member_name, offer_type, redeemed_at, redemption_date)
+                VALUES %s
+                """,
+                redemptions,
+                template="(%(member_id)s, %(member_name)s, %(offer_type)s, %(redeemed_at)s, %(redemption_date)s)",
+                page_size=len(redemptions)
+            )
+        return True
 
-    # First check if already redeemed today (prevents duplicates)
-    if check_offer_redeemed(member_id, offer_type):
-        st.warning(f"Already redeemed {offer_type} offer today!")
+    try:
+        with get_metrics().timed(QUERY, 'insert_redemptions'):
+            return _run(insert)
+    except Exception as e:
+        st.error(f"Database error: {e}")
         return False
 
-    # Insert only if not already redeemed (primary key will prevent duplicates)
-    query = f"""
-    INSERT INTO redeemed_offers (member_id, member_name, offer_type, redeemed_at, redemption_date)
-    VALUES ({member_id}, '{member_name}', '{offer_type}', '{redeemed_at}', '{redemption_date}')
+
+def mark_offers_redeemed(offers, on_undelivered=None):
+    """
+    Mark several offers as redeemed with one batched write
+
+    The redeemed_offers primary key (member_id, offer_type, redemption_date)
+    and its ON CONFLICT DO NOTHING keep only the first redemption per member,
+    offer type and day, so nothing is checked first and repeats are harmless.
+
+    redemption_date is the day of the offer's window, not of the click: the
+    offer views match redemptions on it, so an offer from a late-evening
+    window redeemed after midnight is still marked redeemed (and uses up that
+    day's offer).
+
+    Args:
+        offers: Iterable of (member_id, member_name, offer_type, window_start),
+            window_start being the offer window's start (None = today)
+        on_undelivered: With REDEMPTION_SINK=kafka, called (from another thread)
+            with each redemption dict that was queued but not delivered
+
+    Returns:
+        bool: True if the batch was written (or, with Kafka, queued)
     """
-    return execute_query(query)
+    from datetime import datetime
+    now = datetime.now()
+    redemptions = {}
+    for member_id, member_name, offer_type, window_start in offers:
+        offer_day = (now if window_start is None else pd.Timestamp(window_start)).strftime('%Y-%m-%d')
+        redemptions[(int(member_id), offer_type, offer_day)] = {
+            'member_id': int(member_id),
+            'member_name': member_name,
+            'offer_type': offer_type,
+            'redeemed_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'redemption_date': offer_day
+        }
+    if not redemptions:
+        return True
+
+    if REDEMPTION_SINK == 'kafka':
+        ok = produce_redemptions(list(redemptions.values()), on_undelivered)
+    else:
+        ok = insert_redemptions(list(redemptions.values()))
+
+    if ok:
+        # The redemptions reach the offer views asynchronously; keep their results
+        # short-lived until they have settled
+        get_query_cache().invalidate(REDEMPTION_TABLES, settle_seconds=10)
+        poller = get_snapshot_poller()
+        if poller is not None:
+            poller.invalidate(REDEMPTION_TABLES)
+    return ok
+
+
+def mark_offer_redeemed(member_id, member_name, offer_type, window_start=None):
+    """Mark one offer as redeemed (see mark_offers_redeemed)"""
+    return mark_offers_redeemed([(member_id, member_name, offer_type, window_start)])
@@ -1,8 +1,28 @@
 """
 Display and UI utilities for Streamlit dashboard
 """
+import html
+import math
+import pandas as pd
 import streamlit as st
-import time
+
+# Cards per page in render_card_list
+CARD_PAGE_SIZE = 50
+
+# Card fields and colors per offer type. 'live' colors are for members still
+# accumulating in the open interval, the others for qualified offers by status.
+OFFER_CARD_STYLES = {
+    'hotel': {
+        'emoji': '🏨', 'metric': ('total_spend', 'Spent'), 'extra': ('net_amount', 'Net'),
+        'border': '#ffc107', 'color': '#856404', 'pending': '#fff3cd', 'redeemed': '#d4edda',
+        'live': ('#fff9e6', '#ffc107', '#856404'),
+    },
+    'drink': {
+        'emoji': '🍹', 'metric': ('loss_amount', 'Lost'), 'extra': ('total_spend', 'Total Spent'),
+        'border': '#dc3545', 'color': '#721c24', 'pending': '#ffe6e6', 'redeemed': '#d4edda',
+        'live': ('#e7f3ff', '#2196F3', '#0d47a1'),
+    },
+}
 
 
 def get_custom_css():
@@ -146,26 +166,101 @@ def render_redeem_button(member_id, member_name, offer_type, key_prefix, mark_of
     if st.button(f"✓ Mark as Redeemed", key=f"{key_prefix}_{member_id}"):
         if mark_offer_redeemed_func(member_id, member_name, offer_type):
             st.success(f"{offer_type.title()} offer marked as redeemed for {member_name}!")
-            time.sleep(1)
-            st.rerun()
             return True
     return False
 
 
-def render_history_batch(interval_data, offer_type='hotel'):
+def money(values):
+    """Format a numeric Series as $1,234.56 strings"""
+    return '$' + values.astype(float).map('{:,.2f}'.format)
+
+
+def offer_cards(df, offer_type, live=False):
     """
-    Render a history batch for an interval
+    HTML for one offer card per row, built column-wise over the whole frame
 
     Args:
-        interval_data: DataFrame with data for this interval
+        df: Offer rows (member_name, member_id, transaction_count, the offer
+            type's metric columns and, unless live, already_redeemed)
         offer_type: 'hotel' or 'drink'
+        live: Open-interval progress cards (no status badge)
+
+    Returns:
+        pd.Series: One HTML string per row
+    """
+    style = OFFER_CARD_STYLES[offer_type]
+    (metric, metric_label), (extra, extra_label) = style['metric'], style['extra']
+    title = style['emoji'] + ' ' + df['member_name'].astype(str).map(html.escape)
+    if live:
+        background, border, color = style['live']
+    else:
+        if 'already_redeemed' in df:
+            redeemed = df['already_redeemed'].fillna(False).astype(bool)
+        else:
+            redeemed = pd.Series(False, index=df.index)
+        title = title + redeemed.map({True: ' - ✅ Redeemed', False: ' - ⏳ Pending'})
+        background = redeemed.map({True: style['redeemed'], False: style['pending']})
+        border, color = style['border'], style['color']
+    details = (
+        '<strong>Member ID:</strong> ' + df['member_id'].astype(str)
+        + ' | <strong>' + metric_label + ':</strong> ' + money(df[metric])
+        + ' | <strong>Transactions:</strong> ' + df['transaction_count'].astype(int).astype(str)
+        + ' | <strong>' + extra_label + ':</strong> ' + money(df[extra])
+    )
+    return card_html(title, details, background, border, color)
+
+
+def card_html(titles, details, background, border, color):
+    """
+    HTML for a column of cards (Series in, Series out; scalars broadcast)
+
+    Args:
+        titles: Card headings (already escaped)
+        details: Card body HTML
+        background: Background color, scalar or per-row Series
+        border: Left border color
+        color: Text color
+    """
+    return (
+        '<div style="background-color: ' + background + '; padding: 15px; border-radius: 8px; '
+        'margin-bottom: 10px; border-left: 5px solid ' + border + ';">'
+        '<h4 style="margin: 0; color: ' + color + ';">' + titles + '</h4>'
+        '<p style="margin: 5px 0 0 0; color: ' + color + ';">' + details + '</p></div>'
+    )
+
+
+def render_card_list(df, key, cards, page_size=CARD_PAGE_SIZE, max_height=640):
     """
-    for idx, row in interval_data.iterrows():
-        if offer_type == 'hotel':
-            st.markdown(f"""
-            - **{row['member_name']}** (ID: {row['member_id']}) - Spent: ${row['total_spend']:,.2f} | Transactions: {int(row['transaction_count'])} | Net: ${row['net_amount']:,.2f}
-            """)
-        else:  # drink
-            st.markdown(f"""
-            - **{row['member_name']}** (ID: {row['member_id']}) - Lost: ${row['loss_amount']:,.2f} | Transactions: {int(row['transaction_count'])} | Total Spent: ${row['total_spend']:,.2f}
-            """)
+    Render a DataFrame as cards in a single element, one page at a time
+
+    Only the current page's HTML is built and sent, inside one scrollable
+    container, so render cost stays flat however many rows qualify.
+
+    Args:
+        df: Rows to render
+        key: Unique widget key for the page selector
+        cards: Callable(page DataFrame) -> Series of card HTML (e.g. offer_cards)
+        page_size: Cards per page
+        max_height: Container height in pixels before it scrolls
+    """
+    total = len(df)
+    if total == 0:
+        return
+    pages = math.ceil(total / page_size)
+    page = 1
+    if pages > 1:
+        # Label and bounds must not depend on the row count: Streamlit would
+        # treat a changed widget as new and reset the chosen page to 1
+        page_key = f"{key}_page"
+        if st.session_state.get(page_key, 1) > pages:
+            st.session_state[page_key] = pages
+        page = st.number_input("Page", min_value=1, step=1, key=page_key)
+    start = (int(page) - 1) * page_size
+    page_df = df.iloc[start:start + page_size]
+
+    st.markdown(
+        f'<div style="max-height: {max_height}px; overflow-y: auto;">{"".join(cards(page_df))}</div>',
+        unsafe_allow_html=True
+    )
+    if pages > 1:
+        st.caption(f"Page {int(page)} of {pages} · showing {start + 1}-{start + len(page_df)} of {total}")
@@ -0,0 +1,299 @@
+"""
+Push-based live mirror of the offer and summary views
+
+With DASHBOARD_BACKEND=subscribe, one background thread per process declares
+RisingWave subscription cursors (see migrations/0006_live_subscriptions.sql),
+loads a snapshot of each relation and then applies only the changed rows from
+the changelog. Tabs filter the in-memory copy instead of re-querying, so new
+offers show up within the cursor poll interval.
+"""
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+import psycopg2
+
+# relation -> primary key columns
+RELATIONS = {
+    'hotel_room_offers': ('member_id', 'window_start', 'window_end'),
+    'drink_offers': ('member_id', 'window_start', 'window_end'),
+    'member_live_summary': ('member_id', 'window_start', 'window_end'),
+    'members': ('member_id',),
+}
+
+# Relations keyed by window: only windows within the history span are mirrored
+WINDOWED = tuple(relation for relation, key in RELATIONS.items() if 'window_start' in key)
+
+# Columns added by FETCH on a subscription cursor
+CHANGELOG_COLUMNS = ('op', 'rw_timestamp')
+
+# Numeric op codes used by some RisingWave versions instead of op names
+OP_CODES = {1: 'insert', 2: 'delete', 3: 'updatedelete', 4: 'updateinsert'}
+
+
+class LiveStore:
+    """
+    In-memory copy of RELATIONS maintained from subscription cursors
+
+    Args:
+        dsn: Keyword arguments for psycopg2.connect (a dedicated connection:
+            subscription cursors are bound to their session)
+        fetch_size: Maximum changes fetched per cursor per round
+        poll_interval: Seconds to wait when no cursor returned changes
+        history_seconds: Windows of WINDOWED relations starting longer ago than
+            this are not loaded, and are dropped as changes arrive
+    """
+
+    def __init__(self, dsn, fetch_size=500, poll_interval=0.2, history_seconds=86400):
+        self.dsn = dsn
+        self.fetch_size = fetch_size
+        self.poll_interval = poll_interval
+        self.history_seconds = history_seconds
+
+        self._lock = threading.Lock()
+        self._rows = {relation: {} for relation in RELATIONS}  # relation -> {key: row dict}
+        self._columns = {relation: [] for relation in RELATIONS}
+        self._frames = {}  # relation -> (version, DataFrame)
+        self._versions = {relation: 0 for relation in RELATIONS}
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = False
+        self.changes_applied = 0
+        self.last_change = None
+        self.last_error = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a store from RISINGWAVE_* and LIVE_* environment variables"""
+        dsn = {
+            'host': os.getenv('RISINGWAVE_HOST', 'localhost'),
+            'port': int(os.getenv('RISINGWAVE_PORT', 4566)),
+            'database': os.getenv('RISINGWAVE_DB', 'dev'),
+            'user': os.getenv('RISINGWAVE_USER', 'root'),
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+        }
+        return cls(
+            dsn,
+            fetch_size=int(os.getenv('LIVE_FETCH_SIZE', 500)),
+            poll_interval=float(os.getenv('LIVE_POLL_INTERVAL', 0.2)),
+            history_seconds=int(os.getenv('LIVE_HISTORY_SECONDS', 86400))
+        )
+
+    def start(self):
+        """Start the background subscription thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='live-store', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+    def _run(self):
+        """Keep the mirror in sync, reconnecting with backoff on failure"""
+        delay = 0.5
+        while not self._stop.is_set():
+            try:
+                conn = psycopg2.connect(**self.dsn)
+                conn.autocommit = True
+                try:
+                    self._sync(conn)
+                finally:
+                    conn.close()
+            except psycopg2.Error as e:
+                self.ready = False
+                self.last_error = str(e)
+                self._stop.wait(delay)
+                delay = min(delay * 2, 10.0)
+            else:
+                delay = 0.5
+
+    def _sync(self, conn):
+        """Declare cursors, load snapshots, then apply changes until stopped"""
+        cursor = conn.cursor()
+        # Declare first, snapshot second: changes in between are replayed by the
+        # cursor, and replaying an upsert or delete onto the snapshot is harmless
+        for relation in RELATIONS:
+            cursor.execute(f"DECLARE {relation}_cur SUBSCRIPTION CURSOR FOR {relation}_sub")
+        for relation in RELATIONS:
+            if relation in WINDOWED:
+                cursor.execute(f"SELECT * FROM {relation} WHERE window_start >= %(cutoff)s::timestamp",
+                               {'cutoff': self._cutoff()})
+            else:
+                cursor.execute(f"SELECT * FROM {relation}")
+            columns = [column[0] for column in cursor.description]
+            self._load_snapshot(relation, columns, cursor.fetchall())
+        self.ready = True
+        self.last_error = None
+
+        while not self._stop.is_set():
+            changed = False
+            for relation in RELATIONS:
+                cursor.execute(f"FETCH {int(self.fetch_size)} FROM {relation}_cur")
+                rows = cursor.fetchall()
+                if rows:
+                    columns = [column[0] for column in cursor.description]
+                    self._apply_changes(relation, columns, rows)
+                    changed = True
+            if not changed:
+                self._stop.wait(self.poll_interval)
+
+    def _cutoff(self):
+        """Earliest window_start kept for WINDOWED relations"""
+        return datetime.now() - timedelta(seconds=self.history_seconds)
+
+    def _load_snapshot(self, relation, columns, rows):
+        """Replace a relation's contents with a full snapshot"""
+        key_columns = RELATIONS[relation]
+        snapshot = {}
+        for values in rows:
+            row = dict(zip(columns, values))
+            snapshot[tuple(row[c] for c in key_columns)] = row
+        with self._lock:
+            self._rows[relation] = snapshot
+            self._columns[relation] = columns
+            self._versions[relation] += 1
+
+    def _apply_changes(self, relation, columns, rows):
+        """
+        Apply changelog rows (op = Insert / Delete / UpdateInsert / UpdateDelete)
+
+        For WINDOWED relations, windows that have fallen out of the history
+        span are pruned, and changes to them ignored.
+        """
+        key_columns = RELATIONS[relation]
+        value_columns = [c for c in columns if c not in CHANGELOG_COLUMNS]
+        cutoff = self._cutoff() if relation in WINDOWED else None
+        with self._lock:
+            target = self._rows[relation]
+            if cutoff is not None:
+                for key in [key for key, row in target.items() if row['window_start'] < cutoff]:
+                    del target[key]
+            for values in rows:
+                change = dict(zip(columns, values))
+                op = OP_CODES.get(change['op']) or str(change['op']).lower()
+                row = {c: change[c] for c in value_columns}
+                key = tuple(row[c] for c in key_columns)
+                if op in ('insert', 'updateinsert'):
+                    if cutoff is None or row['window_start'] >= cutoff:
+                        target[key] = row
+                elif op in ('delete', 'updatedelete'):
+                    target.pop(key, None)
+            if not self._columns[relation]:
+                self._columns[relation] = value_columns
+            self._versions[relation] += 1
+            self.changes_applied += len(rows)
+            self.last_change = time.time()
+
+    def frame(self, relation):
+        """
+        Current contents of a relation as a DataFrame
+
+        Frames are rebuilt only when the relation changed; callers get a copy.
+        """
+        with self._lock:
+            version = self._versions[relation]
+            cached = self._frames.get(relation)
+            if cached is None or cached[0] != version:
+                df = pd.DataFrame.from_records(
+                    list(self._rows[relation].values()),
+                    columns=self._columns[relation],
+                    coerce_float=True
+                )
+                self._frames[relation] = (version, df)
+            else:
+                df = cached[1]
+        return df.copy()
+
+    def stats(self):
+        """Mirror size and freshness for diagnostics"""
+        with self._lock:
+            sizes = {relation: len(rows) for relation, rows in self._rows.items()}
+        return {
+            'ready': self.ready,
+            'rows': sizes,
+            'changes_applied': self.changes_applied,
+            'last_change': self.last_change,
+            'last_error': self.last_error
+        }
+
+
+def _in_interval(df, start, end):
+    """Rows whose window lies within [start, end]"""
+    if df.empty:
+        return df
+    return df[(df['window_start'] >= pd.Timestamp(start)) & (df['window_end'] <= pd.Timestamp(end))]
+
+
+def offers_in_interval(store, offer_type, threshold, start, end):
+    """
+    Qualifying offers in an interval from the offer view mirror
+
+    Same columns as the watermark rows of queries.build_hotel/drink_closed_offers_query;
+    only valid for thresholds at or above the views' base thresholds.
+    """
+    if offer_type == 'hotel':
+        df = store.frame('hotel_room_offers')
+        if not df.empty:
+            df = df[df['total_spend'] >= threshold]
+    else:
+        df = store.frame('drink_offers')
+        if not df.empty:
+            df = df[df['loss_amount'] >= threshold]
+    df = _in_interval(df, start, end)
+    return df.sort_values(['member_id', 'window_start'], ascending=[True, False]) if not df.empty else df
+
+
+def live_progress(store, offer_type, threshold, start, end):
+    """
+    Members on track to qualify in the open interval, from the live summary mirror
+
+    Same columns as queries.build_hotel/drink_current_offers_query.
+    """
+    df = _in_interval(store.frame('member_live_summary'), start, end)
+    if df.empty:
+        return df
+    if offer_type == 'hotel':
+        df = df[df['total_spend'] >= threshold]
+    else:
+        df = df[(df['net_amount'] < 0) & (df['net_amount'].abs() >= threshold)]
+        df = df.assign(loss_amount=df['net_amount'].abs())
+    df = df.merge(store.frame('members'), on='member_id', how='left')
+    return df.sort_values(['member_id', 'window_start'], ascending=[True, False])
+
+
+def pending_offers(store):
+    """
+    Latest unredeemed offer per member and offer type, from the offer view mirrors
+
+    Same columns as queries.build_pending_offers_query, but only offers within
+    the store's history span.
+    """
+    frames = []
+    for offer_type, relation, metric, display, label in (
+        ('hotel', 'hotel_room_offers', 'total_spend', '🏨 Hotel Room', 'Spend: $'),
+        ('drink', 'drink_offers', 'loss_amount', '🍹 Free Drink', 'Lost: $'),
+    ):
+        df = store.frame(relation)
+        if df.empty:
+            continue
+        latest = (df.sort_values(['member_id', 'window_end', metric], ascending=[True, False, False])
+                    .drop_duplicates('member_id'))
+        latest = latest[~latest['already_redeemed'].astype(bool)]
+        frames.append(pd.DataFrame({
+            'member_id': latest['member_id'],
+            'member_name': latest['member_name'],
+            'offer_type': offer_type,
+            'offer_display': display,
+            'metric_value': latest[metric],
+            'metric_label': label + latest[metric].round(2).astype(str),
+            'window_start': latest['window_start'],
+            'window_end': latest['window_end'],
+        }))
+    if not frames:
+        return pd.DataFrame()
+    return (pd.concat(frames, ignore_index=True)
+              .sort_values(['window_end', 'metric_value'], ascending=[False, False])
+              .reset_index(drop=True))
@@ -0,0 +1,168 @@
+"""
+Query and render timings for the dashboard
+
+Every database query is timed on the thread that runs it and recorded under
+its queries.py builder name, with the rows and bytes it returned; every tab
+section records how long it took to render. The last samples per name give
+p50/p95 figures for the sidebar diagnostics panel. Slow events are logged as
+one JSON object per line, and with METRICS_PORT set (and prometheus_client
+installed) the same events are exported as Prometheus histograms.
+"""
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+QUERY = 'query'
+RENDER = 'render'
+
+logger = logging.getLogger('dashboard.metrics')
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list"""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Metrics:
+    """
+    Thread-safe rolling timings per (kind, name)
+
+    Args:
+        samples: Recent samples kept per name for percentiles
+        slow_seconds: Events at least this slow are logged as warnings
+        log_all: Also log every other event (at INFO)
+        prometheus_port: Serve Prometheus metrics on this port (None = off)
+    """
+
+    def __init__(self, samples=500, slow_seconds=1.0, log_all=False, prometheus_port=None):
+        self.samples = samples
+        self.slow_seconds = slow_seconds
+        self.log_all = log_all
+
+        self._series = {}  # (kind, name) -> {'seconds': deque, 'calls', 'errors', 'rows', 'bytes'}
+        self._lock = threading.Lock()
+        self._prometheus = None
+        if not logger.handlers:
+            # One JSON object per line on stderr, whatever logging Streamlit set up
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.propagate = False
+        logger.setLevel(logging.INFO if log_all else logging.WARNING)
+        if prometheus_port is not None:
+            self._start_prometheus(prometheus_port)
+
+    @classmethod
+    def from_env(cls):
+        """Build from METRICS_* environment variables"""
+        port = os.getenv('METRICS_PORT')
+        return cls(
+            samples=int(os.getenv('METRICS_SAMPLES', 500)),
+            slow_seconds=float(os.getenv('METRICS_SLOW_MS', 1000)) / 1000,
+            log_all=os.getenv('METRICS_LOG_ALL', 'false').lower() in ('1', 'true', 'yes'),
+            prometheus_port=int(port) if port else None
+        )
+
+    def _start_prometheus(self, port):
+        """Serve /metrics over HTTP if prometheus_client is installed"""
+        try:
+            import prometheus_client
+        except ImportError:
+            logger.warning("METRICS_PORT is set but prometheus_client is not installed; not exporting")
+            return
+        self._prometheus = {
+            'seconds': prometheus_client.Histogram(
+                'dashboard_duration_seconds', 'Dashboard query and render time', ['kind', 'name'],
+                buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+            ),
+            'rows': prometheus_client.Counter('dashboard_query_rows', 'Rows returned by queries', ['name']),
+            'bytes': prometheus_client.Counter('dashboard_query_bytes', 'DataFrame bytes returned by queries', ['name']),
+            'errors': prometheus_client.Counter('dashboard_errors', 'Failed queries and renders', ['kind', 'name']),
+        }
+        prometheus_client.start_http_server(port)
+
+    def record(self, kind, name, seconds, rows=None, nbytes=None, error=None):
+        """Record one timed event, log it if slow (or log_all) and export it"""
+        name = name or 'unnamed'
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = {'seconds': deque(maxlen=self.samples), 'calls': 0, 'errors': 0, 'rows': 0, 'bytes': 0}
+                self._series[(kind, name)] = series
+            series['seconds'].append(seconds)
+            series['calls'] += 1
+            series['errors'] += error is not None
+            series['rows'] += rows or 0
+            series['bytes'] += nbytes or 0
+
+        slow = seconds >= self.slow_seconds
+        if slow or error is not None or self.log_all:
+            event = {'event': kind, 'name': name, 'ms': round(seconds * 1000, 1), 'slow': slow}
+            if rows is not None:
+                event['rows'] = rows
+                event['bytes'] = nbytes
+            if error is not None:
+                event['error'] = str(error)
+            level = logging.WARNING if slow or error is not None else logging.INFO
+            logger.log(level, json.dumps(event))
+
+        if self._prometheus is not None:
+            self._prometheus['seconds'].labels(kind, name).observe(seconds)
+            if rows is not None:
+                self._prometheus['rows'].labels(name).inc(rows)
+                self._prometheus['bytes'].labels(name).inc(nbytes or 0)
+            if error is not None:
+                self._prometheus['errors'].labels(kind, name).inc()
+
+    def record_frame(self, name, seconds, df):
+        """Record a query that returned df"""
+        self.record(QUERY, name, seconds, rows=len(df), nbytes=int(df.memory_usage(index=True, deep=True).sum()))
+
+    @contextmanager
+    def timed(self, kind, name):
+        """Time the block and record it (errors are recorded and re-raised)"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(kind, name, time.perf_counter() - started, error=e)
+            raise
+        self.record(kind, name, time.perf_counter() - started)
+
+    def summary(self, kind=None):
+        """
+        p50/p95 per name, slowest p95 first
+
+        Returns:
+            list: Dicts with kind, name, calls, errors, p50_ms, p95_ms,
+                avg_rows and avg_kb (rows and bytes are per call, queries only)
+        """
+        with self._lock:
+            snapshot = [(key, sorted(series['seconds']), dict(series)) for key, series in self._series.items()
+                        if kind is None or key[0] == kind]
+        rows = []
+        for (series_kind, name), seconds, series in snapshot:
+            if not seconds:
+                continue
+            rows.append({
+                'kind': series_kind,
+                'name': name,
+                'calls': series['calls'],
+                'errors': series['errors'],
+                'p50_ms': percentile(seconds, 0.5) * 1000,
+                'p95_ms': percentile(seconds, 0.95) * 1000,
+                'avg_rows': series['rows'] / series['calls'] if series_kind == QUERY else None,
+                'avg_kb': series['bytes'] / series['calls'] / 1024 if series_kind == QUERY else None,
+            })
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def reset(self):
+        """Forget all samples (Prometheus counters keep counting)"""
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,98 @@
+"""
+Server-side prepared statements for dashboard queries
+
+Each distinct query is PREPAREd once per pooled connection and then run with
+EXECUTE, so RisingWave skips parsing and planning on every rerun. A statement
+the server will not PREPARE (say, a parameter type it cannot infer) runs with
+bound parameters from then on; only if the server rejects PREPARE outright
+does every query fall back for the rest of the process.
+"""
+import os
+import re
+import hashlib
+import psycopg2
+
+_PLACEHOLDER = re.compile(r'%\((\w+)\)s')
+
+# None = not probed yet; set to False once the server rejects PREPARE itself
+_prepare_supported = None if os.getenv('DB_PREPARE', 'true').lower() in ('1', 'true', 'yes') else False
+
+# Statement names whose PREPARE failed while PREPARE itself works
+_unprepared = set()
+
+# Trivial statement used to tell "PREPARE unsupported" from a statement that
+# cannot be prepared
+_PROBE = 'dashboard_prepare_probe'
+
+
+def statement_name(query):
+    """Stable server-side name for a query: builder name plus a hash of its SQL"""
+    digest = hashlib.sha1(query.sql.encode('utf-8')).hexdigest()[:10]
+    return f"{query.name}_{digest}"
+
+
+def to_positional(sql, params):
+    """
+    Rewrite %(name)s placeholders as $1, $2, ... for PREPARE
+
+    Returns:
+        tuple: (positional_sql, ordered parameter values)
+    """
+    order = []
+
+    def replace(match):
+        name = match.group(1)
+        if name not in order:
+            order.append(name)
+        return f"${order.index(name) + 1}"
+
+    return _PLACEHOLDER.sub(replace, sql), [params[name] for name in order]
+
+
+def _probe_prepare(cursor):
+    """Whether the server accepts PREPARE at all"""
+    try:
+        cursor.execute(f"PREPARE {_PROBE} AS SELECT 1")
+    except psycopg2.Error:
+        return False
+    cursor.execute(f"DEALLOCATE {_PROBE}")
+    return True
+
+
+def execute(cursor, query):
+    """
+    Run a Query on cursor, preparing it on first use on this connection
+
+    Raw SQL strings and queries without a name run unprepared.
+    """
+    global _prepare_supported
+    if isinstance(query, str) or not query.name or _prepare_supported is False:
+        cursor.execute(query if isinstance(query, str) else query.sql,
+                       None if isinstance(query, str) else query.params or None)
+        return
+
+    conn = cursor.connection
+    name = statement_name(query)
+    if name in _unprepared:
+        cursor.execute(query.sql, query.params or None)
+        return
+
+    positional_sql, values = to_positional(query.sql, query.params or {})
+    if name not in conn.prepared:
+        try:
+            cursor.execute(f"PREPARE {name} AS {positional_sql}")
+        except psycopg2.Error:
+            # PREPARE may be unsupported, this statement may not be preparable, or
+            # the SQL may be wrong. The probe settles the first (unless a PREPARE
+            # already worked); running it unprepared raises in the last case.
+            if _prepare_supported is None:
+                _prepare_supported = _probe_prepare(cursor)
+            cursor.execute(query.sql, query.params or None)
+            if _prepare_supported:
+                _unprepared.add(name)
+            return
+        conn.prepared.add(name)
+        _prepare_supported = True
+
+    placeholders = ', '.join(['%s'] * len(values))
+    cursor.execute(f"EXECUTE {name}({placeholders})" if values else f"EXECUTE {name}", values or None)
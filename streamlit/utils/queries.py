@@ -1,161 +1,324 @@
 """
 SQL query builders for casino dashboard
+
+Builders return a Query: a stable statement name, SQL with %(name)s
+placeholders and the bound parameter values. Only identifiers chosen by the
+dashboard itself (source views) are formatted into the SQL. Time windows are
+bound as window_start lower bounds, so RisingWave can range-scan the
+window_start indexes (migrations/0007_window_indexes.sql).
 """
+from collections import namedtuple
+from datetime import timedelta
 
+Query = namedtuple('Query', ['name', 'sql', 'params'])
 
-def build_hotel_watermark_query(hotel_threshold, prev_start, prev_end, today_date=None):
-    """Build query for hotel offers in previous interval (watermark)"""
-    if today_date is None:
-        from datetime import datetime
-        today_date = datetime.now().strftime('%Y-%m-%d')
+# Closed windows (history, last completed interval) live in member_daily_summary,
+# which may be built with EMIT ON WINDOW CLOSE. Open-window progress is read from
+# member_live_summary, which is always emitted on update with a short retention.
+# Neither carries member names: they are looked up from the members table.
+SUMMARY_SOURCE = 'member_daily_summary'
+LIVE_SUMMARY_SOURCE = 'member_live_summary'
+
+# Base thresholds of the hotel_room_offers / drink_offers MVs. Those views carry
+# member names and an incrementally maintained already_redeemed flag, so closed
+# window queries at or above these thresholds read them without any joins.
+HOTEL_OFFER_MIN_SPEND = 5000
+DRINK_OFFER_MIN_LOSS = 1000
+
+# Rows per All Members page
+MEMBERS_PAGE_SIZE = 100
+
+# Rows per Fulfilled Offers page
+FULFILLED_PAGE_SIZE = 50
+
+# Points per series in the Analytics trend charts (windows are bucketed in SQL)
+TREND_MAX_POINTS = 300
+
+# Closed windows shown in the hotel / drink history sections
+HISTORY_WINDOWS = 3
+
+
+def _since_filter(since, params):
+    """window_start lower bound for the sidebar time window (None = all time)"""
+    if since is None:
+        return "1=1"
+    params['since'] = since
+    return "window_start >= %(since)s::timestamp"
 
-    return f"""
-    WITH today_offers AS (
-        SELECT member_id
-        FROM redeemed_offers
-        WHERE offer_type = 'hotel'
-          AND redemption_date = '{today_date}'::date
-    )
-    SELECT
-        m.member_id,
-        m.member_name,
-        m.total_spend,
-        m.transaction_count,
-        m.net_amount,
-        m.last_transaction,
-        m.window_start,
-        m.window_end,
-        CASE WHEN r.member_id IS NOT NULL THEN true ELSE false END as already_redeemed
-    FROM member_daily_summary m
-    LEFT JOIN today_offers r ON m.member_id = r.member_id
-    WHERE m.total_spend >= {hotel_threshold}
-      AND m.window_start >= '{prev_start}'::timestamp
-      AND m.window_end <= '{prev_end}'::timestamp
-    ORDER BY m.member_id, m.window_start DESC
-    """
 
+def _history_since(prev_start, since, windows, interval_seconds):
+    """Start of the last `windows` closed windows before prev_start, within since"""
+    start = prev_start - timedelta(seconds=windows * interval_seconds)
+    return start if since is None or since < start else since
 
-def build_hotel_history_query(hotel_threshold, prev_start, time_filter="1=1"):
-    """Build query for hotel offers history (before watermark interval)"""
-    return f"""
+
+# Window buckets of the closed-window offer tab queries
+WATERMARK_BUCKET = 'watermark'
+HISTORY_BUCKET = 'history'
+
+# offer type -> (qualifying predicate on summary rows, extra select columns)
+_OFFER_PREDICATES = {
+    'hotel': ("total_spend >= %(threshold)s", ""),
+    'drink': ("net_amount < 0 AND ABS(net_amount) >= %(threshold)s", ",\n        ABS(w.net_amount) as loss_amount"),
+}
+
+
+def _build_current_offers_query(offer_type, threshold, curr_start, curr_end):
+    """Open interval progress for one offer type (no already_redeemed: not shown while open)"""
+    predicate, extra_columns = _OFFER_PREDICATES[offer_type]
+    sql = f"""
     SELECT
-        member_id,
-        member_name,
-        total_spend,
-        transaction_count,
-        net_amount,
-        last_transaction,
-        window_start,
-        window_end
-    FROM member_daily_summary
-    WHERE total_spend >= {hotel_threshold}
-      AND window_end < '{prev_start}'::timestamp
-      AND {time_filter}
-    ORDER BY window_start DESC
+        w.member_id,
+        mb.member_name,
+        w.total_spend,
+        w.transaction_count,
+        w.net_amount{extra_columns},
+        w.last_transaction,
+        w.window_start,
+        w.window_end
+    FROM {LIVE_SUMMARY_SOURCE} w
+    LEFT JOIN members mb ON w.member_id = mb.member_id
+    WHERE {predicate}
+      AND window_start >= %(curr_start)s::timestamp
+      AND window_end <= %(curr_end)s::timestamp
+    ORDER BY w.window_start DESC, w.member_id
     """
+    return Query(f'{offer_type}_offer_current', sql, {
+        'threshold': threshold, 'curr_start': curr_start, 'curr_end': curr_end
+    })
 
 
-def build_drink_watermark_query(drink_threshold, prev_start, prev_end, today_date=None):
-    """Build query for drink offers in previous interval (watermark)"""
-    if today_date is None:
-        from datetime import datetime
-        today_date = datetime.now().strftime('%Y-%m-%d')
+def _build_closed_offers_query(offer_type, threshold, prev_start, prev_end, since=None,
+                               windows=HISTORY_WINDOWS, interval_seconds=300):
+    """Watermark interval and history for one offer type in one statement"""
+    predicate, extra_columns = _OFFER_PREDICATES[offer_type]
 
-    return f"""
-    WITH today_offers AS (
-        SELECT member_id
+    # The watermark interval and history share one window_start range scan of
+    # the closed-window summary. As in the offer views, a window is redeemed if
+    # the member redeemed this offer type for the window's day.
+    sql = f"""
+    WITH window_redemptions AS (
+        SELECT member_id, redemption_date
         FROM redeemed_offers
-        WHERE offer_type = 'drink'
-          AND redemption_date = '{today_date}'::date
+        WHERE offer_type = %(offer_type)s
+          AND redemption_date >= %(scan_start)s::date
+    ),
+    bucketed AS (
+        SELECT
+            CASE WHEN window_start >= %(prev_start)s::timestamp
+                 THEN '{WATERMARK_BUCKET}' ELSE '{HISTORY_BUCKET}' END as bucket,
+            member_id, total_spend, transaction_count, net_amount, last_transaction, window_start, window_end
+        FROM {SUMMARY_SOURCE}
+        WHERE {predicate}
+          AND window_start >= %(scan_start)s::timestamp
+          AND window_end <= %(prev_end)s::timestamp
     )
     SELECT
-        m.member_id,
-        m.member_name,
-        m.total_spend,
-        m.transaction_count,
-        m.net_amount,
-        ABS(m.net_amount) as loss_amount,
-        m.last_transaction,
-        m.window_start,
-        m.window_end,
+        w.bucket,
+        w.member_id,
+        mb.member_name,
+        w.total_spend,
+        w.transaction_count,
+        w.net_amount{extra_columns},
+        w.last_transaction,
+        w.window_start,
+        w.window_end,
         CASE WHEN r.member_id IS NOT NULL THEN true ELSE false END as already_redeemed
-    FROM member_daily_summary m
-    LEFT JOIN today_offers r ON m.member_id = r.member_id
-    WHERE m.net_amount < 0
-      AND ABS(m.net_amount) >= {drink_threshold}
-      AND m.window_start >= '{prev_start}'::timestamp
-      AND m.window_end <= '{prev_end}'::timestamp
-    ORDER BY m.member_id, m.window_start DESC
+    FROM bucketed w
+    LEFT JOIN members mb ON w.member_id = mb.member_id
+    LEFT JOIN window_redemptions r
+        ON w.member_id = r.member_id AND w.window_start::date = r.redemption_date
+    ORDER BY w.window_start DESC, w.member_id
     """
+    return Query(f'{offer_type}_offer_closed', sql, {
+        'offer_type': offer_type,
+        'threshold': threshold,
+        'prev_start': prev_start,
+        'prev_end': prev_end,
+        # since never hides the watermark interval, only history before it
+        'scan_start': min(_history_since(prev_start, since, windows, interval_seconds), prev_start)
+    })
 
 
-def build_drink_history_query(drink_threshold, prev_start, time_filter="1=1"):
-    """Build query for drink offers history (before watermark interval)"""
-    return f"""
-    SELECT
-        member_id,
-        member_name,
-        total_spend,
-        transaction_count,
-        net_amount,
-        ABS(net_amount) as loss_amount,
-        last_transaction,
-        window_start,
-        window_end
-    FROM member_daily_summary
-    WHERE net_amount < 0
-      AND ABS(net_amount) >= {drink_threshold}
-      AND window_end < '{prev_start}'::timestamp
-      AND {time_filter}
-    ORDER BY window_start DESC
+def build_hotel_current_offers_query(hotel_threshold, curr_start, curr_end):
+    """
+    Build query for hotel progress in the open interval
+
+    Rows are read from the live summary, so the result is only valid until
+    the next refresh (cache it as 'open').
     """
+    return _build_current_offers_query('hotel', hotel_threshold, curr_start, curr_end)
 
 
-def build_stats_query(time_filter="1=1"):
+def build_hotel_closed_offers_query(hotel_threshold, prev_start, prev_end, since=None, interval_seconds=300):
+    """
+    Build one query for the hotel tab's closed windows
+
+    Rows carry a bucket column: WATERMARK_BUCKET (last completed interval) or
+    HISTORY_BUCKET (the HISTORY_WINDOWS closed windows before it, within
+    since). Closed windows no longer change, so the result can be cached as
+    'closed' with closes_at=prev_end. Split it with split_offer_buckets.
+    """
+    return _build_closed_offers_query('hotel', hotel_threshold, prev_start, prev_end,
+                                      since=since, interval_seconds=interval_seconds)
+
+
+def build_drink_current_offers_query(drink_threshold, curr_start, curr_end):
+    """Build query for drink progress in the open interval (see build_hotel_current_offers_query)"""
+    return _build_current_offers_query('drink', drink_threshold, curr_start, curr_end)
+
+
+def build_drink_closed_offers_query(drink_threshold, prev_start, prev_end, since=None, interval_seconds=300):
+    """Build one query for the drink tab's closed windows (see build_hotel_closed_offers_query)"""
+    return _build_closed_offers_query('drink', drink_threshold, prev_start, prev_end,
+                                      since=since, interval_seconds=interval_seconds)
+
+
+def split_offer_buckets(df):
+    """
+    Split a closed-window offer tab result by bucket
+
+    Returns:
+        dict: bucket -> DataFrame without the bucket column (empty if no rows)
+    """
+    if 'bucket' not in df:
+        return {bucket: df for bucket in (WATERMARK_BUCKET, HISTORY_BUCKET)}
+    return {
+        bucket: df[df['bucket'] == bucket].drop(columns='bucket')
+        for bucket in (WATERMARK_BUCKET, HISTORY_BUCKET)
+    }
+
+
+def build_stats_query(since=None):
     """Build query for overall analytics stats"""
-    return f"""
+    params = {}
+    sql = f"""
     SELECT
         COUNT(DISTINCT member_id) as total_members,
-        SUM(total_spend) as total_revenue,
-        SUM(transaction_count) as total_transactions,
-        AVG(total_spend) as avg_spend_per_member,
-        SUM(CASE WHEN net_amount >= 0 THEN 1 ELSE 0 END) as winning_members,
-        SUM(CASE WHEN net_amount < 0 THEN 1 ELSE 0 END) as losing_members
+        COALESCE(SUM(total_spend), 0) as total_revenue,
+        COALESCE(SUM(transaction_count), 0) as total_transactions,
+        COALESCE(AVG(total_spend), 0) as avg_spend_per_member,
+        COALESCE(SUM(CASE WHEN net_amount >= 0 THEN 1 ELSE 0 END), 0) as winning_members,
+        COALESCE(SUM(CASE WHEN net_amount < 0 THEN 1 ELSE 0 END), 0) as losing_members
     FROM member_daily_summary
-    WHERE {time_filter}
+    WHERE {_since_filter(since, params)}
     """
+    return Query('stats', sql, params)
 
 
-def build_reward_query(hotel_threshold, drink_threshold, time_filter="1=1"):
+def build_reward_query(hotel_threshold, drink_threshold, since=None):
     """Build query for reward eligibility stats"""
-    return f"""
+    params = {'hotel_threshold': hotel_threshold, 'drink_threshold': drink_threshold}
+    sql = f"""
     SELECT
-        SUM(CASE WHEN total_spend >= {hotel_threshold} THEN 1 ELSE 0 END) as hotel_eligible,
-        SUM(CASE WHEN net_amount < 0 AND ABS(net_amount) >= {drink_threshold} THEN 1 ELSE 0 END) as drink_eligible,
+        COALESCE(SUM(CASE WHEN total_spend >= %(hotel_threshold)s THEN 1 ELSE 0 END), 0) as hotel_eligible,
+        COALESCE(SUM(CASE WHEN net_amount < 0 AND ABS(net_amount) >= %(drink_threshold)s THEN 1 ELSE 0 END), 0)
+            as drink_eligible,
         COUNT(*) as total
     FROM member_daily_summary
-    WHERE {time_filter}
+    WHERE {_since_filter(since, params)}
     """
+    return Query('reward_eligibility', sql, params)
 
 
-def build_top_spenders_query(time_filter="1=1", limit=10):
+def build_top_spenders_query(since=None, limit=10):
     """Build query for top spenders"""
-    return f"""
+    params = {'limit': limit}
+    sql = f"""
     SELECT
         member_name,
         total_spend,
         transaction_count,
         net_amount
     FROM member_daily_summary
-    WHERE {time_filter}
+    LEFT JOIN members USING (member_id)
+    WHERE {_since_filter(since, params)}
     ORDER BY total_spend DESC
-    LIMIT {limit}
+    LIMIT %(limit)s
+    """
+    return Query('top_spenders', sql, params)
+
+
+def build_game_trend_query(since=None, max_points=TREND_MAX_POINTS, interval_seconds=300):
     """
+    Build query for revenue, house net and transactions per game over time
 
+    5-minute windows from game_window_summary are summed into equal buckets,
+    a whole number of windows wide, sized so the selected range yields at most
+    max_points buckets. Row count (and chart payload) is therefore bounded by
+    max_points x games however long the range.
 
-def build_all_members_query(hotel_threshold, drink_threshold, time_filter="1=1"):
-    """Build query for all member activity"""
-    return f"""
+    Returns columns bucket_start, bucket_seconds, game_type, revenue,
+    house_net and transaction_count, ordered by bucket_start.
+    """
+    params = {'max_points': max_points, 'interval_seconds': interval_seconds}
+    sql = f"""
+    WITH windows AS (
+        SELECT game_type, window_start, window_end, revenue, house_net, transaction_count
+        FROM game_window_summary
+        WHERE {_since_filter(since, params)}
+    ),
+    span AS (
+        SELECT
+            MIN(window_start) as first_start,
+            GREATEST(
+                %(interval_seconds)s,
+                CEIL(EXTRACT(EPOCH FROM (MAX(window_end) - MIN(window_start)))
+                     / %(max_points)s / %(interval_seconds)s) * %(interval_seconds)s
+            ) as bucket_seconds
+        FROM windows
+    ),
+    bucketed AS (
+        SELECT
+            to_timestamp((
+                EXTRACT(EPOCH FROM span.first_start)
+                + FLOOR(EXTRACT(EPOCH FROM (w.window_start - span.first_start)) / span.bucket_seconds)
+                  * span.bucket_seconds
+            )::DOUBLE PRECISION) AT TIME ZONE 'UTC' as bucket_start,
+            span.bucket_seconds,
+            w.game_type,
+            w.revenue,
+            w.house_net,
+            w.transaction_count
+        FROM windows w
+        CROSS JOIN span
+    )
+    SELECT
+        bucket_start,
+        bucket_seconds,
+        game_type,
+        SUM(revenue) as revenue,
+        SUM(house_net) as house_net,
+        SUM(transaction_count) as transaction_count
+    FROM bucketed
+    GROUP BY bucket_start, bucket_seconds, game_type
+    ORDER BY bucket_start, game_type
+    """
+    return Query('game_trend', sql, params)
+
+
+def build_all_members_query(hotel_threshold, drink_threshold, since=None, limit=MEMBERS_PAGE_SIZE + 1,
+                            after=None):
+    """
+    Build a keyset-paginated query for member activity, highest spend first
+
+    Rows are one member per window, ordered by (total_spend, member_id,
+    window_start) descending; window_start breaks ties between windows of the
+    same member. Pass the cursor of the previous page's last row
+    (all_members_cursor) as after to get the next page. The default limit
+    fetches one row beyond a page to tell whether another page follows.
+    """
+    params = {'hotel_threshold': hotel_threshold, 'drink_threshold': drink_threshold, 'limit': limit}
+    keyset = "1=1"
+    if after is not None:
+        keyset = """(
+        total_spend < %(after_spend)s
+        OR (total_spend = %(after_spend)s AND member_id < %(after_member)s)
+        OR (total_spend = %(after_spend)s AND member_id = %(after_member)s
+            AND window_start < %(after_window)s)
+    )"""
+        params['after_spend'], params['after_member'], params['after_window'] = after
+    sql = f"""
     SELECT
         member_id,
         member_name,
@@ -163,12 +326,193 @@ def build_all_members_query(hotel_threshold, drink_threshold, time_filter="1=1")
         transaction_count,
         net_amount,
         last_transaction,
+        window_start,
         CASE
-            WHEN total_spend >= {hotel_threshold} THEN '🏨 Hotel Room'
-            WHEN net_amount < 0 AND ABS(net_amount) >= {drink_threshold} THEN '🍹 Free Drink'
+            WHEN total_spend >= %(hotel_threshold)s THEN '🏨 Hotel Room'
+            WHEN net_amount < 0 AND ABS(net_amount) >= %(drink_threshold)s THEN '🍹 Free Drink'
             ELSE '❌ No Reward'
         END as reward_status
     FROM member_daily_summary
-    WHERE {time_filter}
-    ORDER BY total_spend DESC
+    LEFT JOIN members USING (member_id)
+    WHERE {_since_filter(since, params)}
+    AND {keyset}
+    ORDER BY total_spend DESC, member_id DESC, window_start DESC
+    LIMIT %(limit)s
+    """
+    return Query('all_members_after' if after is not None else 'all_members', sql, params)
+
+
+def all_members_cursor(df):
+    """Keyset cursor (total_spend, member_id, window_start) of a page's last row"""
+    last = df.iloc[-1]
+    return float(last['total_spend']), int(last['member_id']), last['window_start'].to_pydatetime()
+
+
+def build_member_count_query(since=None):
+    """Build query for the number of member windows and distinct members"""
+    params = {}
+    sql = f"""
+    SELECT
+        COUNT(*) as total_rows,
+        COUNT(DISTINCT member_id) as total_members
+    FROM member_daily_summary
+    WHERE {_since_filter(since, params)}
+    """
+    return Query('member_count', sql, params)
+
+
+def build_pending_offers_query():
+    """Build query for the latest unredeemed offer per member and offer type"""
+    sql = """
+    WITH latest_offers AS (
+        -- Get the latest/highest qualifying window for each member for hotel offers
+        (SELECT DISTINCT ON (member_id)
+            member_id,
+            member_name,
+            'hotel' as offer_type,
+            '🏨 Hotel Room' as offer_display,
+            total_spend as metric_value,
+            'Spend: $' || ROUND(total_spend, 2) as metric_label,
+            window_start,
+            window_end,
+            already_redeemed
+        FROM hotel_room_offers
+        ORDER BY member_id, window_end DESC, total_spend DESC)
+
+        UNION ALL
+
+        -- Get the latest/highest qualifying window for each member for drink offers
+        (SELECT DISTINCT ON (member_id)
+            member_id,
+            member_name,
+            'drink' as offer_type,
+            '🍹 Free Drink' as offer_display,
+            loss_amount as metric_value,
+            'Lost: $' || ROUND(loss_amount, 2) as metric_label,
+            window_start,
+            window_end,
+            already_redeemed
+        FROM drink_offers
+        ORDER BY member_id, window_end DESC, loss_amount DESC)
+    )
+    SELECT
+        lo.member_id,
+        lo.member_name,
+        lo.offer_type,
+        lo.offer_display,
+        lo.metric_value,
+        lo.metric_label,
+        lo.window_start,
+        lo.window_end
+    FROM latest_offers lo
+    WHERE NOT lo.already_redeemed
+    ORDER BY lo.window_end DESC, lo.metric_value DESC
+    """
+    return Query('pending_offers', sql, {})
+
+
+def _fulfilled_filters(params, date_from, date_to, offer_type, member_search):
+    """WHERE conditions for redeemed_offers: redeemed_at range, offer type, name"""
+    conditions = []
+    if date_from is not None:
+        params['redeemed_from'] = date_from
+        conditions.append("redeemed_at >= %(redeemed_from)s::timestamp")
+    if date_to is not None:
+        # Inclusive end date: everything before the next midnight
+        params['redeemed_until'] = date_to + timedelta(days=1)
+        conditions.append("redeemed_at < %(redeemed_until)s::timestamp")
+    if offer_type:
+        params['offer_type'] = offer_type
+        conditions.append("offer_type = %(offer_type)s")
+    if member_search:
+        escaped = member_search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params['member_search'] = f"%{escaped}%"
+        conditions.append("member_name ILIKE %(member_search)s")
+    return ' AND '.join(conditions) or "1=1"
+
+
+def build_fulfilled_offers_query(date_from=None, date_to=None, offer_type=None, member_search=None,
+                                 limit=FULFILLED_PAGE_SIZE + 1, after=None):
+    """
+    Build a keyset-paginated query for redeemed offers, most recent first
+
+    Args:
+        date_from, date_to: Inclusive redemption date range (None = unbounded)
+        offer_type: 'hotel', 'drink' or None for both
+        member_search: Case-insensitive member name substring
+        limit: Rows to fetch (default: one page plus one to detect a next page)
+        after: fulfilled_cursor of the previous page's last row
+    """
+    params = {'limit': limit}
+    conditions = _fulfilled_filters(params, date_from, date_to, offer_type, member_search)
+    keyset = "1=1"
+    if after is not None:
+        keyset = """(
+        redeemed_at < %(after_redeemed_at)s::timestamp
+        OR (redeemed_at = %(after_redeemed_at)s::timestamp AND member_id < %(after_member)s)
+        OR (redeemed_at = %(after_redeemed_at)s::timestamp AND member_id = %(after_member)s
+            AND offer_type < %(after_offer_type)s)
+    )"""
+        params['after_redeemed_at'], params['after_member'], params['after_offer_type'] = after
+    sql = f"""
+    SELECT
+        member_id,
+        member_name,
+        offer_type,
+        redeemed_at,
+        CASE
+            WHEN offer_type = 'hotel' THEN '🏨 Hotel Room'
+            WHEN offer_type = 'drink' THEN '🍹 Free Drink'
+            ELSE offer_type
+        END as offer_display
+    FROM redeemed_offers
+    WHERE {conditions}
+      AND {keyset}
+    ORDER BY redeemed_at DESC, member_id DESC, offer_type DESC
+    LIMIT %(limit)s
+    """
+    return Query('fulfilled_offers_after' if after is not None else 'fulfilled_offers', sql, params)
+
+
+def fulfilled_cursor(df):
+    """Keyset cursor (redeemed_at, member_id, offer_type) of a page's last row"""
+    last = df.iloc[-1]
+    return last['redeemed_at'].to_pydatetime(), int(last['member_id']), last['offer_type']
+
+
+def build_fulfilled_count_query(date_from=None, date_to=None, offer_type=None, member_search=None):
+    """Build query for the number of redeemed offers matching the filters"""
+    params = {}
+    sql = f"""
+    SELECT COUNT(*) as matching
+    FROM redeemed_offers
+    WHERE {_fulfilled_filters(params, date_from, date_to, offer_type, member_search)}
+    """
+    return Query('fulfilled_count', sql, params)
+
+
+def build_fulfilled_summary_query(date_from=None, date_to=None):
+    """
+    Build query for fulfillment summary metrics from redemption_daily_counts
+
+    unique_members sums per-day distinct counts: exact for a single day,
+    member-days for longer ranges.
+    """
+    params = {}
+    conditions = []
+    if date_from is not None:
+        params['date_from'] = date_from
+        conditions.append("redemption_date >= %(date_from)s::date")
+    if date_to is not None:
+        params['date_to'] = date_to
+        conditions.append("redemption_date <= %(date_to)s::date")
+    sql = f"""
+    SELECT
+        COALESCE(SUM(fulfilled), 0) as fulfilled,
+        COALESCE(SUM(hotel_fulfilled), 0) as hotel_fulfilled,
+        COALESCE(SUM(drink_fulfilled), 0) as drink_fulfilled,
+        COALESCE(SUM(unique_members), 0) as unique_members
+    FROM redemption_daily_counts
+    WHERE {' AND '.join(conditions) or "1=1"}
     """
+    return Query('fulfilled_summary', sql, params)
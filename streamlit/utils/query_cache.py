@@ -0,0 +1,165 @@
+"""
+Window-aware query result cache
+
+Closed 5-minute windows never change once the watermark has passed, so their
+results are kept until evicted. Open-window results get a short TTL and are
+dropped at every window boundary. The cache is shared by all sessions, capped
+by memory and evicted least-recently-used first.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from .time_utils import get_current_interval_bounds
+
+OPEN = 'open'
+CLOSED = 'closed'
+
+# Tables whose rows change when an offer is redeemed
+REDEMPTION_TABLES = ('redeemed_offers', 'redemption_daily_counts', 'hotel_room_offers', 'drink_offers')
+
+# Matches the source watermark (event_time - INTERVAL '10' SECOND): a window can
+# still receive late events for this long after it ends
+WATERMARK_DELAY = timedelta(seconds=10)
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of query results (DataFrames), capped by bytes
+
+    Args:
+        max_bytes: Memory cap across all cached DataFrames
+        open_ttl: Seconds an open-window result stays fresh
+        interval_seconds: Window size used for boundary invalidation
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, open_ttl=3.0, interval_seconds=300):
+        self.max_bytes = max_bytes
+        self.open_ttl = open_ttl
+        self.interval_seconds = interval_seconds
+
+        self._entries = OrderedDict()  # sql -> (df, nbytes, expires_at or None, window_end or None)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._window_start = None
+        self._unsettled = {}  # table -> monotonic time until which its results are treated as open
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from QUERY_CACHE_* environment variables"""
+        return cls(
+            max_bytes=int(float(os.getenv('QUERY_CACHE_MAX_MB', 64)) * 1024 * 1024),
+            open_ttl=float(os.getenv('QUERY_CACHE_OPEN_TTL', 3))
+        )
+
+    def _remove(self, key):
+        """Drop one entry (caller holds the lock)"""
+        nbytes = self._entries.pop(key)[1]
+        self._bytes -= nbytes
+
+    def _roll_window(self):
+        """Drop every open-window entry once a new window starts (caller holds the lock)"""
+        current_start = get_current_interval_bounds(self.interval_seconds)[0]
+        if current_start != self._window_start:
+            self._window_start = current_start
+            for key in [k for k, entry in self._entries.items() if entry[3] is not None]:
+                self._remove(key)
+
+    def get(self, sql):
+        """Return a copy of the cached DataFrame for sql, or None"""
+        with self._lock:
+            self._roll_window()
+            entry = self._entries.get(sql)
+            if entry is not None:
+                df, _, expires_at, window_end = entry
+                if (expires_at is not None and time.monotonic() >= expires_at) or \
+                        (window_end is not None and datetime.now() >= window_end):
+                    self._remove(sql)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sql)
+            self.hits += 1
+        # Callers add columns to results, so never hand out the cached frame itself
+        return df.copy()
+
+    def put(self, sql, df, policy=OPEN, closes_at=None):
+        """
+        Cache a query result
+
+        Args:
+            sql: Query text (cache key)
+            df: Result DataFrame
+            policy: CLOSED (kept until evicted) or OPEN (short TTL, dropped at window boundary)
+            closes_at: For CLOSED results, end of the latest window read; until the
+                watermark has passed it the result is treated as OPEN
+        """
+        now = datetime.now()
+        if policy == CLOSED and closes_at is not None and now < closes_at + WATERMARK_DELAY:
+            policy = OPEN
+        monotonic_now = time.monotonic()
+        with self._lock:
+            unsettled = [table for table, until in self._unsettled.items() if until > monotonic_now]
+        if policy == CLOSED and any(table in sql for table in unsettled):
+            policy = OPEN
+
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        if policy == CLOSED:
+            expires_at, window_end = None, None
+        else:
+            expires_at = monotonic_now + self.open_ttl
+            window_end = get_current_interval_bounds(self.interval_seconds)[1]
+
+        with self._lock:
+            if sql in self._entries:
+                self._remove(sql)
+            self._entries[sql] = (df.copy(), nbytes, expires_at, window_end)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables, settle_seconds=0.0):
+        """
+        Drop cached results that read any of the given tables
+
+        Args:
+            tables: Table or view names
+            settle_seconds: For this long afterwards, results reading these tables are
+                cached as OPEN, so a write that lands asynchronously is not pinned stale
+        """
+        with self._lock:
+            for key in [k for k in self._entries if any(table in k for table in tables)]:
+                self._remove(key)
+            if settle_seconds:
+                until = time.monotonic() + settle_seconds
+                for table in tables:
+                    self._unsettled[table] = until
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,160 @@
+"""
+Process-wide data snapshot shared by all dashboard sessions
+
+One background thread runs the queries a dashboard with the default settings
+needs, each on its own period, and publishes an immutable snapshot of the
+results. query_data serves any query that matches a snapshot entry from memory,
+so database load no longer grows with the number of open screens. Sessions with
+non-default settings (other thresholds) fall through to normal querying.
+"""
+import threading
+import time
+from types import MappingProxyType
+from . import queries
+from .time_utils import (
+    DEFAULT_TIME_WINDOW, DEFAULT_FULFILLED_DATE_RANGE, get_current_interval_bounds, get_time_window_start,
+    get_date_range_start
+)
+
+
+def snapshot_key(query):
+    """Key shared with the query cache: SQL plus bound values"""
+    if not query.params:
+        return query.sql
+    return f"{query.sql}\n-- {sorted(query.params.items())!r}"
+
+
+def default_queries(hotel_threshold, drink_threshold, interval_seconds=300):
+    """
+    Queries the tabs run with default settings, with their refresh periods
+
+    Closed-window offer queries are left out: their windows no longer change,
+    and the query cache keeps each result until the next window closes.
+
+    Returns:
+        list: (Query, period_seconds) pairs
+    """
+    curr_start, curr_end, _, _ = get_current_interval_bounds(interval_seconds)
+    since = get_time_window_start(DEFAULT_TIME_WINDOW, interval_seconds)
+    redeemed_from = get_date_range_start(DEFAULT_FULFILLED_DATE_RANGE)
+    return [
+        (queries.build_hotel_current_offers_query(hotel_threshold, curr_start, curr_end), 2),
+        (queries.build_drink_current_offers_query(drink_threshold, curr_start, curr_end), 2),
+        (queries.build_pending_offers_query(), 2),
+        (queries.build_fulfilled_offers_query(redeemed_from), 10),
+        (queries.build_fulfilled_count_query(redeemed_from), 10),
+        (queries.build_fulfilled_summary_query(redeemed_from), 10),
+        (queries.build_stats_query(since), 30),
+        (queries.build_reward_query(hotel_threshold, drink_threshold, since), 30),
+        (queries.build_top_spenders_query(since, limit=10), 30),
+        (queries.build_game_trend_query(since), 30),
+        (queries.build_member_count_query(since), 30),
+        (queries.build_all_members_query(hotel_threshold, drink_threshold, since), 30),
+    ]
+
+
+class SnapshotPoller:
+    """
+    Background poller publishing immutable query snapshots
+
+    Args:
+        fetch: Callable(Query) -> DataFrame that runs one query
+        hotel_threshold: Default hotel threshold the tabs start with
+        drink_threshold: Default drink threshold the tabs start with
+        tick: Seconds between scheduling rounds
+    """
+
+    def __init__(self, fetch, hotel_threshold, drink_threshold, tick=0.5):
+        self.fetch = fetch
+        self.hotel_threshold = hotel_threshold
+        self.drink_threshold = drink_threshold
+        self.tick = tick
+
+        # Replaced wholesale on publish, never mutated: readers need no lock
+        self._snapshot = MappingProxyType({})  # key -> (DataFrame, fetched_at)
+        self._publish_lock = threading.Lock()
+        self._invalidated = {}  # table -> monotonic time of the last invalidation
+        self._stop = threading.Event()
+        self._thread = None
+        self.queries_run = 0
+        self.hits = 0
+        self.last_error = None
+
+    def start(self):
+        """Start the background poller thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='snapshot-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+    def _run(self):
+        """Refresh due entries every tick"""
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.tick)
+
+    def refresh(self):
+        """Run every query that is missing or older than its period, then publish"""
+        current = self._snapshot
+        now = time.monotonic()
+        wanted = {}
+        for query, period in default_queries(self.hotel_threshold, self.drink_threshold):
+            key = snapshot_key(query)
+            entry = current.get(key)
+            if entry is not None and self._stale(key, entry[1]):
+                entry = None
+            if entry is None or now - entry[1] >= period:
+                try:
+                    entry = (self.fetch(query), time.monotonic())
+                    self.queries_run += 1
+                except Exception as e:
+                    # Keep serving the previous result for this entry, if any
+                    self.last_error = str(e)
+                    if entry is None:
+                        continue
+            wanted[key] = entry
+        with self._publish_lock:
+            # An invalidation may have landed while queries were running
+            self._snapshot = MappingProxyType({
+                key: entry for key, entry in wanted.items() if not self._stale(key, entry[1])
+            })
+
+    def _stale(self, key, fetched_at):
+        """True if a table read by key was invalidated after the entry was fetched"""
+        return any(table in key and fetched_at < invalidated_at
+                   for table, invalidated_at in list(self._invalidated.items()))
+
+    def lookup(self, key):
+        """Copy of the snapshot DataFrame for key, or None"""
+        entry = self._snapshot.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0].copy()
+
+    def invalidate(self, tables):
+        """Drop entries that read any of the given tables until the next refresh"""
+        now = time.monotonic()
+        with self._publish_lock:
+            for table in tables:
+                self._invalidated[table] = now
+            self._snapshot = MappingProxyType({
+                key: entry for key, entry in self._snapshot.items()
+                if not any(table in key for table in tables)
+            })
+
+    def stats(self):
+        """Snapshot size and counters for diagnostics"""
+        return {
+            'entries': len(self._snapshot),
+            'queries_run': self.queries_run,
+            'hits': self.hits,
+            'last_error': self.last_error
+        }
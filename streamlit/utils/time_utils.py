@@ -3,6 +3,24 @@ Time and interval utilities for watermark display logic
 """
 from datetime import datetime, timedelta
 
+# Sidebar time windows -> lookback (None = since midnight for "Today", all data for "All Time")
+TIME_WINDOWS = {
+    "Today": None,
+    "Last Hour": timedelta(hours=1),
+    "Last 5 Minutes": timedelta(minutes=5),
+    "All Time": None,
+}
+DEFAULT_TIME_WINDOW = "Today"
+
+# Fulfilled Offers date ranges -> days before today included (None = all dates)
+FULFILLED_DATE_RANGES = {
+    "Today": 0,
+    "Last 7 Days": 6,
+    "Last 30 Days": 29,
+    "All Time": None,
+}
+DEFAULT_FULFILLED_DATE_RANGE = "Today"
+
 
 def get_current_interval_bounds(interval_seconds=300):
     """
@@ -33,6 +51,44 @@ def get_current_interval_bounds(interval_seconds=300):
     return current_start, current_end, previous_start, previous_end
 
 
+def get_time_window_start(time_window, interval_seconds=300):
+    """
+    Earliest window_start included by a sidebar time window
+
+    Relative windows count back from the start of the current interval, so the
+    bound (and the queries bound to it) only changes once per interval.
+
+    Args:
+        time_window: Key of TIME_WINDOWS
+        interval_seconds: Size of each interval in seconds
+
+    Returns:
+        datetime or None: Lower bound for window_start, None for all time
+    """
+    if time_window == "All Time":
+        return None
+    if time_window == "Today":
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    current_start = get_current_interval_bounds(interval_seconds)[0]
+    return current_start - TIME_WINDOWS[time_window]
+
+
+def get_date_range_start(date_range):
+    """
+    First redemption date included by a Fulfilled Offers date range
+
+    Args:
+        date_range: Key of FULFILLED_DATE_RANGES
+
+    Returns:
+        date or None: Inclusive lower bound, None for all dates
+    """
+    days = FULFILLED_DATE_RANGES[date_range]
+    if days is None:
+        return None
+    return datetime.now().date() - timedelta(days=days)
+
+
 def format_interval_label(window_start, window_end):
     """
     Format interval as readable label